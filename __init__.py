@@ -1,7 +1,45 @@
+from . import controllers
 from . import models
 from . import wizard
 from . import report
 
+from odoo.tools import SQL
+
+from .models.project_analytics import FINANCIAL_DATA_COLUMNS
+
+
+def pre_init_hook(env):
+    """
+    Create the columns of the computed financial fields before the install.
+
+    Odoo computes a new stored computed field for every existing record when
+    it creates its column. For the ~30 fields of _compute_financial_data this
+    took the slow per-project path on large databases. The columns are created
+    here with a default (instant on PostgreSQL >= 11, no table rewrite), so
+    Odoo finds them and skips that step; post_init_hook fills them.
+    """
+    for column, (column_type, default) in FINANCIAL_DATA_COLUMNS.items():
+        env.cr.execute(SQL(
+            "ALTER TABLE project_project ADD COLUMN IF NOT EXISTS %s %s DEFAULT %s",
+            SQL.identifier(column), SQL(column_type), default,
+        ))
+        # Odoo does not keep database defaults for these fields
+        env.cr.execute(SQL(
+            "ALTER TABLE project_project ALTER COLUMN %s DROP DEFAULT", SQL.identifier(column),
+        ))
+
+
+def post_init_hook(env):
+    """
+    Compute the financial data of all projects after the install.
+
+    Uses the grouped aggregation of the regular compute (one query per
+    category per batch of projects), see project.project._init_financial_data,
+    then builds the financial rollups.
+    """
+    env['project.project']._init_financial_data()
+    env['project.financial.rollup']._refresh()
+
 
 def uninstall_hook(env):
     """
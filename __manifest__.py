@@ -56,6 +56,10 @@
     'data': [
         # Security
         'security/ir.model.access.csv',
+        'security/project_report_job_security.xml',
+        'security/project_account_classification_security.xml',
+        'security/project_task_financial_security.xml',
+        'security/project_financial_rollup_security.xml',
         # Configuration
         'data/ir_config_parameter.xml',
         # Menu items (loaded early - defines parent menu structure)
@@ -66,13 +70,21 @@
         'views/hr_employee_views.xml',
         'views/project_analytics_views.xml',
         'views/project_financial_snapshot_views.xml',
+        'views/project_task_financial_views.xml',
+        'views/project_financial_rollup_views.xml',
         'views/project_analytics_dashboard_views.xml',
         'views/project_portal_views.xml',
+        'views/project_report_job_views.xml',
+        'views/project_statistic_telemetry_views.xml',
+        'views/project_account_classification_views.xml',
+        'views/project_statistic_export_views.xml',
         # Reports
         'report/project_financial_report_templates.xml',
     ],
     'installable': True,
     'application': False,
     'auto_install': False,
+    'pre_init_hook': 'pre_init_hook',
+    'post_init_hook': 'post_init_hook',
     'uninstall_hook': 'uninstall_hook',
 }
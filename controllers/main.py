@@ -0,0 +1,213 @@
+from odoo import http, fields, _
+from odoo.exceptions import AccessError, MissingError, UserError
+from odoo.http import request, Response
+from odoo.addons.portal.controllers.portal import pager as portal_pager
+from odoo.addons.project_statistic.models.project_statistic_bulk import stream_rows
+from odoo.addons.project_statistic.models.project_statistic_export import EXPORT_DATASETS
+from datetime import timedelta
+import csv
+import io
+import json
+
+# Filters of the snapshot search view, by group (OR within a group, AND between groups)
+SNAPSHOT_SEARCH_FILTERS = (
+    {
+        'monthly': lambda today: [('snapshot_type', '=', 'monthly')],
+        'quarterly': lambda today: [('snapshot_type', '=', 'quarterly')],
+        'manual': lambda today: [('snapshot_type', '=', 'manual')],
+    },
+    {
+        'profitable': lambda today: [('profit_loss_net', '>', 0)],
+        'loss': lambda today: [('profit_loss_net', '<', 0)],
+    },
+    {
+        'this_year': lambda today: [('snapshot_date', '>=', today.strftime('%Y-01-01'))],
+        'last_12_months': lambda today: [('snapshot_date', '>=', (today - timedelta(days=365)).strftime('%Y-%m-%d'))],
+    },
+)
+
+# Projects per page of the portal project list (as the standard portal lists)
+PORTAL_ITEMS_PER_PAGE = 80
+
+
+class ProjectStatisticController(http.Controller):
+
+    @http.route('/project_statistic/portfolio_cube', type='json', auth='user')
+    def portfolio_cube(self, group_by=None, filters=None, measures=None, order=None, limit=None):
+        """
+        JSON API over the in-memory portfolio cube.
+
+        Example payload (params):
+            {"group_by": ["client_name"], "filters": {"company_id": [1]},
+             "measures": ["profit_loss_net"], "order": "profit_loss_net desc", "limit": 10}
+        """
+        return request.env['project.portfolio.cube'].query(
+            group_by=group_by,
+            filters=filters,
+            measures=measures,
+            order=order,
+            limit=limit,
+        )
+
+    @http.route('/project_statistic/bulk_read', type='json', auth='user')
+    def bulk_read(self, model, field_names, domain=None, cursor=None, changed_since=None, limit=None):
+        """
+        Columnar bulk read of project financials and snapshots (see project.statistic.bulk).
+
+        Example payload (params):
+            {"model": "project.financial.snapshot", "field_names": ["project_id", "profit_loss_net"],
+             "changed_since": "2025-01-01 00:00:00", "limit": 20000}
+        """
+        return request.env['project.statistic.bulk'].read_columns(
+            model,
+            field_names,
+            domain=domain,
+            cursor=cursor,
+            changed_since=changed_since,
+            limit=limit,
+        )
+
+    def _get_portal_project(self, project_id):
+        """Project readable by the current user (sudo for the cached payload), or None."""
+        project = request.env['project.project'].browse(project_id).exists()
+        if not project:
+            return None
+        try:
+            project.check_access('read')
+        except (AccessError, MissingError):
+            return None
+        return project.sudo()
+
+    @http.route('/my/project/<int:project_id>/financial.json', type='http', auth='user', methods=['GET'])
+    def portal_project_financial_json(self, project_id, **kwargs):
+        """
+        Financial block of a project as JSON, with HTTP revalidation.
+
+        The strong ETag changes only when a visible value or a portal_show_*
+        flag changes; a request with a matching If-None-Match is answered with
+        304 without building the payload.
+        """
+        project = self._get_portal_project(project_id)
+        if not project:
+            return request.not_found()
+
+        etag = project._get_portal_financial_etag()
+        headers = [
+            ('ETag', etag),
+            ('Cache-Control', 'private, no-cache'),
+            ('Vary', 'Cookie'),
+        ]
+        if request.httprequest.if_none_match.contains(etag.strip('"')):
+            return request.make_response(b'', headers=headers, status=304)
+        return request.make_json_response(project._get_portal_financial_payload(etag), headers=headers)
+
+    @http.route('/my/project/<int:project_id>/financial', type='http', auth='user')
+    def portal_project_financial(self, project_id, **kwargs):
+        """Portal page with the financial block of a project (rendered from the cached payload)."""
+        project = self._get_portal_project(project_id)
+        if not project:
+            return request.not_found()
+        return request.render('project_statistic.portal_my_project_financial', {
+            'financial': project._get_portal_financial_payload(),
+            'page_name': 'project_financial',
+        })
+
+    @http.route(['/my/projects/financial', '/my/projects/financial/page/<int:page>'], type='http', auth='user')
+    def portal_projects_financial(self, page=1, **kwargs):
+        """Portal list of the user's projects with their shared financial status, one page at a time."""
+        Project = request.env['project.project']
+        pager = portal_pager(
+            url='/my/projects/financial',
+            total=Project.search_count([]),
+            page=page,
+            step=PORTAL_ITEMS_PER_PAGE,
+        )
+        projects = Project.search([], order='name, id', limit=PORTAL_ITEMS_PER_PAGE, offset=pager['offset'])
+        return request.render('project_statistic.portal_my_projects', {
+            'financials': [project._get_portal_financial_payload() for project in projects.sudo()],
+            'page_name': 'projects_financial',
+            'pager': pager,
+        })
+
+    def _get_stream_domain(self, dataset, domain=None, filters=None, project_id=None, period_label=None):
+        """Domain of a streamed export from the query string (search view filters and fields)."""
+        result = json.loads(domain) if domain else []
+        if dataset != 'snapshots':
+            return result
+        if filters:
+            names = {name.strip() for name in filters.split(',') if name.strip()}
+            unknown = names - {name for group in SNAPSHOT_SEARCH_FILTERS for name in group}
+            if unknown:
+                raise UserError(_('Unknown snapshot filter(s): %s', ', '.join(sorted(unknown))))
+            today = fields.Date.context_today(request.env.user)
+            for group in SNAPSHOT_SEARCH_FILTERS:
+                selected = [group[name](today) for name in group if name in names]
+                if selected:
+                    result += ['|'] * (len(selected) - 1) + [leaf for leaves in selected for leaf in leaves]
+        if project_id:
+            result.append(('project_id', '=', int(project_id)))
+        if period_label:
+            result.append(('period_label', 'ilike', period_label))
+        return result
+
+    @http.route('/project_statistic/export/<string:dataset>.<string:file_format>', type='http', auth='user', methods=['GET'])
+    def export_stream(self, dataset, file_format, fields=None, domain=None, filters=None,
+                      project_id=None, period_label=None, **kwargs):
+        """
+        Streaming CSV/NDJSON download of project financials or snapshots.
+
+        The rows are fetched in fixed-size batches through a server-side cursor
+        and written to the response as they arrive, so memory stays flat
+        regardless of the export size.
+
+        Query string:
+            fields: comma-separated field names (default: the data export fields)
+            domain: JSON search domain
+            filters: snapshot search view filters, e.g. 'monthly,last_12_months'
+            project_id, period_label: as the snapshot search view fields
+
+        Example:
+            /project_statistic/export/snapshots.csv?filters=monthly,this_year&project_id=7
+        """
+        if dataset not in EXPORT_DATASETS or file_format not in ('csv', 'ndjson'):
+            return request.not_found()
+        spec = EXPORT_DATASETS[dataset]
+        field_names = fields.split(',') if fields else list(spec['fields'])
+        try:
+            field_names, query = request.env['project.statistic.bulk']._prepare_stream_query(
+                spec['model'], field_names,
+                self._get_stream_domain(dataset, domain, filters, project_id, period_label),
+            )
+        except (UserError, ValueError) as e:
+            return request.make_response(str(e), headers=[('Content-Type', 'text/plain')], status=400)
+
+        # The response is consumed after the request ends: keep no reference to request
+        registry = request.env.registry
+        if file_format == 'csv':
+            content_type = 'text/csv; charset=utf-8'
+
+            def generate():
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(field_names)
+                for rows in stream_rows(registry, query):
+                    writer.writerows(rows)
+                    yield buffer.getvalue().encode()
+                    buffer.seek(0)
+                    buffer.truncate()
+                if buffer.tell():
+                    yield buffer.getvalue().encode()
+        else:
+            content_type = 'application/x-ndjson'
+
+            def generate():
+                for rows in stream_rows(registry, query):
+                    yield ''.join(
+                        json.dumps(dict(zip(field_names, row)), default=str) + '\n' for row in rows
+                    ).encode()
+
+        return Response(generate(), headers=[
+            ('Content-Type', content_type),
+            ('Content-Disposition', f'attachment; filename="{dataset}.{file_format}"'),
+            ('X-Accel-Buffering', 'no'),
+        ], direct_passthrough=True)
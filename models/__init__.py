@@ -3,4 +3,13 @@ from . import account_move_line
 from . import account_analytic_line
 from . import hr_employee
 from . import project_financial_snapshot
-from . import project_analytics_dashboard
\ No newline at end of file
+from . import project_analytics_dashboard
+from . import project_portfolio_cube
+from . import project_report_job
+from . import project_statistic_telemetry
+from . import project_account_classification
+from . import account_account
+from . import project_statistic_bulk
+from . import project_statistic_export
+from . import project_task_financial
+from . import project_financial_rollup
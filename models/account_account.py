@@ -0,0 +1,31 @@
+from odoo import models, api
+
+
+class AccountAccount(models.Model):
+    _inherit = 'account.account'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """
+        Override create to invalidate the compiled account classification.
+        New accounts may match a code prefix or tag of a classification rule.
+        """
+        accounts = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return accounts
+
+    def write(self, vals):
+        """
+        Override write to invalidate the compiled account classification.
+        Only when the fields used by the classification rules change.
+        """
+        result = super().write(vals)
+        if any(key in vals for key in ['code', 'tag_ids', 'company_ids']):
+            self.env.registry.clear_cache()
+        return result
+
+    def unlink(self):
+        """Override unlink to invalidate the compiled account classification."""
+        result = super().unlink()
+        self.env.registry.clear_cache()
+        return result
@@ -21,11 +21,18 @@ class AccountAnalyticLine(models.Model):
         Override write to trigger project analytics recomputation when timesheets are modified.
         Only triggers when relevant fields change.
         """
+        # Only trigger recompute if fields that affect project analytics (or the
+        # per-task breakdown) changed; a line moved to another project also
+        # updates the project it comes from
+        recompute = any(key in vals for key in [
+            'account_id', 'unit_amount', 'amount', 'employee_id', 'is_timesheet', 'task_id', 'project_id',
+        ])
+        previous_account_ids = set(self.account_id.ids) if recompute else set()
+
         result = super().write(vals)
 
-        # Only trigger recompute if fields that affect project analytics changed
-        if any(key in vals for key in ['account_id', 'unit_amount', 'amount', 'employee_id', 'is_timesheet']):
-            self._trigger_project_analytics_recompute(self)
+        if recompute:
+            self._trigger_project_analytics_recompute(self, previous_account_ids)
 
         return result
 
@@ -37,18 +44,20 @@ class AccountAnalyticLine(models.Model):
         self._trigger_project_analytics_recompute(self)
         return super().unlink()
 
-    def _trigger_project_analytics_recompute(self, lines):
+    def _trigger_project_analytics_recompute(self, lines, previous_account_ids=None):
         """
         Trigger recomputation of project analytics when analytic lines (timesheets) change.
 
         Args:
             lines: Recordset of account.analytic.line records that changed
+            previous_account_ids: Optional analytic account ids of the lines before the change
         """
-        if not lines:
+        # Bulk imports and benchmarks can skip the hook and recompute once afterwards
+        if not lines or self.env.context.get('project_statistic_skip_recompute'):
             return
 
         # Collect all unique analytic account IDs from the lines
-        analytic_account_ids = set()
+        analytic_account_ids = set(previous_account_ids or ())
         for line in lines:
             if line.account_id:
                 analytic_account_ids.add(line.account_id.id)
@@ -1,4 +1,5 @@
-from odoo import models, api
+from odoo import models, fields, api
+from odoo.tools import SQL
 import logging
 
 _logger = logging.getLogger(__name__)
@@ -7,6 +8,31 @@ _logger = logging.getLogger(__name__)
 class AccountMoveLine(models.Model):
     _inherit = 'account.move.line'
 
+    distribution_analytic_account_ids = fields.Many2many(
+        'account.analytic.account',
+        string='Distributed Analytic Accounts',
+        compute='_compute_distribution_analytic_account_ids',
+        search='_search_distribution_analytic_account_ids',
+        help="Analytic accounts that are a key of the analytic distribution on their own. "
+             "Multi-plan keys such as '12,40' do not match, as in the project financial data.",
+    )
+
+    @api.depends('analytic_distribution')
+    def _compute_distribution_analytic_account_ids(self):
+        for line in self:
+            account_ids = [int(key) for key in (line.analytic_distribution or {}) if key.isdigit()]
+            line.distribution_analytic_account_ids = self.env['account.analytic.account'].browse(account_ids)
+
+    def _search_distribution_analytic_account_ids(self, operator, value):
+        """Exact key test on analytic_distribution (jsonb ?|, backed by its GIN index)."""
+        if operator != 'in':
+            return NotImplemented
+        query = self._search([('analytic_distribution', '!=', False)])
+        query.add_where(SQL(
+            "%s ?| %s", SQL.identifier(query.table, 'analytic_distribution'), [str(account_id) for account_id in value],
+        ))
+        return [('id', 'in', query)]
+
     @api.model_create_multi
     def create(self, vals_list):
         """
@@ -25,7 +51,9 @@ class AccountMoveLine(models.Model):
         result = super().write(vals)
 
         # Only trigger recompute if fields that affect project analytics changed
-        if any(key in vals for key in ['analytic_distribution', 'price_subtotal', 'price_total', 'debit', 'credit', 'balance']):
+        if any(key in vals for key in [
+            'analytic_distribution', 'price_subtotal', 'price_total', 'debit', 'credit', 'balance', 'task_id', 'project_id',
+        ]):
             self._trigger_project_analytics_recompute(self)
 
         return result
@@ -46,7 +74,8 @@ class AccountMoveLine(models.Model):
         Args:
             lines: Recordset of account.move.line records that changed
         """
-        if not lines:
+        # Bulk imports and benchmarks can skip the hook and recompute once afterwards
+        if not lines or self.env.context.get('project_statistic_skip_recompute'):
             return
 
         # Filter lines that have analytic distribution
@@ -0,0 +1,186 @@
+"""
+Per-stage instrumentation of the project financial compute.
+
+Every run of _compute_financial_data records, per stage (customer invoices,
+vendor bills, skonto, sales orders, timesheets, other costs), the wall time,
+the number of SQL queries and the number of rows read. The totals are logged
+once per run. Recording only reads a clock and the cursor's query counter, so
+the overhead is negligible.
+
+In profiling mode (context key 'project_statistic_profile' or system parameter
+project_statistic.profile_compute) the run is additionally captured with
+cProfile and stored as attachments of the run's telemetry row (Telemetry Runs,
+Download Profile), together with the stage table. Stored profiles are removed
+after project_statistic.profile_retention_days.
+
+Diagnostics are aggregated: one summary per run (INFO) and per project (DEBUG).
+A per-line trace of the matched invoice/bill lines is only written for the
+analytic accounts listed in project_statistic.trace_analytic_account_ids,
+through the logger odoo.addons.project_statistic.trace. Callers check
+is_traced() before building trace arguments, so a disabled trace costs nothing.
+"""
+from contextlib import contextmanager
+import cProfile
+import io
+import logging
+import marshal
+import pstats
+import threading
+import time
+
+_logger = logging.getLogger(__name__)
+_trace_logger = logging.getLogger('odoo.addons.project_statistic.trace')
+
+STAGES = (
+    'customer_invoices',
+    'vendor_bills',
+    'skonto',
+    'sales_orders',
+    'timesheets',
+    'other_costs',
+)
+
+# Name prefix of the stored profile attachments (removed by the telemetry GC cron)
+PROFILE_ATTACHMENT_PREFIX = 'financial_compute_'
+
+_local = threading.local()
+
+
+def add_rows(stage, count):
+    """Count rows read by a stage of the active run (no-op outside a run)."""
+    profiler = getattr(_local, 'profiler', None)
+    if profiler is not None:
+        profiler.stats[stage]['rows'] += count
+
+
+def is_traced(analytic_account_id):
+    """Whether the per-line trace is enabled for this analytic account."""
+    profiler = getattr(_local, 'profiler', None)
+    return profiler is not None and analytic_account_id in profiler.trace_account_ids
+
+
+def trace(message, *args):
+    """Write a trace line; formatting is deferred to the logging framework."""
+    _trace_logger.info(message, *args)
+
+
+class ComputeProfiler:
+    """Collects stage statistics of one compute run."""
+
+    def __init__(self, env, project_count, profile=False):
+        self.env = env
+        self.trace_account_ids = self._get_trace_account_ids(env)
+        self.projects_without_account = []
+        self.project_count = project_count
+        self.stats = {stage: {'time': 0.0, 'queries': 0, 'rows': 0, 'calls': 0} for stage in STAGES}
+        self.profile = cProfile.Profile() if profile else None
+        self.start = None
+        self.queries_start = 0
+        self.wall_time = 0.0
+        self.queries = 0
+
+    @staticmethod
+    def _get_trace_account_ids(env):
+        """Analytic account ids of project_statistic.trace_analytic_account_ids."""
+        value = env['ir.config_parameter'].sudo().get_param('project_statistic.trace_analytic_account_ids', default='')
+        return frozenset(int(part) for part in value.replace(';', ',').split(',') if part.strip().isdigit())
+
+    @contextmanager
+    def stage(self, name):
+        """Measure one stage (one grouped read for all projects of the run)."""
+        cr = self.env.cr
+        queries = cr.sql_log_count
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats = self.stats[name]
+            stats['time'] += time.perf_counter() - start
+            stats['queries'] += cr.sql_log_count - queries
+            stats['calls'] += 1
+
+    def __enter__(self):
+        self._previous = getattr(_local, 'profiler', None)
+        if self._previous is not None and self._previous.profile:
+            # Nested run (e.g. triggered by a hook): the outer cProfile already covers it
+            self.profile = None
+        _local.profiler = self
+        self.queries_start = self.env.cr.sql_log_count
+        self.start = time.perf_counter()
+        if self.profile:
+            self.profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.profile:
+            self.profile.disable()
+        self.wall_time = time.perf_counter() - self.start
+        self.queries = self.env.cr.sql_log_count - self.queries_start
+        _local.profiler = self._previous
+        if exc_type is None:
+            self._log_summary()
+        return False
+
+    def format_table(self):
+        """Stage table as plain text."""
+        lines = [
+            f"Financial compute of {self.project_count} project(s): "
+            f"{self.wall_time:.3f}s, {self.queries} queries",
+            f"{'stage':<20}{'time (s)':>10}{'share':>8}{'queries':>10}{'rows':>10}",
+        ]
+        for stage in STAGES:
+            stats = self.stats[stage]
+            share = stats['time'] / self.wall_time * 100 if self.wall_time else 0.0
+            lines.append(
+                f"{stage:<20}{stats['time']:>10.3f}{share:>7.1f}%{stats['queries']:>10}{stats['rows']:>10}"
+            )
+        return '\n'.join(lines)
+
+    def _log_summary(self):
+        if self.projects_without_account:
+            _logger.warning(
+                "%s project(s) have no analytic account on the Projects plan, their financial data is 0 "
+                "(project ids: %s)", len(self.projects_without_account), self.projects_without_account[:20],
+            )
+        if self.project_count and _logger.isEnabledFor(logging.INFO):
+            slowest = max(STAGES, key=lambda stage: self.stats[stage]['time'])
+            _logger.info(
+                f"Computed financial data of {self.project_count} project(s) in {self.wall_time:.3f}s "
+                f"({self.queries} queries, slowest stage: {slowest} "
+                f"{self.stats[slowest]['time']:.3f}s)"
+            )
+            _logger.debug(self.format_table())
+
+    def store_profile(self, telemetry_id):
+        """
+        Store the stage table and the cProfile output as attachments of the
+        telemetry run (no-op unless the run was profiled).
+
+        Args:
+            telemetry_id: Id of the project.statistic.telemetry row of the run,
+                          or None when telemetry is disabled
+        """
+        if not self.profile:
+            return self.env['ir.attachment']
+        stream = io.StringIO()
+        # Stats() also fills self.profile.stats, dumped below in the pstats format (snakeviz, pstats)
+        pstats.Stats(self.profile, stream=stream).sort_stats('cumulative').print_stats(80)
+        timestamp = time.strftime('%Y%m%d_%H%M%S')
+
+        attachments = self.env['ir.attachment'].sudo().create([{
+            'name': f'{PROFILE_ATTACHMENT_PREFIX}{timestamp}.txt',
+            'raw': (self.format_table() + '\n\n' + stream.getvalue()).encode(),
+            'mimetype': 'text/plain',
+            'res_model': 'project.statistic.telemetry',
+            'res_id': telemetry_id or False,
+            'description': 'Project Statistic compute profile',
+        }, {
+            'name': f'{PROFILE_ATTACHMENT_PREFIX}{timestamp}.prof',
+            'raw': marshal.dumps(self.profile.stats),
+            'mimetype': 'application/octet-stream',
+            'res_model': 'project.statistic.telemetry',
+            'res_id': telemetry_id or False,
+            'description': 'Project Statistic compute profile',
+        }])
+        _logger.info(f"Stored financial compute profile as attachments {attachments.ids}")
+        return attachments
@@ -0,0 +1,154 @@
+from odoo import models, fields, api, tools, _
+from odoo.exceptions import ValidationError
+import logging
+
+_logger = logging.getLogger(__name__)
+
+CLASSIFICATION_CATEGORIES = [
+    ('customer_skonto', 'Customer Skonto (Granted)'),
+    ('vendor_skonto', 'Vendor Skonto (Received)'),
+    ('excluded_cost', 'Excluded from Other Costs'),
+]
+
+# Used for companies without any classification rule (previous hard-coded behaviour)
+DEFAULT_CLASSIFICATION_PREFIXES = {
+    'customer_skonto': ('7300', '7301', '7302', '7303', '2130'),
+    'vendor_skonto': ('4730', '4731', '4732', '4733', '2670'),
+    'excluded_cost': (),
+}
+
+
+class ProjectAccountClassification(models.Model):
+    """
+    Per-company mapping of accounts to the categories used by the financial compute.
+
+    A rule matches accounts by code prefix and/or account tag. The rules of a
+    company are compiled once into sets of account ids (see
+    _get_category_account_ids); the cache is cleared when rules or accounts
+    change. The compute then filters analytic lines by these ids in SQL.
+
+    Example SKR03 vs. SKR04: each company gets its own prefixes for granted
+    and received cash discounts.
+    """
+    _name = 'project.account.classification'
+    _description = 'Project Statistic Account Classification'
+    _order = 'company_id, category, sequence, id'
+
+    sequence = fields.Integer(string='Sequence', default=10)
+    active = fields.Boolean(string='Active', default=True)
+    company_id = fields.Many2one(
+        'res.company',
+        string='Company',
+        required=True,
+        default=lambda self: self.env.company,
+        index=True,
+    )
+    category = fields.Selection(
+        CLASSIFICATION_CATEGORIES,
+        string='Category',
+        required=True,
+        help="Customer/Vendor Skonto: counted as cash discounts. "
+             "All classified accounts are excluded from Other Costs."
+    )
+    code_prefix = fields.Char(
+        string='Account Code Prefix',
+        help="Accounts whose code starts with this prefix, e.g. '7300' or '8730'."
+    )
+    tag_ids = fields.Many2many(
+        'account.account.tag',
+        string='Account Tags',
+        help="Accounts carrying at least one of these tags."
+    )
+    account_count = fields.Integer(
+        string='Matched Accounts',
+        compute='_compute_account_count',
+    )
+
+    @api.constrains('code_prefix', 'tag_ids')
+    def _check_criteria(self):
+        for rule in self:
+            if not rule.code_prefix and not rule.tag_ids:
+                raise ValidationError(_('A classification rule needs an account code prefix or account tags.'))
+
+    @api.depends('code_prefix', 'tag_ids', 'company_id')
+    def _compute_account_count(self):
+        for rule in self:
+            rule.account_count = len(rule._get_matching_accounts()) if rule.company_id else 0
+
+    def _get_matching_accounts(self):
+        """Accounts of the rule's company matching its prefix and/or tags."""
+        self.ensure_one()
+        domain = [('company_ids', 'in', self.company_id.id)]
+        if self.code_prefix:
+            domain.append(('code', '=like', self.code_prefix.strip() + '%'))
+        if self.tag_ids:
+            domain.append(('tag_ids', 'in', self.tag_ids.ids))
+        return self.env['account.account'].with_company(self.company_id).sudo().search(domain)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        rules = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return rules
+
+    def write(self, vals):
+        result = super().write(vals)
+        self.env.registry.clear_cache()
+        return result
+
+    def unlink(self):
+        result = super().unlink()
+        self.env.registry.clear_cache()
+        return result
+
+    @api.model
+    @tools.ormcache('company_id')
+    def _get_category_account_ids(self, company_id):
+        """
+        Compile the rules of a company into account id sets (cached).
+
+        Args:
+            company_id: ID of the company
+
+        Returns:
+            dict: {category: frozenset(account ids)}
+        """
+        company = self.env['res.company'].browse(company_id)
+        rules = self.sudo().search([('company_id', '=', company_id)])
+        result = {category: set() for category, _label in CLASSIFICATION_CATEGORIES}
+
+        if rules:
+            for rule in rules:
+                result[rule.category].update(rule._get_matching_accounts().ids)
+        else:
+            Account = self.env['account.account'].with_company(company).sudo()
+            for category, prefixes in DEFAULT_CLASSIFICATION_PREFIXES.items():
+                for prefix in prefixes:
+                    result[category].update(Account.search([
+                        ('company_ids', 'in', company_id),
+                        ('code', '=like', prefix + '%'),
+                    ]).ids)
+
+        _logger.debug(
+            "Compiled account classification of company %s: %s",
+            company_id, {category: len(ids) for category, ids in result.items()},
+        )
+        return {category: frozenset(ids) for category, ids in result.items()}
+
+    @api.model
+    def _get_classified_account_ids(self, company, categories=None):
+        """
+        Account ids of the given categories for a company.
+
+        Args:
+            company: res.company record
+            categories: Iterable of categories (default: all)
+
+        Returns:
+            list: Sorted account ids
+        """
+        compiled = self._get_category_account_ids(company.id)
+        ids = set()
+        for category in categories or compiled:
+            ids |= compiled[category]
+        return sorted(ids)
@@ -1,9 +1,65 @@
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
+from odoo.tools import SQL, str2bool
+from array import array
+from collections import defaultdict
+import hashlib
 import logging
 import json
+import math
+
+from .compute_profiler import ComputeProfiler, add_rows, is_traced, trace
+from .project_financial_rollup import ROLLUP_TRIGGER_FIELDS
 
 _logger = logging.getLogger(__name__)
 
+PORTAL_VISIBILITY_FIELDS = (
+    'portal_show_financial_data',
+    'portal_show_revenue',
+    'portal_show_costs',
+    'portal_show_profit_loss',
+    'portal_show_budget',
+    'portal_show_detailed_breakdown',
+)
+
+# Columns of the stored fields of _compute_financial_data: (column type, default).
+# Created by the pre_init_hook, so the install does not compute them record by
+# record; the post_init_hook then fills them with _init_financial_data().
+FINANCIAL_DATA_COLUMNS = {
+    'has_analytic_account': ('boolean', False),
+    'data_availability_status': ('varchar', 'no_analytic_account'),
+    'has_sales_orders': ('boolean', False),
+    'sale_order_tax_names': ('varchar', ''),
+    'sale_order_amount_net': ('double precision', 0.0),
+    'customer_invoiced_amount_net': ('double precision', 0.0),
+    'customer_invoices_net': ('double precision', 0.0),
+    'customer_credit_notes_net': ('double precision', 0.0),
+    'customer_paid_amount_net': ('double precision', 0.0),
+    'customer_outstanding_amount_net': ('double precision', 0.0),
+    'customer_invoiced_amount_gross': ('double precision', 0.0),
+    'customer_paid_amount_gross': ('double precision', 0.0),
+    'customer_outstanding_amount_gross': ('double precision', 0.0),
+    'vendor_bills_total_net': ('double precision', 0.0),
+    'vendor_bills_net': ('double precision', 0.0),
+    'vendor_credit_notes_net': ('double precision', 0.0),
+    'vendor_bills_total_gross': ('double precision', 0.0),
+    'adjusted_vendor_bill_amount': ('double precision', 0.0),
+    'customer_skonto_taken': ('double precision', 0.0),
+    'vendor_skonto_received': ('double precision', 0.0),
+    'total_hours_booked': ('double precision', 0.0),
+    'labor_costs': ('double precision', 0.0),
+    'total_hours_booked_adjusted': ('double precision', 0.0),
+    'labor_costs_adjusted': ('double precision', 0.0),
+    'other_costs_net': ('double precision', 0.0),
+    'total_costs_net': ('double precision', 0.0),
+    'total_all_costs_net': ('double precision', 0.0),
+    'profit_loss_net': ('double precision', 0.0),
+    'negative_difference_net': ('double precision', 0.0),
+    'current_calculated_profit_loss': ('double precision', 0.0),
+}
+
+# Projects per compute batch when all projects are initialized
+INIT_BATCH_SIZE = 5000
+
 
 class ProjectAnalytics(models.Model):
     _inherit = 'project.project'
@@ -367,12 +423,20 @@ class ProjectAnalytics(models.Model):
              "This provides real-time profitability including cost adjustments."
     )
 
+    def init(self):
+        """Create the (write_date, id) index used by the changed-since bulk read."""
+        super().init()
+        tools.create_index(self.env.cr, 'project_project_write_date_id_index',
+                           self._table, ['write_date', 'id'])
+
     @api.depends('has_analytic_account')
     def _compute_analytic_status_display(self):
         """
         Compute display text for analytic account status.
         Returns 'Has Account' or 'No Account' for better UX.
         """
+        # One query for the whole recordset, also when computed for a single row
+        self.fetch(['has_analytic_account'])
         for project in self:
             if project.has_analytic_account:
                 project.analytic_status_display = 'Has Account'
@@ -452,71 +516,84 @@ class ProjectAnalytics(models.Model):
 
         This ensures data is always synchronized with Odoo's accounting engine.
         """
-        # Cache system parameters and project plan ONCE for all projects (performance optimization)
-        general_hourly_rate = float(
-            self.env['ir.config_parameter'].sudo().get_param(
-                'project_statistic.general_hourly_rate', default='66.0'
+        # Cache the project plan ONCE for all projects (performance optimization)
+        project_plan = self.env.ref('analytic.analytic_plan_projects', raise_if_not_found=False)
+
+        with ComputeProfiler(self.env, len(self), profile=self._is_compute_profiling_enabled()) as profiler:
+            self._compute_financial_data_batch(profiler, project_plan)
+
+        if self:
+            telemetry_id = self.env['project.statistic.telemetry'].record(
+                self.env.context.get('project_statistic_telemetry_operation', 'compute'),
+                profiler.wall_time, profiler.queries, len(self),
             )
-        )
+            profiler.store_profile(telemetry_id)
+            # Totals changed: refresh the company/client/manager/tag rollups before commit
+            self.env['project.financial.rollup']._mark_projects(self.filtered('id'))
+
+    def _is_compute_profiling_enabled(self):
+        """Profiling mode: context key or system parameter project_statistic.profile_compute."""
+        if self.env.context.get('project_statistic_profile'):
+            return True
+        return str2bool(self.env['ir.config_parameter'].sudo().get_param(
+            'project_statistic.profile_compute', default='False'
+        ), default=False)
+
+    def _compute_financial_data_batch(self, profiler, project_plan):
+        """
+        Compute the financial fields of the projects in self.
+
+        Each category (invoices, bills, skonto, sales orders, timesheets, other
+        costs) is read with one grouped query for the analytic accounts of all
+        projects, so the number of queries does not grow with the number of
+        projects. The per-project loop only combines the totals.
+
+        Args:
+            profiler: ComputeProfiler collecting the per-stage statistics
+            project_plan: The Projects analytic plan (or None)
+        """
+        config = self.env['ir.config_parameter'].sudo()
+        general_hourly_rate = float(config.get_param('project_statistic.general_hourly_rate', default='66.0'))
         vendor_bill_surcharge_factor = float(
-            self.env['ir.config_parameter'].sudo().get_param(
-                'project_statistic.vendor_bill_surcharge_factor', default='1.30'
-            )
+            config.get_param('project_statistic.vendor_bill_surcharge_factor', default='1.30')
         )
-        project_plan = self.env.ref('analytic.analytic_plan_projects', raise_if_not_found=False)
 
+        # Analytic account of each project, only if it belongs to the projects plan (if plan exists)
+        project_accounts = {}
         for project in self:
-            # Initialize all fields
-            customer_invoiced_amount_net = 0.0
-            customer_paid_amount_net = 0.0
-            customer_outstanding_amount_net = 0.0
-            customer_invoiced_amount_gross = 0.0
-            customer_paid_amount_gross = 0.0
-            customer_outstanding_amount_gross = 0.0
-            customer_invoices_net = 0.0
-            customer_credit_notes_net = 0.0
-
-            vendor_bills_total_net = 0.0
-            vendor_bills_total_gross = 0.0
-            vendor_bills_net = 0.0
-            vendor_credit_notes_net = 0.0
-            adjusted_vendor_bill_amount = 0.0
-
-            customer_skonto_taken = 0.0
-            vendor_skonto_received = 0.0
-
-            sale_order_amount_net = 0.0
-            sale_order_tax_names = ''
-            has_sales_orders = False
-
-            total_hours_booked = 0.0
-            labor_costs = 0.0
-            other_costs_net = 0.0
-            total_costs_net = 0.0
-
-            profit_loss_net = 0.0
-            negative_difference_net = 0.0
-            current_calculated_profit_loss = 0.0
-
-            # Get the analytic account for this project (simplified logic)
             analytic_account = project.account_id
-
-            # Verify it belongs to the projects plan (if plan exists)
             if analytic_account and project_plan and analytic_account.plan_id != project_plan:
-                _logger.warning(
-                    f"Project '{project.name}' analytic account is not on Projects plan "
-                    f"(Plan: {analytic_account.plan_id.name if analytic_account.plan_id else 'None'})"
-                )
                 analytic_account = None
+            if analytic_account:
+                project_accounts[project.id] = analytic_account
+            else:
+                # Reported once per run by the profiler (analytic accounting disabled,
+                # no analytic account, or an account outside the Projects plan)
+                profiler.projects_without_account.append(project.id)
+        analytic_accounts = self.env['account.analytic.account'].union(*project_accounts.values())
+        projects_with_account = self.filtered(lambda p: p.id in project_accounts)
+
+        # One grouped read per category for all analytic accounts of the batch
+        with profiler.stage('customer_invoices'):
+            customer_totals = self._get_customer_invoices_from_analytic(analytic_accounts)
+        with profiler.stage('vendor_bills'):
+            vendor_totals = self._get_vendor_bills_from_analytic(analytic_accounts)
+        with profiler.stage('skonto'):
+            skonto_totals = self._get_skonto_from_analytic(analytic_accounts)
+        with profiler.stage('sales_orders'):
+            # Currency rates looked up during this run, per currency, company and day
+            sales_order_totals = projects_with_account._get_sales_order_data(rate_cache={})
+        with profiler.stage('timesheets'):
+            timesheet_totals = self._get_timesheet_costs(analytic_accounts)
+        with profiler.stage('other_costs'):
+            other_costs_totals = self._get_other_costs_from_analytic(analytic_accounts)
+
+        TaskFinancial = self.env['project.task.financial']
+        task_rows = []
+        for project in self:
+            analytic_account = project_accounts.get(project.id)
 
             if not analytic_account:
-                _logger.warning(
-                    f"Project '{project.name}' (ID: {project.id}) has no analytic account linked. "
-                    f"Financial data cannot be calculated. Please ensure: "
-                    f"1) Analytic Accounting is enabled in Accounting settings, "
-                    f"2) This project has an analytic account assigned (Projects plan), "
-                    f"3) Invoice/bill lines have analytic_distribution set."
-                )
                 # Set status fields
                 project.has_analytic_account = False
                 project.data_availability_status = 'no_analytic_account'
@@ -542,6 +619,8 @@ class ProjectAnalytics(models.Model):
                 project.has_sales_orders = False
                 project.total_hours_booked = 0.0
                 project.labor_costs = 0.0
+                project.total_hours_booked_adjusted = 0.0
+                project.labor_costs_adjusted = 0.0
                 project.other_costs_net = 0.0
                 project.total_costs_net = 0.0
                 project.total_all_costs_net = 0.0
@@ -550,57 +629,39 @@ class ProjectAnalytics(models.Model):
                 project.current_calculated_profit_loss = 0.0
                 continue
 
-            # 1. Calculate Customer Invoices (Revenue) - Both NET and GROSS
-            customer_data = self._get_customer_invoices_from_analytic(analytic_account)
+            # 1. Customer Invoices (Revenue) - Both NET and GROSS
+            customer_data = customer_totals[analytic_account.id]
             customer_invoiced_amount_net = customer_data['invoiced_net']
             customer_paid_amount_net = customer_data['paid_net']
             customer_invoiced_amount_gross = customer_data['invoiced_gross']
             customer_paid_amount_gross = customer_data['paid_gross']
-            customer_invoices_net = customer_data['invoices_net']
-            customer_credit_notes_net = customer_data['credit_notes_net']
 
-            # 2. Calculate Vendor Bills (Direct Costs) - Both NET and GROSS
-            vendor_data = self._get_vendor_bills_from_analytic(analytic_account)
+            # 2. Vendor Bills (Direct Costs) - Both NET and GROSS
+            vendor_data = vendor_totals[analytic_account.id]
             vendor_bills_total_net = vendor_data['total_net']
-            vendor_bills_total_gross = vendor_data['total_gross']
-            vendor_bills_net = vendor_data['bills_net']
-            vendor_credit_notes_net = vendor_data['credit_notes_net']
 
-            # 3. Calculate Skonto (Cash Discounts) from analytic lines
-            skonto_data = self._get_skonto_from_analytic(analytic_account)
+            # 3. Skonto (Cash Discounts) from analytic lines
+            skonto_data = skonto_totals[analytic_account.id]
             customer_skonto_taken = skonto_data['customer_skonto']
             vendor_skonto_received = skonto_data['vendor_skonto']
 
-            # 3a. Calculate Sales Order data (confirmed orders linked to project)
-            sales_order_data = self._get_sales_order_data(project)
-            sale_order_amount_net = sales_order_data['amount_net']
-            sale_order_tax_names = sales_order_data['tax_names']
-            has_sales_orders = sales_order_data['has_sales_orders']
+            # 3a. Sales Order data (confirmed orders linked to project)
+            sales_order_data = sales_order_totals[project.id]
 
-            # 4. Calculate Labor Costs (Timesheets) - NET amount
-            timesheet_data = self._get_timesheet_costs(analytic_account)
+            # 4. Labor Costs (Timesheets) - NET amount
+            timesheet_data = timesheet_totals[analytic_account.id]
             total_hours_booked = timesheet_data['hours']
             labor_costs = timesheet_data['costs']
             total_hours_booked_adjusted = timesheet_data['adjusted_hours']
 
-            # 4a. Calculate Adjusted Labor Costs using general hourly rate from system parameters
-            general_hourly_rate = float(
-                self.env['ir.config_parameter'].sudo().get_param(
-                    'project_statistic.general_hourly_rate', default='66.0'
-                )
-            )
+            # 4a. Adjusted Labor Costs using general hourly rate from system parameters
             labor_costs_adjusted = total_hours_booked_adjusted * general_hourly_rate
 
-            # 4b. Calculate Adjusted Vendor Bill Amount using surcharge factor from system parameters
-            vendor_bill_surcharge_factor = float(
-                self.env['ir.config_parameter'].sudo().get_param(
-                    'project_statistic.vendor_bill_surcharge_factor', default='1.30'
-                )
-            )
+            # 4b. Adjusted Vendor Bill Amount using surcharge factor from system parameters
             adjusted_vendor_bill_amount = vendor_bills_total_net * vendor_bill_surcharge_factor
 
-            # 5. Calculate Other Costs (non-timesheet, non-bill analytic lines) - NET amount
-            other_costs_net = self._get_other_costs_from_analytic(analytic_account)
+            # 5. Other Costs (non-timesheet, non-bill analytic lines) - NET amount
+            other_costs_net = other_costs_totals[analytic_account.id]['amount']
 
             # 6. Calculate totals
             customer_outstanding_amount_net = customer_invoiced_amount_net - customer_paid_amount_net
@@ -636,21 +697,21 @@ class ProjectAnalytics(models.Model):
             project.customer_invoiced_amount_gross = customer_invoiced_amount_gross
             project.customer_paid_amount_gross = customer_paid_amount_gross
             project.customer_outstanding_amount_gross = customer_outstanding_amount_gross
-            project.customer_invoices_net = customer_invoices_net
-            project.customer_credit_notes_net = customer_credit_notes_net
+            project.customer_invoices_net = customer_data['invoices_net']
+            project.customer_credit_notes_net = customer_data['credit_notes_net']
 
             project.vendor_bills_total_net = vendor_bills_total_net
-            project.vendor_bills_total_gross = vendor_bills_total_gross
-            project.vendor_bills_net = vendor_bills_net
-            project.vendor_credit_notes_net = vendor_credit_notes_net
+            project.vendor_bills_total_gross = vendor_data['total_gross']
+            project.vendor_bills_net = vendor_data['bills_net']
+            project.vendor_credit_notes_net = vendor_data['credit_notes_net']
             project.adjusted_vendor_bill_amount = adjusted_vendor_bill_amount
 
             project.customer_skonto_taken = customer_skonto_taken
             project.vendor_skonto_received = vendor_skonto_received
 
-            project.sale_order_amount_net = sale_order_amount_net
-            project.sale_order_tax_names = sale_order_tax_names
-            project.has_sales_orders = has_sales_orders
+            project.sale_order_amount_net = sales_order_data['amount_net']
+            project.sale_order_tax_names = sales_order_data['tax_names']
+            project.has_sales_orders = sales_order_data['has_sales_orders']
 
             project.total_hours_booked = total_hours_booked
             project.labor_costs = labor_costs
@@ -664,7 +725,26 @@ class ProjectAnalytics(models.Model):
             project.negative_difference_net = negative_difference_net
             project.current_calculated_profit_loss = current_calculated_profit_loss
 
-    def _get_customer_invoices_from_analytic(self, analytic_account):
+            # 9. Per-task breakdown from the same timesheet and other cost totals
+            if project.id:
+                task_rows += TaskFinancial._prepare_rows(
+                    project, timesheet_data, other_costs_totals[analytic_account.id], general_hourly_rate,
+                )
+
+            if _logger.isEnabledFor(logging.DEBUG):
+                _logger.debug(
+                    "Project %s (analytic %s): %s invoice line(s) NET=%.2f, %s bill line(s) NET=%.2f, "
+                    "hours=%.2f, other costs=%.2f, P/L NET=%.2f",
+                    project.id, analytic_account.id,
+                    customer_data['matched_lines'], customer_invoiced_amount_net,
+                    vendor_data['matched_lines'], vendor_bills_total_net,
+                    total_hours_booked, other_costs_net, profit_loss_net,
+                )
+
+        # New records (form onchange) have no rows yet
+        TaskFinancial._replace_project_rows(self.filtered('id').ids, task_rows)
+
+    def _get_customer_invoices_from_analytic(self, analytic_accounts):
         """
         Get customer invoices and credit notes via analytic_distribution in account.move.line.
         This is the Odoo v18 way to link invoices to projects.
@@ -672,6 +752,8 @@ class ProjectAnalytics(models.Model):
         IMPORTANT: We calculate BOTH NET and GROSS amounts:
         - NET: price_subtotal (base amount without taxes)
         - GROSS: price_total (total amount including all taxes)
+        Both are converted to company currency with the line's own rate
+        (see _get_distributed_move_line_totals).
 
         We must calculate the project portion based on invoice LINE amounts,
         not full invoice amounts, because different lines may go to different projects.
@@ -680,103 +762,45 @@ class ProjectAnalytics(models.Model):
         - out_invoice: Customer invoices (positive revenue)
         - out_refund: Customer credit notes (negative revenue)
 
+        Args:
+            analytic_accounts: account.analytic.account records of the projects
+
         Returns:
-            dict: {
+            defaultdict: {analytic account id: {
                 'invoiced_net': float,
                 'paid_net': float,
                 'invoiced_gross': float,
                 'paid_gross': float,
                 'invoices_net': float,  # Only out_invoice (positive)
                 'credit_notes_net': float,  # Only out_refund (negative)
-            }
+                'matched_lines': int,  # Lines distributed to this account
+            }}
         """
-        result = {
+        result = defaultdict(lambda: {
             'invoiced_net': 0.0,
             'paid_net': 0.0,
             'invoiced_gross': 0.0,
             'paid_gross': 0.0,
             'invoices_net': 0.0,
             'credit_notes_net': 0.0,
-        }
-
-        # Find all posted customer invoice/credit note lines with this analytic account
-        # RELAXED FILTER: Removed account_type filter to catch all invoice lines
-        # German accounting (SKR03/SKR04) might use different account types
-        invoice_lines = self.env['account.move.line'].search([
-            ('analytic_distribution', '!=', False),
-            ('parent_state', '=', 'posted'),
-            ('move_id.move_type', 'in', ['out_invoice', 'out_refund']),
-            ('display_type', 'not in', ['line_section', 'line_note']),  # Exclude section/note lines
-        ])
-
-        _logger.info(f"Found {len(invoice_lines)} potential invoice lines (before analytic filter)")
-
-        matched_lines = 0
-        for line in invoice_lines:
-            if not line.analytic_distribution:
-                continue
-
-            # Skip reversal entries (Storno) - they cancel out the original entry
-            # In Odoo 18, only reversed_entry_id exists (reversal_move_id was removed)
-            if line.move_id.reversed_entry_id:
-                continue
-
-            # Parse the analytic_distribution JSON
-            try:
-                distribution = line.analytic_distribution
-                if isinstance(distribution, str):
-                    distribution = json.loads(distribution)
-
-                # Check if this project's analytic account is in the distribution
-                if str(analytic_account.id) in distribution:
-                    matched_lines += 1
-                    # Get the percentage allocated to this project for THIS LINE
-                    percentage = distribution.get(str(analytic_account.id), 0.0) / 100.0
-
-                    # Get the invoice to calculate payment proportion
-                    invoice = line.move_id
-
-                    # Calculate this line's contribution to the project
-                    # NET: price_subtotal (without taxes)
-                    line_amount_net = line.price_subtotal * percentage
-                    # GROSS: price_total (with taxes)
-                    line_amount_gross = line.price_total * percentage
-
-                    # Separate tracking for invoices vs credit notes
-                    if invoice.move_type == 'out_invoice':
-                        # Regular invoices: positive amounts
-                        result['invoices_net'] += line_amount_net
-                    elif invoice.move_type == 'out_refund':
-                        # Credit notes: store as negative amounts
-                        result['credit_notes_net'] += -abs(line_amount_net)
-                        # For total calculation, make credit notes negative
-                        line_amount_net = -abs(line_amount_net)
-                        line_amount_gross = -abs(line_amount_gross)
-
-                    result['invoiced_net'] += line_amount_net
-                    result['invoiced_gross'] += line_amount_gross
-
-                    _logger.info(f"  - Invoice {invoice.name}: NET={line_amount_net:.2f}, GROSS={line_amount_gross:.2f}, Account={line.account_id.code} ({line.account_id.account_type})")
-
-                    # Calculate paid amount for this line
-                    # Payment proportion = (invoice.amount_total - invoice.amount_residual) / invoice.amount_total
-                    if abs(invoice.amount_total) > 0:
-                        payment_ratio = (invoice.amount_total - invoice.amount_residual) / invoice.amount_total
-                        line_paid_net = line_amount_net * payment_ratio
-                        line_paid_gross = line_amount_gross * payment_ratio
-                        result['paid_net'] += line_paid_net
-                        result['paid_gross'] += line_paid_gross
-
-            except Exception as e:
-                _logger.warning(f"Error parsing analytic_distribution for line {line.id}: {e}")
-                continue
-
-        _logger.info(f"Matched {matched_lines} invoice lines for analytic account {analytic_account.id}")
-        _logger.info(f"Result: NET invoiced={result['invoiced_net']:.2f}, GROSS invoiced={result['invoiced_gross']:.2f}")
-
+            'matched_lines': 0,
+        })
+        totals = self._get_distributed_move_line_totals(
+            analytic_accounts, 'out_invoice', 'out_refund', 'customer_invoices', 'Invoice',
+        )
+        for account_id, values in totals.items():
+            result[account_id] = {
+                'invoiced_net': values['total_net'],
+                'paid_net': values['paid_net'],
+                'invoiced_gross': values['total_gross'],
+                'paid_gross': values['paid_gross'],
+                'invoices_net': values['documents_net'],
+                'credit_notes_net': values['refunds_net'],
+                'matched_lines': values['matched_lines'],
+            }
         return result
 
-    def _get_vendor_bills_from_analytic(self, analytic_account):
+    def _get_vendor_bills_from_analytic(self, analytic_accounts):
         """
         Get vendor bills and refunds via analytic_distribution in account.move.line.
         This is the Odoo v18 way to link bills to projects.
@@ -784,6 +808,8 @@ class ProjectAnalytics(models.Model):
         IMPORTANT: We calculate BOTH NET and GROSS amounts:
         - NET: price_subtotal (base amount without taxes)
         - GROSS: price_total (total amount including all taxes)
+        Both are converted to company currency with the line's own rate
+        (see _get_distributed_move_line_totals).
 
         We must calculate the project portion based on bill LINE amounts,
         not full bill amounts, because different lines may go to different projects.
@@ -792,96 +818,194 @@ class ProjectAnalytics(models.Model):
         - in_invoice: Vendor bills (positive cost)
         - in_refund: Vendor refunds (negative cost)
 
+        Args:
+            analytic_accounts: account.analytic.account records of the projects
+
         Returns:
-            dict: {
+            defaultdict: {analytic account id: {
                 'total_net': float,
                 'total_gross': float,
                 'bills_net': float,  # Only in_invoice (positive)
                 'credit_notes_net': float,  # Only in_refund (negative)
-            }
+                'matched_lines': int,  # Lines distributed to this account
+            }}
         """
-        result = {
+        result = defaultdict(lambda: {
             'total_net': 0.0,
             'total_gross': 0.0,
             'bills_net': 0.0,
             'credit_notes_net': 0.0,
-        }
+            'matched_lines': 0,
+        })
+        totals = self._get_distributed_move_line_totals(
+            analytic_accounts, 'in_invoice', 'in_refund', 'vendor_bills', 'Bill',
+        )
+        for account_id, values in totals.items():
+            result[account_id] = {
+                'total_net': values['total_net'],
+                'total_gross': values['total_gross'],
+                'bills_net': values['documents_net'],
+                'credit_notes_net': values['refunds_net'],
+                'matched_lines': values['matched_lines'],
+            }
+        return result
 
-        # Find all posted vendor bill/refund lines with this analytic account
-        # RELAXED FILTER: Removed account_type filter to catch all bill lines
-        # German accounting (SKR03/SKR04) might use different account types
-        bill_lines = self.env['account.move.line'].search([
-            ('analytic_distribution', '!=', False),
-            ('parent_state', '=', 'posted'),
-            ('move_id.move_type', 'in', ['in_invoice', 'in_refund']),
-            ('display_type', 'not in', ['line_section', 'line_note']),  # Exclude section/note lines
-        ])
+    def _get_distributed_move_line_totals(self, analytic_accounts, document_type, refund_type, stage, label):
+        """
+        Sum the posted document lines distributed to the given analytic accounts.
 
-        _logger.info(f"Found {len(bill_lines)} potential bill lines (before analytic filter)")
+        analytic_distribution is expanded with jsonb_each_text and grouped by
+        its key, so the lines of all accounts are read in one query. Only exact
+        keys match (a line distributed to '12' counts for account 12, a
+        multi-plan key such as '12,40' does not), as before the batching.
 
-        matched_lines = 0
-        for line in bill_lines:
-            if not line.analytic_distribution:
-                continue
+        Per line and account:
+        - amount = price_subtotal / price_total * currency ratio * percentage / 100
+        - currency ratio = |balance / amount_currency|, i.e. the rate the line was
+          posted with (1.0 for company-currency lines), so the result matches the books
+        - refund lines count negative
+        - paid share = amount * (amount_total - amount_residual) / amount_total of the document
+        Reversal entries (Storno, reversed_entry_id set) and section/note lines are skipped.
 
-            # Skip reversal entries (Storno) - they cancel out the original entry
-            # In Odoo 18, only reversed_entry_id exists (reversal_move_id was removed)
-            if line.move_id.reversed_entry_id:
-                continue
+        Args:
+            analytic_accounts: account.analytic.account records
+            document_type: Move type of the documents, e.g. 'out_invoice'
+            refund_type: Move type of the refunds, e.g. 'out_refund'
+            stage: Profiler stage the matched lines are counted for
+            label: Document label of the trace lines ('Invoice', 'Bill')
 
-            # Parse the analytic_distribution JSON
-            try:
-                distribution = line.analytic_distribution
-                if isinstance(distribution, str):
-                    distribution = json.loads(distribution)
-
-                # Check if this project's analytic account is in the distribution
-                if str(analytic_account.id) in distribution:
-                    matched_lines += 1
-                    # Get the percentage allocated to this project for THIS LINE
-                    percentage = distribution.get(str(analytic_account.id), 0.0) / 100.0
-
-                    # Get the bill to check type
-                    bill = line.move_id
-
-                    # Calculate this line's contribution to the project
-                    # NET: price_subtotal (without taxes)
-                    line_amount_net = line.price_subtotal * percentage
-                    # GROSS: price_total (with taxes)
-                    line_amount_gross = line.price_total * percentage
-
-                    # Separate tracking for bills vs refunds
-                    if bill.move_type == 'in_invoice':
-                        # Regular vendor bills: positive amounts
-                        result['bills_net'] += line_amount_net
-                    elif bill.move_type == 'in_refund':
-                        # Vendor refunds: store as negative amounts
-                        result['credit_notes_net'] += -abs(line_amount_net)
-                        # For total calculation, make refunds negative
-                        line_amount_net = -abs(line_amount_net)
-                        line_amount_gross = -abs(line_amount_gross)
-
-                    result['total_net'] += line_amount_net
-                    result['total_gross'] += line_amount_gross
-
-                    _logger.info(f"  - Bill {bill.name}: NET={line_amount_net:.2f}, GROSS={line_amount_gross:.2f}, Account={line.account_id.code} ({line.account_id.account_type})")
+        Returns:
+            dict: {analytic account id: {'total_net', 'total_gross', 'documents_net',
+                   'refunds_net', 'paid_net', 'paid_gross', 'matched_lines'}}
+        """
+        if not analytic_accounts:
+            return {}
+
+        lines, grouped = self._get_distributed_move_line_totals_sql(analytic_accounts, document_type, refund_type)
+        self.env.cr.execute(grouped)
+        totals = {}
+        for account_id, total_net, total_gross, documents_net, refunds_net, paid_net, paid_gross, count \
+                in self.env.cr.fetchall():
+            totals[account_id] = {
+                'total_net': float(total_net),
+                'total_gross': float(total_gross),
+                'documents_net': float(documents_net),
+                'refunds_net': float(refunds_net),
+                'paid_net': float(paid_net),
+                'paid_gross': float(paid_gross),
+                'matched_lines': count,
+            }
+            add_rows(stage, count)
 
-            except Exception as e:
-                _logger.warning(f"Error parsing analytic_distribution for bill line {line.id}: {e}")
-                continue
+        traced_ids = [account_id for account_id in analytic_accounts.ids if is_traced(account_id)]
+        if traced_ids:
+            self._trace_distributed_move_lines(lines, traced_ids, label)
+        return totals
 
-        _logger.info(f"Matched {matched_lines} bill lines for analytic account {analytic_account.id}")
-        _logger.info(f"Result: NET bills={result['total_net']:.2f}, GROSS bills={result['total_gross']:.2f}")
+    def _get_distributed_move_line_totals_sql(self, analytic_accounts, document_type, refund_type):
+        """
+        SQL of _get_distributed_move_line_totals (also EXPLAINed by the diagnostic script).
 
-        return result
+        Returns:
+            tuple: (SQL of the per-line contributions, SQL of the totals grouped by analytic account)
+        """
+        Line = self.env['account.move.line']
+        query = Line._search([
+            ('analytic_distribution', '!=', False),
+            ('parent_state', '=', 'posted'),
+            ('display_type', 'not in', ['line_section', 'line_note']),  # Exclude section/note lines
+        ])
+        move_alias = query.make_alias(query.table, 'move_id')
+        query.add_join('JOIN', move_alias, 'account_move', SQL(
+            "%s = %s", SQL.identifier(move_alias, 'id'), SQL.identifier(query.table, 'move_id'),
+        ))
+        query.add_join('JOIN', 'distribution', SQL(
+            "LATERAL jsonb_each_text(%s)", SQL.identifier(query.table, 'analytic_distribution'),
+        ), SQL(
+            "%s IN %s", SQL.identifier('distribution', 'key'), tuple(str(account_id) for account_id in analytic_accounts.ids),
+        ))
+        move_type = SQL.identifier(move_alias, 'move_type')
+        query.add_where(SQL("%s IN %s", move_type, (document_type, refund_type)))
+        # Skip reversal entries (Storno) - they cancel out the original entry
+        query.add_where(SQL("%s IS NULL", SQL.identifier(move_alias, 'reversed_entry_id')))
+
+        def line_field(fname):
+            return Line._field_to_sql(query.table, fname, query)
+
+        is_refund = SQL("%s = %s", move_type, refund_type)
+        amount_currency = line_field('amount_currency')
+        share = SQL(
+            "CASE WHEN %s = %s OR COALESCE(%s, 0) = 0 THEN 1.0 ELSE ABS(%s / %s) END"
+            " * %s::numeric / 100",
+            line_field('currency_id'), line_field('company_currency_id'), amount_currency,
+            line_field('balance'), amount_currency,
+            SQL.identifier('distribution', 'value'),
+        )
+        amount_total = SQL.identifier(move_alias, 'amount_total')
+        lines = query.select(
+            SQL("%s::int AS analytic_account_id", SQL.identifier('distribution', 'key')),
+            SQL("%s AS line_id", SQL.identifier(query.table, 'id')),
+            SQL("%s AS move_id", SQL.identifier(query.table, 'move_id')),
+            SQL("%s AS account_id", line_field('account_id')),
+            SQL("%s AS is_refund", is_refund),
+            SQL("CASE WHEN %s THEN -ABS(%s * %s) ELSE %s * %s END AS amount_net",
+                is_refund, line_field('price_subtotal'), share, line_field('price_subtotal'), share),
+            SQL("CASE WHEN %s THEN -ABS(%s * %s) ELSE %s * %s END AS amount_gross",
+                is_refund, line_field('price_total'), share, line_field('price_total'), share),
+            SQL("CASE WHEN %s <> 0 THEN (%s - %s) / %s ELSE 0 END AS payment_ratio",
+                amount_total, amount_total, SQL.identifier(move_alias, 'amount_residual'), amount_total),
+        )
 
-    def _get_skonto_from_analytic(self, analytic_account):
+        grouped = SQL("""
+            SELECT line.analytic_account_id,
+                   COALESCE(SUM(line.amount_net), 0),
+                   COALESCE(SUM(line.amount_gross), 0),
+                   COALESCE(SUM(line.amount_net) FILTER (WHERE NOT line.is_refund), 0),
+                   COALESCE(SUM(line.amount_net) FILTER (WHERE line.is_refund), 0),
+                   COALESCE(SUM(line.amount_net * line.payment_ratio), 0),
+                   COALESCE(SUM(line.amount_gross * line.payment_ratio), 0),
+                   COUNT(*)
+              FROM (%s) AS line
+             GROUP BY line.analytic_account_id
+        """, lines)
+        return lines, grouped
+
+    def _trace_distributed_move_lines(self, lines, analytic_account_ids, label):
+        """
+        Write the per-line trace of the matched document lines of traced accounts.
+
+        Args:
+            lines: SQL of the per-line contributions (see _get_distributed_move_line_totals)
+            analytic_account_ids: Traced analytic account ids
+            label: Document label ('Invoice', 'Bill')
+        """
+        self.env.cr.execute(SQL("""
+            SELECT line.analytic_account_id, line.move_id, line.account_id, line.amount_net, line.amount_gross
+              FROM (%s) AS line
+             WHERE line.analytic_account_id IN %s
+             ORDER BY line.analytic_account_id, line.line_id
+        """, lines, tuple(analytic_account_ids)))
+        rows = self.env.cr.fetchall()
+        move_names = {move.id: move.name for move in self.env['account.move'].browse({row[1] for row in rows})}
+        accounts = {
+            account.id: (account.code, account.account_type)
+            for account in self.env['account.account'].browse({row[2] for row in rows if row[2]})
+        }
+        for account_id, move_id, general_account_id, amount_net, amount_gross in rows:
+            code, account_type = accounts.get(general_account_id, (None, None))
+            trace("Analytic %s - %s %s: NET=%.2f, GROSS=%.2f, Account=%s (%s)",
+                  account_id, label, move_names[move_id], amount_net, amount_gross, code, account_type)
+
+    def _get_skonto_from_analytic(self, analytic_accounts):
         """
         Get Skonto (cash discounts) by querying analytic lines from discount accounts.
 
         This is a simpler and more reliable approach than analyzing reconciliation.
         Skonto entries are typically posted to specific accounts with analytic distribution.
 
+        The discount accounts come from the company's account classification
+        (project.account.classification). Without rules the defaults apply:
+
         Customer Skonto (Gewährte Skonti):
         - Accounts 7300-7303 (expense - reduces profit)
         - Account 2130 (liability account for customer discounts)
@@ -890,68 +1014,119 @@ class ProjectAnalytics(models.Model):
         - Accounts 4730-4733 (income - increases profit)
         - Account 2670 (asset account for vendor discounts)
 
-        Returns:
-            dict: {'customer_skonto': amount, 'vendor_skonto': amount}
-        """
-        result = {'customer_skonto': 0.0, 'vendor_skonto': 0.0}
-
-        # Get all analytic lines for this account
-        analytic_lines = self.env['account.analytic.line'].search([
-            ('account_id', '=', analytic_account.id)
-        ])
+        The lines of all accounts are summed in one query grouped by analytic
+        and general account; the sums are then classified with the rules of the
+        company of each analytic account.
 
-        for line in analytic_lines:
-            if not line.move_line_id or not line.move_line_id.account_id:
-                continue
-
-            account_code = line.move_line_id.account_id.code
-            if not account_code:
-                continue
+        Args:
+            analytic_accounts: account.analytic.account records of the projects
 
-            # Customer Skonto (Gewährte Skonti) - expense accounts 7300-7303 + liability 2130
-            # These reduce our revenue/profit (customer got discount)
-            if account_code.startswith(('7300', '7301', '7302', '7303', '2130')):
-                result['customer_skonto'] += abs(line.amount)
+        Returns:
+            defaultdict: {analytic account id: {'customer_skonto': amount, 'vendor_skonto': amount}}
+        """
+        result = defaultdict(lambda: {'customer_skonto': 0.0, 'vendor_skonto': 0.0})
 
-            # Vendor Skonto (Erhaltene Skonti) - income accounts 4730-4733 + asset 2670
-            # These increase our profit (we got discount from vendor)
-            elif account_code.startswith(('4730', '4731', '4732', '4733', '2670')):
-                result['vendor_skonto'] += abs(line.amount)
+        Classification = self.env['project.account.classification']
+        compiled = {
+            account.id: Classification._get_category_account_ids((account.company_id or self.env.company).id)
+            for account in analytic_accounts
+        }
+        skonto_account_ids = set()
+        for categories in compiled.values():
+            skonto_account_ids |= categories['customer_skonto'] | categories['vendor_skonto']
+        if not skonto_account_ids:
+            return result
 
+        self.env.cr.execute(self._get_skonto_sql(analytic_accounts, skonto_account_ids))
+        for account_id, general_account_id, amount, line_count in self.env.cr.fetchall():
+            add_rows('skonto', line_count)
+            categories = compiled[account_id]
+            if general_account_id in categories['customer_skonto']:
+                result[account_id]['customer_skonto'] += float(amount)
+            if general_account_id in categories['vendor_skonto']:
+                result[account_id]['vendor_skonto'] += float(amount)
         return result
 
-    def _get_timesheet_costs(self, analytic_account):
+    def _get_skonto_sql(self, analytic_accounts, skonto_account_ids):
+        """SQL of _get_skonto_from_analytic: analytic lines summed per analytic and general account."""
+        query = self.env['account.analytic.line']._search([
+            ('account_id', 'in', analytic_accounts.ids),
+            ('general_account_id', 'in', sorted(skonto_account_ids)),
+        ])
+        analytic_account = SQL.identifier(query.table, 'account_id')
+        general_account = SQL.identifier(query.table, 'general_account_id')
+        query.groupby = SQL("%s, %s", analytic_account, general_account)
+        return query.select(
+            analytic_account,
+            general_account,
+            SQL("COALESCE(SUM(ABS(%s)), 0)", SQL.identifier(query.table, 'amount')),
+            SQL("COUNT(*)"),
+        )
+
+    def _get_timesheet_costs(self, analytic_accounts):
         """
         Get timesheet hours and costs from account.analytic.line.
         Timesheets have is_timesheet=True.
 
         Returns NET amounts (timesheets don't have VAT).
         Also calculates adjusted hours based on employee HFC factors.
-        """
-        result = {'hours': 0.0, 'costs': 0.0, 'adjusted_hours': 0.0}
+        Lines are summed per analytic account, employee and task in one query;
+        the same pass yields the project totals and the per-task breakdown
+        (project.task.financial).
 
-        # Find all timesheet lines for this analytic account
-        timesheet_lines = self.env['account.analytic.line'].search([
-            ('account_id', '=', analytic_account.id),
-            ('is_timesheet', '=', True)
-        ])
+        Args:
+            analytic_accounts: account.analytic.account records of the projects
 
-        for line in timesheet_lines:
-            hours = line.unit_amount or 0.0
-            result['hours'] += hours
-            result['costs'] += abs(line.amount or 0.0)
+        Returns:
+            defaultdict: {analytic account id: {
+                'hours', 'costs', 'adjusted_hours',
+                'tasks': {task id or None: {'hours', 'costs', 'adjusted_hours'}},
+            }}
+        """
+        def empty_totals():
+            return {'hours': 0.0, 'costs': 0.0, 'adjusted_hours': 0.0}
 
-            # Calculate adjusted hours using employee HFC factor
-            if line.employee_id and hasattr(line.employee_id, 'faktor_hfc'):
-                faktor_hfc = line.employee_id.faktor_hfc or 1.0
-                result['adjusted_hours'] += hours * faktor_hfc
-            else:
-                # If no employee or no HFC factor, use 1.0 (no adjustment)
-                result['adjusted_hours'] += hours
+        result = defaultdict(lambda: dict(empty_totals(), tasks=defaultdict(empty_totals)))
+        if not analytic_accounts:
+            return result
+
+        self.env.cr.execute(self._get_timesheet_costs_sql(analytic_accounts))
+        rows = self.env.cr.fetchall()
+        employees = self.env['hr.employee'].browse({row[1] for row in rows if row[1]})
+        # HFC factor per employee (1.0 when not set: no adjustment)
+        faktor_hfc = {employee.id: employee.faktor_hfc or 1.0 for employee in employees}
+
+        for account_id, employee_id, task_id, hours, costs, line_count in rows:
+            add_rows('timesheets', line_count)
+            # Lines without employee are not adjusted
+            adjusted_hours = hours * faktor_hfc.get(employee_id, 1.0)
+            for totals in (result[account_id], result[account_id]['tasks'][task_id]):
+                totals['hours'] += hours
+                totals['costs'] += float(costs)
+                totals['adjusted_hours'] += adjusted_hours
 
         return result
 
-    def _get_other_costs_from_analytic(self, analytic_account):
+    def _get_timesheet_costs_sql(self, analytic_accounts):
+        """SQL of _get_timesheet_costs: timesheet lines summed per analytic account, employee and task."""
+        query = self.env['account.analytic.line']._search([
+            ('account_id', 'in', analytic_accounts.ids),
+            ('is_timesheet', '=', True)
+        ])
+        analytic_account = SQL.identifier(query.table, 'account_id')
+        employee = SQL.identifier(query.table, 'employee_id')
+        task = SQL.identifier(query.table, 'task_id')
+        query.groupby = SQL("%s, %s, %s", analytic_account, employee, task)
+        return query.select(
+            analytic_account,
+            employee,
+            task,
+            SQL("COALESCE(SUM(%s), 0)", SQL.identifier(query.table, 'unit_amount')),
+            SQL("COALESCE(SUM(ABS(%s)), 0)", SQL.identifier(query.table, 'amount')),
+            SQL("COUNT(*)"),
+        )
+
+    def _get_other_costs_from_analytic(self, analytic_accounts):
         """
         Get other costs from analytic lines that are NOT already counted elsewhere.
 
@@ -984,7 +1159,8 @@ class ProjectAnalytics(models.Model):
         5. Reversed/Cancelled Entries (reversed_entry_id exists)
            → Storno entries that cancel out original entries
 
-        6. Cash Discount Accounts (Skonto: 7300-7303, 2130, 4730-4733, 2670)
+        6. Classified Accounts (project.account.classification, by default
+           Skonto: 7300-7303, 2130, 4730-4733, 2670)
            → Counted separately via _get_skonto_from_analytic()
 
         INCLUDED (real "other costs"):
@@ -1002,56 +1178,95 @@ class ProjectAnalytics(models.Model):
           b) Monthly deferral entries (move_type='entry') → Excluded here ✓
         - This ensures the cost is counted ONCE, not once per deferral period
 
-        Returns NET amounts (negative values converted to positive).
-        """
-        other_costs = 0.0
-
-        # Skonto account codes (to exclude from other costs as they're counted separately)
-        skonto_account_codes = ['7300', '7301', '7302', '7303', '2130', '4730', '4731', '4732', '4733', '2670']
+        The lines of all accounts are summed in one query grouped by analytic
+        account and task; the query itself excludes the move lines booked on
+        the classified accounts of each analytic account's company. Costs booked
+        with a task are the directly attributable costs of that task
+        (project.task.financial).
 
-        # Find all cost lines (negative amounts, not timesheets)
-        # First get all potential cost lines
-        cost_lines = self.env['account.analytic.line'].search([
-            ('account_id', '=', analytic_account.id),
-            ('amount', '<', 0),
-            ('is_timesheet', '=', False)
-        ])
-
-        _logger.debug(f"Analyzing other costs for account {analytic_account.id} ({analytic_account.name})")
-
-        for line in cost_lines:
-            should_include = True
+        Args:
+            analytic_accounts: account.analytic.account records of the projects
 
-            # Check if line has a move_line_id (comes from accounting entry)
-            if line.move_line_id:
-                move = line.move_line_id.move_id
-                account = line.move_line_id.account_id
+        Returns:
+            defaultdict: {analytic account id: {
+                'amount': NET amount (negative values converted to positive),
+                'tasks': {task id or None: NET amount},
+            }}
+        """
+        result = defaultdict(lambda: {'amount': 0.0, 'tasks': defaultdict(float)})
+        if not analytic_accounts:
+            return result
 
-                # Skip if from any invoice or bill type
-                if move:
-                    move_type = move.move_type
-                    if move_type in ['in_invoice', 'in_refund', 'out_invoice', 'out_refund']:
-                        should_include = False
+        self.env.cr.execute(self._get_other_costs_sql(
+            analytic_accounts, self._get_classified_account_ids(analytic_accounts),
+        ))
+        for account_id, task_id, amount, line_count in self.env.cr.fetchall():
+            add_rows('other_costs', line_count)
+            result[account_id]['amount'] += float(amount)
+            result[account_id]['tasks'][task_id] += float(amount)
 
-                    # Skip journal entries (type 'entry') - these include deferrals and other auto-generated entries
-                    # Deferred expenses from vendor bills create journal entries that shouldn't be counted separately
-                    # Real manual cost entries should be created directly as analytic lines without move_line_id
-                    elif move_type == 'entry':
-                        should_include = False
+        _logger.debug("Other costs of %s analytic account(s): %s", len(analytic_accounts),
+                      {account_id: totals['amount'] for account_id, totals in result.items()})
+        return result
 
-                    # Skip reversed entries to avoid counting cancellations twice
-                    elif move.reversed_entry_id:
-                        should_include = False
+    def _get_classified_account_ids(self, analytic_accounts):
+        """
+        General accounts classified in any category (skonto, ...) for the
+        company of each analytic account, same prefix semantics as
+        _get_skonto_from_analytic().
 
-                # Skip Skonto/cash discount accounts (counted separately)
-                if should_include and account and account.code in skonto_account_codes:
-                    should_include = False
+        Returns:
+            dict: {analytic account id: set of account.account ids}
+        """
+        Classification = self.env['project.account.classification']
+        result = {}
+        for account in analytic_accounts:
+            compiled = Classification._get_category_account_ids((account.company_id or self.env.company).id)
+            result[account.id] = set().union(*compiled.values())
+        return result
 
-            if should_include:
-                other_costs += abs(line.amount)
+    def _get_other_costs_sql(self, analytic_accounts, classified_account_ids):
+        """
+        SQL of _get_other_costs_from_analytic: cost lines summed per analytic account and task.
 
-        _logger.debug(f"Total other costs for account {analytic_account.id}: {other_costs:.2f}")
-        return other_costs
+        Args:
+            analytic_accounts: account.analytic.account records of the projects
+            classified_account_ids: {analytic account id: set of general account ids}
+                                    whose move lines are counted elsewhere
+        """
+        # Move lines on classified accounts are excluded, per set of classified
+        # accounts (one per company in practice)
+        accounts_by_classified = defaultdict(list)
+        for account_id in analytic_accounts.ids:
+            accounts_by_classified[frozenset(classified_account_ids.get(account_id, ()))].append(account_id)
+        unclassified_domain = []
+        for classified, account_ids in accounts_by_classified.items():
+            branch = [('account_id', 'in', account_ids)]
+            if classified:
+                branch = ['&'] + branch + [('general_account_id', 'not in', sorted(classified))]
+            unclassified_domain = (['|'] + unclassified_domain + branch) if unclassified_domain else branch
+
+        # Cost lines (negative amounts, not timesheets) either without accounting
+        # entry or from a move that is no invoice/bill/journal entry and no reversal
+        query = self.env['account.analytic.line']._search([
+            ('account_id', 'in', analytic_accounts.ids),
+            ('amount', '<', 0),
+            ('is_timesheet', '=', False),
+            '|',
+            ('move_line_id', '=', False),
+            '&', '&',
+            ('move_line_id.move_id.move_type', 'not in', ['in_invoice', 'in_refund', 'out_invoice', 'out_refund', 'entry']),
+            ('move_line_id.move_id.reversed_entry_id', '=', False),
+        ] + unclassified_domain)
+        analytic_account = SQL.identifier(query.table, 'account_id')
+        task = SQL.identifier(query.table, 'task_id')
+        query.groupby = SQL("%s, %s", analytic_account, task)
+        return query.select(
+            analytic_account,
+            task,
+            SQL("COALESCE(SUM(ABS(%s)), 0)", SQL.identifier(query.table, 'amount')),
+            SQL("COUNT(*)"),
+        )
 
     def action_view_account_analytic_line(self):
         """
@@ -1149,26 +1364,18 @@ class ProjectAnalytics(models.Model):
                 }
             }
 
-        # Find all account.move.line records with this analytic account in distribution
-        # Then get the unique parent moves
-        move_lines = self.env['account.move.line'].search([
-            ('analytic_distribution', '!=', False),
-            ('parent_state', '=', 'posted'),
-        ])
-
-        # Filter for lines that have this analytic account
-        move_ids = set()
-        analytic_id_str = str(analytic_account.id)
-        for line in move_lines:
-            if line.analytic_distribution and analytic_id_str in line.analytic_distribution:
-                move_ids.add(line.move_id.id)
-
+        # Let the database resolve the moves when the list is opened. Only
+        # exact distribution keys match, as in the financial totals: a
+        # multi-plan key ("12,34") counts for neither account.
         return {
             'type': 'ir.actions.act_window',
             'name': _('Account Moves - %s') % self.name,
             'res_model': 'account.move',
             'view_mode': 'list,form',
-            'domain': [('id', 'in', list(move_ids))],
+            'domain': [
+                ('line_ids.distribution_analytic_account_ids', 'in', [analytic_account.id]),
+                ('state', '=', 'posted'),
+            ],
             'context': {'search_default_posted': 1},
             'target': 'current',
         }
@@ -1214,64 +1421,109 @@ class ProjectAnalytics(models.Model):
             'context': dict(self.env.context, form_view_initial_mode='readonly'),
         }
 
-    def _get_sales_order_data(self, project):
+    def _get_sales_order_data(self, rate_cache=None):
         """
-        Get sales order data for the project: total NET amount and tax codes.
+        Get sales order data of the projects in self: total NET amount and tax codes.
 
         Only includes confirmed sales orders (state in ['sale', 'done']).
         Sales orders are linked via project_id field (standard Odoo field).
+        Amounts are converted to the project's company currency with the rate
+        stored on the order (currency_rate); orders without one fall back to the
+        rate of the order date, looked up once per currency and day.
+        The orders of all projects are read in one query, their taxes in one
+        grouped query.
 
         FALLBACK: If no sales orders are found, uses manual_sales_order_amount_net field.
 
         Args:
-            project: project.project record
+            rate_cache: Optional dict shared by all projects of a compute run
 
         Returns:
-            dict: {
+            dict: {project id: {
                 'amount_net': float,  # Total untaxed amount (price_subtotal) or manual fallback
                 'tax_names': str,     # Comma-separated tax names
                 'has_sales_orders': bool,  # Whether linked sales orders exist
-            }
+            }}
         """
+        # FALLBACK: Use manual amount if no sales orders found
         result = {
-            'amount_net': 0.0,
-            'tax_names': '',
-            'has_sales_orders': False,
+            project.id: {
+                'amount_net': project.manual_sales_order_amount_net or 0.0,
+                'tax_names': '',
+                'has_sales_orders': False,
+            }
+            for project in self
         }
+        if not self:
+            return result
 
-        # Search for confirmed sales orders linked to this project
+        # Search for confirmed sales orders linked to these projects
         # state='sale' means confirmed, 'done' means fully delivered
-        sales_orders = self.env['sale.order'].search([
-            ('project_id', '=', project.id),
+        sales_orders = self.env['sale.order'].search_fetch([
+            ('project_id', 'in', self.ids),
             ('state', 'in', ['sale', 'done'])
-        ])
-
+        ], ['project_id', 'amount_untaxed', 'currency_id', 'date_order', 'currency_rate'])
+        add_rows('sales_orders', len(sales_orders))
         if not sales_orders:
-            # FALLBACK: Use manual amount if no sales orders found
-            result['amount_net'] = project.manual_sales_order_amount_net or 0.0
-            result['has_sales_orders'] = False
             return result
 
-        result['has_sales_orders'] = True
-
-        # Collect tax names (use set to avoid duplicates)
-        tax_names_set = set()
+        # Tax names of the order lines, per order (use set to avoid duplicates)
+        order_taxes = defaultdict(set)
+        for order, tax in self.env['sale.order.line']._read_group(
+            [('order_id', 'in', sales_orders.ids), ('tax_id', '!=', False)], ['order_id', 'tax_id'],
+        ):
+            if tax.name:
+                order_taxes[order.id].add(tax.name)
+
+        for project, orders in sales_orders.grouped('project_id').items():
+            company = project.company_id or self.env.company
+            tax_names_set = set()
+            amount_net = 0.0
+            for order in orders:
+                # NET amount (without taxes) in company currency
+                amount_net += self._convert_to_company_currency(
+                    order.amount_untaxed, order.currency_id, company,
+                    order.date_order, order.currency_rate, rate_cache,
+                )
+                tax_names_set |= order_taxes[order.id]
+            result[project.id] = {
+                'amount_net': amount_net,
+                # Convert set to comma-separated string
+                'tax_names': ', '.join(sorted(tax_names_set)),
+                'has_sales_orders': True,
+            }
 
-        # Calculate total NET amount
-        for order in sales_orders:
-            result['amount_net'] += order.amount_untaxed  # NET amount (without taxes)
+        return result
 
-            # Collect tax names from order lines
-            for line in order.order_line:
-                for tax in line.tax_id:
-                    if tax.name:
-                        tax_names_set.add(tax.name)
+    def _convert_to_company_currency(self, amount, currency, company, date, document_rate=0.0, rate_cache=None):
+        """
+        Convert a document amount to company currency.
 
-        # Convert set to comma-separated string
-        if tax_names_set:
-            result['tax_names'] = ', '.join(sorted(tax_names_set))
+        Args:
+            amount: Amount in the document currency
+            currency: res.currency of the document
+            company: res.company whose currency is the target
+            date: Date of the document (used when document_rate is not set)
+            document_rate: Rate stored on the document (company → document currency)
+            rate_cache: Optional dict {(currency id, company id, day): rate} reused across calls
 
-        return result
+        Returns:
+            float: Amount in company currency
+        """
+        if not amount or not currency or currency == company.currency_id:
+            return amount
+        if document_rate:
+            return amount / document_rate
+
+        day = fields.Date.to_date(date) or fields.Date.context_today(self)
+        key = (currency.id, company.id, day)
+        if rate_cache is None:
+            rate_cache = {}
+        if key not in rate_cache:
+            rate_cache[key] = self.env['res.currency']._get_conversion_rate(
+                currency, company.currency_id, company, day,
+            )
+        return amount * rate_cache[key]
 
     def action_refresh_financial_data(self):
         """
@@ -1295,12 +1547,278 @@ class ProjectAnalytics(models.Model):
             }
         }
 
+    def simulate_rate_scenarios(self, hourly_rates, surcharge_factors):
+        """
+        Evaluate the adjusted P&L of these projects for many hourly rate /
+        vendor bill surcharge combinations without writing anything.
+
+        The stored base fields (revenue, vendor bills, adjusted hours, other costs)
+        are loaded once into column arrays; every scenario is then evaluated in memory.
+        Neither the system parameters nor any project field is modified.
+
+        Formula per project (same as current_calculated_profit_loss):
+            Invoiced NET - Vendor Bills NET × factor - Hours (Adjusted) × rate - Other Costs
+
+        Args:
+            hourly_rates: Iterable of general hourly rates to evaluate
+            surcharge_factors: Iterable of vendor bill surcharge factors to evaluate
+
+        Returns:
+            dict: {
+                'project_count': int,
+                'current': {'general_hourly_rate', 'vendor_bill_surcharge_factor', 'profit_loss'},
+                'scenarios': [{
+                    'general_hourly_rate': float,
+                    'vendor_bill_surcharge_factor': float,
+                    'labor_costs_adjusted': float,
+                    'adjusted_vendor_bill_amount': float,
+                    'profit_loss': float,
+                    'profit_loss_delta': float,  # vs. current parameters
+                    'projects_with_loss': int,
+                }, ...],
+            }
+        """
+        self.check_access('read')
+        config = self.env['ir.config_parameter'].sudo()
+        current_rate = float(config.get_param('project_statistic.general_hourly_rate', default='66.0'))
+        current_factor = float(config.get_param('project_statistic.vendor_bill_surcharge_factor', default='1.30'))
+
+        # Load the stored base fields for all projects in ONE query into column arrays
+        revenue = array('d')
+        vendor_bills = array('d')
+        hours_adjusted = array('d')
+        other_costs = array('d')
+        if self.ids:
+            base_fields = [
+                'has_analytic_account', 'customer_invoiced_amount_net', 'vendor_bills_total_net',
+                'total_hours_booked_adjusted', 'other_costs_net',
+            ]
+            self.flush_recordset(base_fields)
+            self.env.cr.execute(SQL(
+                """
+                SELECT customer_invoiced_amount_net, vendor_bills_total_net,
+                       total_hours_booked_adjusted, other_costs_net
+                  FROM project_project
+                 WHERE id IN %s AND has_analytic_account
+                """,
+                tuple(self.ids),
+            ))
+            for row in self.env.cr.fetchall():
+                revenue.append(row[0] or 0.0)
+                vendor_bills.append(row[1] or 0.0)
+                hours_adjusted.append(row[2] or 0.0)
+                other_costs.append(row[3] or 0.0)
+
+        # The P&L is linear in rate and factor, so portfolio totals only need column sums
+        revenue_total = math.fsum(revenue)
+        vendor_total = math.fsum(vendor_bills)
+        hours_total = math.fsum(hours_adjusted)
+        other_total = math.fsum(other_costs)
+        current_profit_loss = revenue_total - vendor_total * current_factor - hours_total * current_rate - other_total
+
+        # Per-project margin before rate/factor costs, reused by every scenario
+        margins = [r - o for r, o in zip(revenue, other_costs)]
+
+        scenarios = []
+        for rate in hourly_rates:
+            rate = float(rate)
+            for factor in surcharge_factors:
+                factor = float(factor)
+                profit_loss = revenue_total - vendor_total * factor - hours_total * rate - other_total
+                projects_with_loss = sum(
+                    1 for margin, vendor, hours in zip(margins, vendor_bills, hours_adjusted)
+                    if margin - vendor * factor - hours * rate < 0
+                )
+                scenarios.append({
+                    'general_hourly_rate': rate,
+                    'vendor_bill_surcharge_factor': factor,
+                    'labor_costs_adjusted': hours_total * rate,
+                    'adjusted_vendor_bill_amount': vendor_total * factor,
+                    'profit_loss': profit_loss,
+                    'profit_loss_delta': profit_loss - current_profit_loss,
+                    'projects_with_loss': projects_with_loss,
+                })
+
+        return {
+            'project_count': len(revenue),
+            'current': {
+                'general_hourly_rate': current_rate,
+                'vendor_bill_surcharge_factor': current_factor,
+                'profit_loss': current_profit_loss,
+            },
+            'scenarios': scenarios,
+        }
+
+    def _get_financial_fingerprint(self):
+        """
+        SHA-256 fingerprint of the stored financial figures of this project.
+
+        Covers every field computed by _compute_financial_data plus the project
+        master data shown next to the figures, so it changes whenever any
+        displayed value changes.
+        """
+        self.ensure_one()
+        fnames = sorted(
+            name for name, field in self._fields.items()
+            if field.compute == '_compute_financial_data'
+        ) + [
+            'name', 'client_name', 'head_of_project', 'date_start', 'date', 'currency_id',
+            'budget_amount', 'budget_variance', 'budget_status', 'manual_sales_order_amount_net',
+        ]
+        values = []
+        for fname in fnames:
+            value = self[fname]
+            if isinstance(value, models.BaseModel):
+                value = value.ids
+            values.append([fname, value])
+        payload = json.dumps(values, default=str, separators=(',', ':'))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _get_financial_report_fingerprint(self):
+        """
+        Content address of the financial PDF report of this project.
+
+        Combines the financial fingerprint, the stage, the ids of the snapshots
+        shown in the trend table, the rate parameters, the rendering language and
+        the company and layout data of the letterhead. Used as attachment name of
+        action_report_project_financial, so an unchanged project is served from
+        the attachment store instead of being re-rendered.
+        """
+        self.ensure_one()
+        config = self.env['ir.config_parameter'].sudo()
+        # web.external_layout prints the letterhead of the project's company
+        company = (self.company_id or self.env.company).sudo()
+        layout = company.external_report_layout_id
+        snapshots = self.env['project.financial.snapshot'].search_fetch(
+            [('project_id', '=', self.id)], ['write_date'], order='snapshot_date desc, id desc', limit=6,
+        )
+        payload = json.dumps([
+            self._get_financial_fingerprint(),
+            [[snapshot.id, snapshot.write_date] for snapshot in snapshots],
+            config.get_param('project_statistic.general_hourly_rate', default='66.0'),
+            config.get_param('project_statistic.vendor_bill_surcharge_factor', default='1.30'),
+            self.env.lang,
+            self.stage_id.id,
+            self.stage_id.write_date,
+            [company.id, company.write_date, company.partner_id.write_date, company.paperformat_id.id,
+             company.currency_id.id, company.currency_id.symbol],
+            [layout.id, layout.write_date],
+        ], default=str, separators=(',', ':'))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _get_portal_financial_etag(self):
+        """
+        Strong ETag of the financial block shown in the customer portal.
+
+        Derived from the financial fingerprint, the portal_show_* flags, the
+        stage and the language, so it changes exactly when the visible block
+        changes. Returned quoted, ready for the ETag header.
+        """
+        self.ensure_one()
+        payload = json.dumps([
+            self.id,
+            self._get_financial_fingerprint(),
+            [self[fname] for fname in PORTAL_VISIBILITY_FIELDS],
+            self.stage_id.display_name,
+            self.env.lang,
+        ], default=str, separators=(',', ':'))
+        return '"%s"' % hashlib.sha256(payload.encode()).hexdigest()
+
+    def _get_portal_financial_payload(self, etag=None):
+        """
+        Financial block of the customer portal as a JSON-serializable dict.
+
+        Only the sections enabled by the portal_show_* flags are included. The
+        payload is cached per ETag, so it is built once per change of the
+        project and shared by all page views and JSON requests. Do not mutate
+        the returned dict.
+
+        Args:
+            etag: ETag from _get_portal_financial_etag (computed if not given)
+        """
+        self.ensure_one()
+        return self._get_portal_financial_payload_cached(etag or self._get_portal_financial_etag())
+
+    @tools.ormcache('etag')
+    def _get_portal_financial_payload_cached(self, etag):
+        # The ETag covers the project id and every value read below
+        payload = {
+            'etag': etag,
+            'project': {
+                'id': self.id,
+                'name': self.name,
+                'client_name': self.client_name or '',
+                'head_of_project': self.head_of_project or '',
+                'date_start': fields.Date.to_string(self.date_start) if self.date_start else None,
+                'date': fields.Date.to_string(self.date) if self.date else None,
+                'stage': self.stage_id.display_name or '',
+            },
+            'currency': {
+                'name': self.currency_id.name,
+                'symbol': self.currency_id.symbol,
+            },
+            'show_financial_data': self.portal_show_financial_data,
+        }
+        if not self.portal_show_financial_data:
+            return payload
+
+        payload['show_detailed_breakdown'] = self.portal_show_detailed_breakdown
+        if self.portal_show_revenue:
+            payload['revenue'] = {
+                'invoiced_net': self.customer_invoiced_amount_net,
+                'paid_net': self.customer_paid_amount_net,
+                'outstanding_net': self.customer_outstanding_amount_net,
+            }
+        if self.portal_show_costs:
+            payload['costs'] = {
+                'total_all_costs_net': self.total_all_costs_net,
+                'internal_costs_net': self.total_costs_net,
+                'vendor_bills_net': self.vendor_bills_total_net,
+                'hours_booked': self.total_hours_booked,
+            }
+        if self.portal_show_profit_loss:
+            payload['profit_loss'] = {
+                'profit_loss_net': self.profit_loss_net,
+                'profitable': self.profit_loss_net >= 0,
+            }
+        if self.portal_show_budget and self.budget_amount > 0:
+            payload['budget'] = {
+                'amount': self.budget_amount,
+                'variance': self.budget_variance,
+                'status': self.budget_status,
+            }
+        return payload
+
+    def _get_related_counts(self, model_name, inverse_field='project_id', domain=None):
+        """
+        Batch helper for non-stored count fields shown in list views.
+
+        Counts the records of model_name pointing to the projects of this
+        recordset with one grouped query, instead of one search_count per row.
+
+        Args:
+            model_name: Model holding the many2one to project.project
+            inverse_field: Name of that many2one field
+            domain: Optional additional domain
+
+        Returns:
+            dict: {project_id: count}, projects without records are omitted
+        """
+        project_ids = [pid for pid in self.ids if pid]
+        if not project_ids:
+            return {}
+        groups = self.env[model_name]._read_group(
+            [(inverse_field, 'in', project_ids)] + (domain or []),
+            groupby=[inverse_field],
+            aggregates=['__count'],
+        )
+        return {project.id: count for project, count in groups}
+
     def _compute_snapshot_count(self):
         """Compute the number of financial snapshots for each project."""
+        counts = self._get_related_counts('project.financial.snapshot')
         for project in self:
-            project.snapshot_count = self.env['project.financial.snapshot'].search_count([
-                ('project_id', '=', project.id)
-            ]) if project.id else 0
+            project.snapshot_count = counts.get(project.id, 0)
 
     @api.depends('budget_amount', 'customer_invoiced_amount_net', 'total_all_costs_net')
     def _compute_budget_tracking(self):
@@ -1346,6 +1864,67 @@ class ProjectAnalytics(models.Model):
             },
         }
 
+    def action_view_task_financials(self):
+        """Open the per-task breakdown of this project."""
+        self.ensure_one()
+        return {
+            'name': _('Task Financials - %s') % self.name,
+            'type': 'ir.actions.act_window',
+            'res_model': 'project.task.financial',
+            'view_mode': 'list,pivot,graph',
+            'domain': [('project_id', '=', self.id)],
+        }
+
+    def write(self, vals):
+        """Refresh the rollups of the old and new keys when a project changes its dimensions."""
+        rollup_keys = None
+        if ROLLUP_TRIGGER_FIELDS.intersection(vals):
+            rollup_keys = self.env['project.financial.rollup']._get_project_keys(self.sudo())
+        res = super().write(vals)
+        if rollup_keys is not None:
+            self.env['project.financial.rollup']._mark_projects(self, rollup_keys)
+        return res
+
+    def unlink(self):
+        """Refresh the rollups the deleted projects were summed in."""
+        rollup_keys = self.env['project.financial.rollup']._get_project_keys(self.sudo())
+        res = super().unlink()
+        self.env['project.financial.rollup']._mark_projects(self.browse(), rollup_keys)
+        return res
+
+    @api.model
+    def _init_financial_data(self, batch_size=INIT_BATCH_SIZE):
+        """
+        Compute the financial data of all projects (also archived ones).
+
+        Used after install (post_init_hook) and by migrations instead of the
+        record-by-record initialization of new stored fields. Every batch costs
+        the grouped queries of _compute_financial_data_batch, independent of the
+        number of projects in it. The compute runs with its fields protected, as
+        the ORM does for pending recomputes: the values go straight to the cache
+        and are flushed with one UPDATE per batch instead of a write() per field.
+
+        Args:
+            batch_size: Projects per batch (bounds the size of the id lists in the queries)
+
+        Returns:
+            int: Number of projects computed
+        """
+        projects = self.with_context(
+            active_test=False, project_statistic_telemetry_operation='install',
+        ).search([], order='id')
+        computed_fields = [
+            field for field in self._fields.values() if field.compute == '_compute_financial_data'
+        ]
+        for start in range(0, len(projects), batch_size):
+            batch = projects[start:start + batch_size]
+            with self.env.protecting(computed_fields, batch):
+                batch._compute_financial_data()
+            batch.flush_recordset()
+            batch.invalidate_recordset()
+        _logger.info(f"Initialized financial data of {len(projects)} project(s)")
+        return len(projects)
+
     @api.model
     def trigger_recompute_for_analytic_accounts(self, analytic_account_ids):
         """
@@ -1403,7 +1982,7 @@ class ProjectAnalytics(models.Model):
 
             for i in range(0, total_projects, chunk_size):
                 chunk = project_ids_list[i:i + chunk_size]
-                chunk_projects = self.browse(chunk)
+                chunk_projects = self.browse(chunk).with_context(project_statistic_telemetry_operation='compute_hook')
 
                 try:
                     # CRITICAL: Invalidate cache first to ensure fresh data
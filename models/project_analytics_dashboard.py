@@ -2,6 +2,8 @@ from odoo import models, fields, api, _
 from odoo.tools import SQL
 import logging
 
+from .read_replica import replica_env
+
 _logger = logging.getLogger(__name__)
 
 
@@ -61,6 +63,14 @@ class ProjectAnalyticsDashboard(models.Model):
             );
         """)
 
+    @api.model
+    def read_group(self, domain, fields, groupby, offset=0, limit=None, orderby=False, lazy=True):
+        """Pivot and graph groupings run on the read replica when enabled (see read_replica)."""
+        with replica_env(self.env) as env:
+            return super(ProjectAnalyticsDashboard, self.with_env(env)).read_group(
+                domain, fields, groupby, offset=offset, limit=limit, orderby=orderby, lazy=lazy,
+            )
+
     @api.model
     def get_dashboard_data(self, company_id=None):
         """
@@ -72,36 +82,57 @@ class ProjectAnalyticsDashboard(models.Model):
         Returns:
             dict: Dashboard data with KPIs and project rankings
         """
+        with self.env['project.statistic.telemetry'].track('dashboard') as run:
+            # Rollups of this transaction's changes are written on the primary first
+            self.env['project.financial.rollup']._refresh_pending()
+            with replica_env(self.env) as env:
+                data = self.with_env(env)._get_dashboard_data(company_id)
+            run['record_count'] = data['kpis']['total_projects']
+        return data
+
+    @api.model
+    def _get_dashboard_data(self, company_id=None):
+        """
+        Build the dashboard data (see get_dashboard_data).
+
+        The KPIs are read from the company rollups (project.financial.rollup)
+        instead of loading all projects; the rankings read only their five
+        projects each. The rollups ignore project record rules, so users who
+        may not read every project get KPIs grouped over their visible
+        projects instead.
+        """
         domain = [('has_analytic_account', '=', True), ('active', '=', True)]
         if company_id:
             domain.append(('company_id', '=', company_id))
 
-        projects = self.env['project.project'].search(domain)
-
-        # Calculate KPIs
-        total_projects = len(projects)
-        projects_with_profit = len(projects.filtered(lambda p: p.profit_loss_net > 0))
-        projects_with_loss = len(projects.filtered(lambda p: p.profit_loss_net < 0))
-
-        total_revenue = sum(projects.mapped('customer_invoiced_amount_net'))
-        total_costs = sum(projects.mapped('total_costs_net')) + sum(projects.mapped('vendor_bills_total_net'))
-        total_profit = sum(projects.mapped('profit_loss_net'))
-        total_hours = sum(projects.mapped('total_hours_booked'))
-        total_outstanding = sum(projects.mapped('customer_outstanding_amount_net'))
+        if self.env['project.financial.rollup'].has_access('read'):
+            kpi_totals = self._get_rollup_kpi_totals(company_id)
+        else:
+            kpi_totals = self._get_project_kpi_totals(domain)
+        (total_projects, projects_with_profit, projects_with_loss, total_revenue, total_costs,
+         total_profit, total_hours, total_outstanding) = kpi_totals
 
         avg_margin = (total_profit / total_revenue * 100) if total_revenue > 0 else 0
         avg_revenue = total_revenue / total_projects if total_projects > 0 else 0
 
+        Project = self.env['project.project']
+        ranking_fields = [
+            'name', 'client_name', 'profit_loss_net', 'customer_invoiced_amount_net', 'customer_outstanding_amount_net',
+        ]
         # Top 5 profitable projects
-        top_profitable = projects.sorted(key=lambda p: p.profit_loss_net, reverse=True)[:5]
+        top_profitable = Project.search_fetch(domain, ranking_fields, order='profit_loss_net desc, id', limit=5)
         # Bottom 5 (most loss-making) projects
-        bottom_profitable = projects.sorted(key=lambda p: p.profit_loss_net)[:5]
+        bottom_profitable = Project.search_fetch(domain, ranking_fields, order='profit_loss_net, id', limit=5)
 
         # Top 5 by revenue
-        top_revenue = projects.sorted(key=lambda p: p.customer_invoiced_amount_net, reverse=True)[:5]
+        top_revenue = Project.search_fetch(
+            domain, ranking_fields, order='customer_invoiced_amount_net desc, id', limit=5,
+        )
 
         # Projects with highest outstanding amounts
-        top_outstanding = projects.sorted(key=lambda p: p.customer_outstanding_amount_net, reverse=True)[:5]
+        top_outstanding = Project.search_fetch(
+            domain, ranking_fields, order='customer_outstanding_amount_net desc, id', limit=5,
+        )
 
         return {
             'kpis': {
@@ -146,6 +177,60 @@ class ProjectAnalyticsDashboard(models.Model):
             } for p in top_outstanding],
         }
 
+    @api.model
+    def _get_rollup_kpi_totals(self, company_id=None):
+        """
+        KPI totals from the company rollups.
+
+        Returns:
+            tuple: (projects, profitable, loss-making, revenue, costs, profit,
+                    hours, outstanding)
+        """
+        rollup_domain = [('level', '=', 'company')]
+        if company_id:
+            rollup_domain.append(('company_id', '=', company_id))
+        rollups = self.env['project.financial.rollup'].search_fetch(rollup_domain, [
+            'project_count', 'projects_with_profit', 'projects_with_loss', 'customer_invoiced_amount_net',
+            'total_costs_net', 'vendor_bills_total_net', 'profit_loss_net', 'total_hours_booked',
+            'customer_outstanding_amount_net',
+        ])
+        return (
+            sum(rollups.mapped('project_count')),
+            sum(rollups.mapped('projects_with_profit')),
+            sum(rollups.mapped('projects_with_loss')),
+            sum(rollups.mapped('customer_invoiced_amount_net')),
+            sum(rollups.mapped('total_costs_net')) + sum(rollups.mapped('vendor_bills_total_net')),
+            sum(rollups.mapped('profit_loss_net')),
+            sum(rollups.mapped('total_hours_booked')),
+            sum(rollups.mapped('customer_outstanding_amount_net')),
+        )
+
+    @api.model
+    def _get_project_kpi_totals(self, domain):
+        """
+        KPI totals grouped over the projects visible to the user (record rules apply).
+
+        Returns:
+            tuple: same as _get_rollup_kpi_totals
+        """
+        Project = self.env['project.project']
+        [(total_projects, revenue, costs, bills, profit, hours, outstanding)] = Project._read_group(
+            domain, aggregates=[
+                '__count', 'customer_invoiced_amount_net:sum', 'total_costs_net:sum', 'vendor_bills_total_net:sum',
+                'profit_loss_net:sum', 'total_hours_booked:sum', 'customer_outstanding_amount_net:sum',
+            ],
+        )
+        return (
+            total_projects,
+            Project.search_count(domain + [('profit_loss_net', '>', 0)]),
+            Project.search_count(domain + [('profit_loss_net', '<', 0)]),
+            revenue or 0.0,
+            (costs or 0.0) + (bills or 0.0),
+            profit or 0.0,
+            hours or 0.0,
+            outstanding or 0.0,
+        )
+
     @api.model
     def get_trend_data(self, project_id=None, period='monthly', limit=12):
         """
@@ -159,6 +244,15 @@ class ProjectAnalyticsDashboard(models.Model):
         Returns:
             dict: Trend data for charts
         """
+        with self.env['project.statistic.telemetry'].track('trend') as run:
+            with replica_env(self.env) as env:
+                data = self.with_env(env)._get_trend_data(project_id, period, limit)
+            run['record_count'] = len(data['labels'])
+        return data
+
+    @api.model
+    def _get_trend_data(self, project_id=None, period='monthly', limit=12):
+        """Build the trend data (see get_trend_data)."""
         domain = [('snapshot_type', '=', period)]
         if project_id:
             domain.append(('project_id', '=', project_id))
@@ -0,0 +1,320 @@
+from odoo import models, fields, api, _
+from odoo.exceptions import AccessError
+from odoo.tools import SQL
+from collections import defaultdict
+import logging
+
+_logger = logging.getLogger(__name__)
+
+ROLLUP_LEVELS = [
+    ('company', 'Company'),
+    ('client', 'Client'),
+    ('head_of_project', 'Head of Project'),
+    ('tag', 'Project Tag'),
+]
+
+# Rollup column of the level's dimension (the company is part of every key)
+ROLLUP_LEVEL_COLUMNS = {
+    'company': None,
+    'client': 'client_name',
+    'head_of_project': 'head_of_project',
+    'tag': 'tag_id',
+}
+
+# Project fields summed into the rollups (same names on both models)
+ROLLUP_MEASURES = (
+    'customer_invoiced_amount_net',
+    'customer_paid_amount_net',
+    'customer_outstanding_amount_net',
+    'vendor_bills_total_net',
+    'labor_costs',
+    'other_costs_net',
+    'total_costs_net',
+    'total_all_costs_net',
+    'total_hours_booked',
+    'profit_loss_net',
+    'current_calculated_profit_loss',
+)
+
+# Project fields deciding which rollups a project belongs to
+ROLLUP_DIMENSION_FIELDS = ('company_id', 'client_name', 'head_of_project', 'tag_ids', 'active', 'has_analytic_account')
+
+# Fields of a project write that can move it to other rollups (related sources included)
+ROLLUP_TRIGGER_FIELDS = frozenset(ROLLUP_DIMENSION_FIELDS + ('partner_id', 'user_id'))
+
+# precommit data key of the rollups waiting for a refresh
+PENDING_KEY = 'project_statistic.rollup_pending'
+
+
+class ProjectFinancialRollup(models.Model):
+    """
+    Precomputed totals of the project financials per company, client, head of
+    project and project tag.
+
+    Each row sums the stored totals of the active projects with an analytic
+    account (the projects of the dashboard) for one key: the company plus the
+    client, the head of project or the tag of its level. A project with
+    several tags counts for each of them, so only rows of the same level add
+    up to the company total.
+
+    The rows are maintained incrementally: the financial compute and project
+    changes that can move a project to another key mark the affected keys,
+    which are recomputed once per transaction (before commit) with one grouped
+    query per level. A nightly cron rebuilds everything, which also catches
+    renamed clients and users (client_name and head_of_project are related
+    fields and change without a project write).
+    """
+    _name = 'project.financial.rollup'
+    _description = 'Project Financial Rollup'
+    _order = 'level, company_id, profit_loss_net desc, id'
+    _log_access = False
+
+    level = fields.Selection(ROLLUP_LEVELS, string='Level', required=True, readonly=True, index=True)
+    company_id = fields.Many2one('res.company', string='Company', readonly=True, index=True)
+    client_name = fields.Char(string='Name of Client', readonly=True)
+    head_of_project = fields.Char(string='Head of Project', readonly=True)
+    tag_id = fields.Many2one('project.tags', string='Project Tag', readonly=True, ondelete='cascade')
+    currency_id = fields.Many2one('res.currency', string='Currency', related='company_id.currency_id')
+
+    project_count = fields.Integer(string='Projects', readonly=True, aggregator='sum')
+    projects_with_profit = fields.Integer(string='Profitable Projects', readonly=True, aggregator='sum')
+    projects_with_loss = fields.Integer(string='Loss-Making Projects', readonly=True, aggregator='sum')
+
+    customer_invoiced_amount_net = fields.Float(string='Total Invoiced NET', readonly=True, aggregator='sum')
+    customer_paid_amount_net = fields.Float(string='Total Paid NET', readonly=True, aggregator='sum')
+    customer_outstanding_amount_net = fields.Float(string='Outstanding NET', readonly=True, aggregator='sum')
+    vendor_bills_total_net = fields.Float(string='Vendor Bills NET', readonly=True, aggregator='sum')
+    labor_costs = fields.Float(string='Labor Costs', readonly=True, aggregator='sum')
+    other_costs_net = fields.Float(string='Other Costs NET', readonly=True, aggregator='sum')
+    total_costs_net = fields.Float(string='Internal Costs NET', readonly=True, aggregator='sum')
+    total_all_costs_net = fields.Float(string='Total Costs NET', readonly=True, aggregator='sum')
+    total_hours_booked = fields.Float(string='Hours Booked', readonly=True, aggregator='sum')
+    profit_loss_net = fields.Float(string='Profit/Loss NET', readonly=True, aggregator='sum')
+    current_calculated_profit_loss = fields.Float(string='Calculated P&L', readonly=True, aggregator='sum')
+    profit_margin = fields.Float(
+        string='Profit Margin %', readonly=True, aggregator=False,
+        help="Profit/Loss NET / Total Invoiced NET * 100 (0 without revenue)."
+    )
+
+    def init(self):
+        """Index of the incremental refresh; build the rollups once after an upgrade."""
+        super().init()
+        self.env.cr.execute(SQL(
+            "CREATE INDEX IF NOT EXISTS project_financial_rollup_level_company_index "
+            "ON project_financial_rollup (level, company_id)"
+        ))
+        self.env.cr.execute(SQL("SELECT 1 FROM project_financial_rollup LIMIT 1"))
+        if not self.env.cr.fetchone():
+            self._refresh()
+
+    @api.depends('level', 'company_id', 'client_name', 'head_of_project', 'tag_id')
+    def _compute_display_name(self):
+        for rollup in self:
+            if rollup.level == 'company':
+                name = rollup.company_id.name or _('No Company')
+            elif rollup.level == 'tag':
+                name = rollup.tag_id.name
+            else:
+                name = rollup[ROLLUP_LEVEL_COLUMNS[rollup.level]] or _('Undefined')
+            rollup.display_name = name
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    @api.model
+    def _get_level_sql(self, level):
+        """
+        SQL parts of one level over project_project (alias "project").
+
+        Returns:
+            tuple: (FROM clause, key expression of the dimension)
+        """
+        project_table = SQL("project_project AS project")
+        if level == 'company':
+            return project_table, SQL("''")
+        if level == 'tag':
+            field = self.env['project.project']._fields['tag_ids']
+            return SQL(
+                "%s JOIN %s AS rel ON %s = project.id",
+                project_table, SQL.identifier(field.relation), SQL.identifier('rel', field.column1),
+            ), SQL.identifier('rel', field.column2)
+        return project_table, SQL("COALESCE(%s, '')", SQL.identifier('project', ROLLUP_LEVEL_COLUMNS[level]))
+
+    @api.model
+    def _get_rollup_key_sql(self, level):
+        """Key expression of the dimension of a level over project_financial_rollup."""
+        column = ROLLUP_LEVEL_COLUMNS[level]
+        if not column:
+            return SQL("''")
+        if level == 'tag':
+            return SQL.identifier('project_financial_rollup', column)
+        return SQL("COALESCE(%s, '')", SQL.identifier('project_financial_rollup', column))
+
+    @api.model
+    def _refresh(self, keys=None):
+        """
+        Recompute rollup rows from the stored project totals.
+
+        Args:
+            keys: Optional {level: {(company id or 0, dimension key), ...}} to
+                  recompute only these rows (see _get_project_keys); None
+                  rebuilds all levels
+        """
+        self.env['project.project'].flush_model(ROLLUP_MEASURES + ROLLUP_DIMENSION_FIELDS)
+        if keys is None:
+            # A full rebuild covers the rollups scheduled so far
+            self.env.cr.precommit.data.pop(PENDING_KEY, None)
+        company_key = SQL("COALESCE(project.company_id, 0)")
+        measure_columns = SQL(", ").join(SQL.identifier(fname) for fname in ROLLUP_MEASURES)
+        measure_sums = SQL(", ").join(
+            SQL("COALESCE(SUM(%s), 0)", SQL.identifier('project', fname)) for fname in ROLLUP_MEASURES
+        )
+        revenue = SQL("SUM(project.customer_invoiced_amount_net)")
+
+        for level, _label in ROLLUP_LEVELS:
+            if keys is not None and not keys.get(level):
+                continue
+            from_clause, key = self._get_level_sql(level)
+            column = ROLLUP_LEVEL_COLUMNS[level]
+
+            if keys is None:
+                self.env.cr.execute(SQL("DELETE FROM project_financial_rollup WHERE level = %s", level))
+                key_filter = SQL("TRUE")
+            else:
+                level_keys = tuple(sorted(keys[level]))
+                self.env.cr.execute(SQL(
+                    "DELETE FROM project_financial_rollup WHERE level = %s AND (COALESCE(company_id, 0), %s) IN %s",
+                    level, self._get_rollup_key_sql(level), level_keys,
+                ))
+                key_filter = SQL("(%s, %s) IN %s", company_key, key, level_keys)
+
+            if not column:
+                dimension = SQL()
+            elif column == 'tag_id':
+                dimension = SQL("%s,", key)
+            else:
+                dimension = SQL("NULLIF(%s, ''),", key)
+            self.env.cr.execute(SQL(
+                """
+                INSERT INTO project_financial_rollup
+                    (level, company_id, %(dimension_column)s project_count, projects_with_profit,
+                     projects_with_loss, profit_margin, %(measure_columns)s)
+                SELECT %(level)s, NULLIF(%(company_key)s, 0), %(dimension)s COUNT(*),
+                       COUNT(*) FILTER (WHERE project.profit_loss_net > 0),
+                       COUNT(*) FILTER (WHERE project.profit_loss_net < 0),
+                       CASE WHEN %(revenue)s > 0 THEN SUM(project.profit_loss_net) / %(revenue)s * 100 ELSE 0 END,
+                       %(measure_sums)s
+                  FROM %(from_clause)s
+                 WHERE project.active AND project.has_analytic_account AND %(key_filter)s
+                 GROUP BY %(company_key)s, %(key)s
+                """,
+                dimension_column=SQL("%s,", SQL.identifier(column)) if column else SQL(),
+                measure_columns=measure_columns,
+                level=level,
+                company_key=company_key,
+                dimension=dimension,
+                revenue=revenue,
+                measure_sums=measure_sums,
+                from_clause=from_clause,
+                key_filter=key_filter,
+                key=key,
+            ))
+        self.invalidate_model()
+
+    @api.model
+    def _get_project_keys(self, projects):
+        """
+        Rollup keys of projects, per level.
+
+        Returns:
+            dict: {level: {(company id or 0, dimension key), ...}}
+        """
+        keys = defaultdict(set)
+        for project in projects:
+            company_key = project.company_id.id or 0
+            keys['company'].add((company_key, ''))
+            keys['client'].add((company_key, project.client_name or ''))
+            keys['head_of_project'].add((company_key, project.head_of_project or ''))
+            for tag in project.tag_ids:
+                keys['tag'].add((company_key, tag.id))
+        return keys
+
+    @api.model
+    def _mark_projects(self, projects, keys=None):
+        """
+        Schedule the refresh of the rollups of projects (before commit).
+
+        Args:
+            projects: project.project records whose totals or dimensions changed
+            keys: Optional additional keys (e.g. the keys before a change)
+        """
+        pending = self.env.cr.precommit.data.get(PENDING_KEY)
+        if pending is None:
+            pending = self.env.cr.precommit.data[PENDING_KEY] = {'project_ids': set(), 'keys': defaultdict(set)}
+            self.env.cr.precommit.add(self._refresh_pending)
+        pending['project_ids'].update(projects.ids)
+        for level, level_keys in (keys or {}).items():
+            pending['keys'][level] |= level_keys
+
+    @api.model
+    def _refresh_pending(self):
+        """Refresh the rollups scheduled by _mark_projects (called before commit or before a read)."""
+        pending = self.env.cr.precommit.data.pop(PENDING_KEY, None)
+        if not pending:
+            return
+        keys = pending['keys']
+        projects = self.env['project.project'].sudo().with_context(active_test=False).browse(
+            pending['project_ids']
+        ).exists()
+        for level, level_keys in self._get_project_keys(projects).items():
+            keys[level] |= level_keys
+        self.sudo()._refresh(keys)
+        _logger.debug("Refreshed rollups of %s project(s)", len(pending['project_ids']))
+
+    @api.model
+    def _cron_rebuild(self):
+        """Cron job: rebuild all rollups (catches renamed clients and heads of project)."""
+        self._refresh()
+        _logger.info(f"Rebuilt {self.search_count([])} project financial rollup(s)")
+
+    def action_rebuild(self):
+        """Rebuild all rollups now (button)."""
+        if not self.env.su and not self.env.user.has_group('account.group_account_manager'):
+            raise AccessError(_('Only accounting managers can rebuild the financial rollups.'))
+        self._refresh()
+        return {'type': 'ir.actions.client', 'tag': 'reload'}
+
+    # ------------------------------------------------------------------
+    # Drill-down
+    # ------------------------------------------------------------------
+
+    def _get_project_domain(self):
+        """Domain of the projects summed in this rollup."""
+        self.ensure_one()
+        domain = [
+            ('has_analytic_account', '=', True),
+            ('active', '=', True),
+            ('company_id', '=', self.company_id.id or False),
+        ]
+        if self.level == 'tag':
+            domain.append(('tag_ids', 'in', self.tag_id.ids))
+        elif self.level != 'company':
+            column = ROLLUP_LEVEL_COLUMNS[self.level]
+            domain.append((column, '=', self[column] or False))
+        return domain
+
+    def action_view_projects(self):
+        """Open the projects of this rollup in the financial list."""
+        self.ensure_one()
+        return {
+            'name': _('Projects - %s') % self.display_name,
+            'type': 'ir.actions.act_window',
+            'res_model': 'project.project',
+            'view_mode': 'list,form',
+            'views': [
+                (self.env.ref('project_statistic.view_project_list_account_analytics').id, 'list'),
+                (self.env.ref('project_statistic.view_project_form_account_analytics').id, 'form'),
+            ],
+            'domain': self._get_project_domain(),
+        }
@@ -1,8 +1,12 @@
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import UserError
+from odoo.tools import SQL
+from collections import defaultdict
 from dateutil.relativedelta import relativedelta
 import logging
 
+from .read_replica import replica_env
+
 _logger = logging.getLogger(__name__)
 
 
@@ -121,6 +125,19 @@ class ProjectFinancialSnapshot(models.Model):
         help="Projected total cost at completion based on current burn rate"
     )
 
+    def init(self):
+        """Create the (write_date, id) index used by the changed-since bulk read."""
+        tools.create_index(self.env.cr, 'project_financial_snapshot_write_date_id_index',
+                           self._table, ['write_date', 'id'])
+
+    @api.model
+    def read_group(self, domain, fields, groupby, offset=0, limit=None, orderby=False, lazy=True):
+        """Pivot and graph groupings run on the read replica when enabled (see read_replica)."""
+        with replica_env(self.env) as env:
+            return super(ProjectFinancialSnapshot, self.with_env(env)).read_group(
+                domain, fields, groupby, offset=offset, limit=limit, orderby=orderby, lazy=lazy,
+            )
+
     @api.depends('snapshot_date', 'snapshot_type')
     def _compute_period_label(self):
         for record in self:
@@ -149,13 +166,9 @@ class ProjectFinancialSnapshot(models.Model):
     @api.depends('project_id', 'snapshot_date', 'customer_invoiced_amount_net',
                  'total_costs_net', 'profit_loss_net', 'total_hours_booked')
     def _compute_deltas(self):
+        previous_by_record = self._get_previous_snapshots()
         for record in self:
-            # Find previous snapshot for this project
-            previous = self.search([
-                ('project_id', '=', record.project_id.id),
-                ('snapshot_date', '<', record.snapshot_date),
-            ], order='snapshot_date desc', limit=1)
-
+            previous = previous_by_record.get(record.id)
             if previous:
                 record.revenue_delta = record.customer_invoiced_amount_net - previous.customer_invoiced_amount_net
                 record.costs_delta = record.total_costs_net - previous.total_costs_net
@@ -167,6 +180,41 @@ class ProjectFinancialSnapshot(models.Model):
                 record.profit_delta = record.profit_loss_net
                 record.hours_delta = record.total_hours_booked
 
+    def _get_previous_snapshots(self):
+        """
+        Get the previous snapshot of each record's project with one query per
+        snapshot date (a single one for the snapshot crons).
+
+        Returns:
+            dict: {record id: previous project.financial.snapshot record}
+        """
+        records_by_date = defaultdict(lambda: self.browse())
+        for record in self:
+            if record.project_id and record.snapshot_date:
+                records_by_date[record.snapshot_date] |= record
+        if not records_by_date:
+            return {}
+
+        self.flush_model(['project_id', 'snapshot_date'])
+        result = {}
+        for snapshot_date, records in records_by_date.items():
+            self.env.cr.execute(SQL(
+                """
+                SELECT DISTINCT ON (project_id) project_id, id
+                  FROM project_financial_snapshot
+                 WHERE project_id = ANY(%s) AND snapshot_date < %s
+                 ORDER BY project_id, snapshot_date DESC, id DESC
+                """,
+                records.project_id.ids, snapshot_date,
+            ))
+            previous_by_project = {project_id: self.browse(snapshot_id)
+                                   for project_id, snapshot_id in self.env.cr.fetchall()}
+            for record in records:
+                previous = previous_by_project.get(record.project_id.id)
+                if previous:
+                    result[record.id] = previous
+        return result
+
     @api.depends('project_id', 'snapshot_date', 'total_costs_net', 'vendor_bills_total_net',
                  'labor_costs_adjusted')
     def _compute_burn_rate(self):
@@ -216,7 +264,12 @@ class ProjectFinancialSnapshot(models.Model):
             _logger.warning(f"Cannot create snapshot for project {project.name}: no analytic account")
             return self.env['project.financial.snapshot']
 
-        values = {
+        return self.create(self._prepare_snapshot_values(project, snapshot_type))
+
+    @api.model
+    def _prepare_snapshot_values(self, project, snapshot_type):
+        """Values of a snapshot of the project's current stored financial totals."""
+        return {
             'project_id': project.id,
             'snapshot_date': fields.Date.today(),
             'snapshot_type': snapshot_type,
@@ -243,29 +296,40 @@ class ProjectFinancialSnapshot(models.Model):
             'vendor_skonto_received': project.vendor_skonto_received,
         }
 
-        return self.create(values)
-
     @api.model
-    def create_monthly_snapshots(self):
-        """
-        Cron job method to create monthly snapshots for all active projects.
-        Should be scheduled to run on the 1st of each month.
+    def _create_periodic_snapshots(self, snapshot_type):
         """
-        _logger.info("Creating monthly financial snapshots...")
+        Snapshot all active projects with an analytic account in one batch:
+        the project totals are read with the search and the snapshots are
+        created (and their deltas computed) with a single create call.
 
+        Returns:
+            int: Number of snapshots created
+        """
         projects = self.env['project.project'].search([
             ('has_analytic_account', '=', True),
             ('active', '=', True),
         ])
 
-        created_count = 0
-        for project in projects:
-            try:
-                self.create_snapshot(project, 'monthly')
-                created_count += 1
-            except Exception as e:
-                _logger.error(f"Error creating snapshot for project {project.name}: {e}")
+        with self.env['project.statistic.telemetry'].track('snapshot_cron') as run:
+            vals_list = []
+            for project in projects:
+                try:
+                    vals_list.append(self._prepare_snapshot_values(project, snapshot_type))
+                except Exception as e:
+                    _logger.error(f"Error creating snapshot for project {project.name}: {e}")
+            snapshots = self.create(vals_list)
+            run['record_count'] = len(snapshots)
+        return len(snapshots)
 
+    @api.model
+    def create_monthly_snapshots(self):
+        """
+        Cron job method to create monthly snapshots for all active projects.
+        Should be scheduled to run on the 1st of each month.
+        """
+        _logger.info("Creating monthly financial snapshots...")
+        created_count = self._create_periodic_snapshots('monthly')
         _logger.info(f"Created {created_count} monthly snapshots")
         return created_count
 
@@ -276,19 +340,6 @@ class ProjectFinancialSnapshot(models.Model):
         Should be scheduled to run on the 1st day of each quarter.
         """
         _logger.info("Creating quarterly financial snapshots...")
-
-        projects = self.env['project.project'].search([
-            ('has_analytic_account', '=', True),
-            ('active', '=', True),
-        ])
-
-        created_count = 0
-        for project in projects:
-            try:
-                self.create_snapshot(project, 'quarterly')
-                created_count += 1
-            except Exception as e:
-                _logger.error(f"Error creating snapshot for project {project.name}: {e}")
-
+        created_count = self._create_periodic_snapshots('quarterly')
         _logger.info(f"Created {created_count} quarterly snapshots")
         return created_count
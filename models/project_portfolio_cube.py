@@ -0,0 +1,528 @@
+from odoo import models, api, _
+from odoo.exceptions import AccessError, UserError
+from odoo.tools import SQL
+from array import array
+from collections import OrderedDict
+import logging
+import threading
+import time
+
+_logger = logging.getLogger(__name__)
+
+# Dimensions available for grouping and filtering
+CUBE_DIMENSIONS = ('client_name', 'head_of_project', 'company_id', 'period')
+
+# Per-month facts: stored values of the monthly financial snapshots
+PERIOD_MEASURES = (
+    'customer_invoiced_amount_net',
+    'customer_paid_amount_net',
+    'customer_outstanding_amount_net',
+    'sale_order_amount_net',
+    'vendor_bills_total_net',
+    'adjusted_vendor_bill_amount',
+    'labor_costs',
+    'labor_costs_adjusted',
+    'total_hours_booked',
+    'total_hours_booked_adjusted',
+    'other_costs_net',
+    'total_costs_net',
+    'profit_loss_net',
+    'current_calculated_profit_loss',
+    'negative_difference_net',
+    'customer_skonto_taken',
+    'vendor_skonto_received',
+)
+
+# Per-project facts: stored financial totals of project.project
+PROJECT_MEASURES = PERIOD_MEASURES + (
+    'customer_invoices_net',
+    'customer_credit_notes_net',
+    'customer_invoiced_amount_gross',
+    'customer_paid_amount_gross',
+    'customer_outstanding_amount_gross',
+    'vendor_bills_net',
+    'vendor_credit_notes_net',
+    'vendor_bills_total_gross',
+    'total_all_costs_net',
+)
+
+DEFAULT_MEASURES = ('customer_invoiced_amount_net', 'total_costs_net', 'vendor_bills_total_net',
+                    'profit_loss_net', 'total_hours_booked')
+
+# Number of query results kept per database (LRU, keyed by query shape)
+QUERY_CACHE_SIZE = 128
+
+# Minimum number of seconds between two staleness checks against the database
+REFRESH_CHECK_INTERVAL = 2.0
+
+# Module-level cubes, one per database
+_cubes = {}
+_cubes_lock = threading.Lock()
+
+
+def _rank_groups(groups, order, limit):
+    """Sort groups by 'measure [asc|desc]' (descending by default) and keep the top-N."""
+    if order:
+        order_field, _sep, direction = order.partition(' ')
+        groups = sorted(groups, key=lambda g: g[order_field] or 0,
+                        reverse=direction.strip().lower() != 'asc')
+    if limit:
+        groups = groups[:limit]
+    return groups
+
+
+def _period_matches(label, values):
+    """Whether a 'YYYY-MM' label matches a period filter (list of labels or {'from', 'to'})."""
+    if isinstance(values, dict):
+        return (values.get('from') or '') <= label <= (values.get('to') or '9999-99')
+    return label in values
+
+
+class PortfolioCube:
+    """
+    Columnar, array-backed store of the portfolio facts of one database.
+
+    Two fact tables are kept in memory:
+    - project facts: one row per project with the stored financial totals
+    - period facts: one row per monthly snapshot (project × month)
+
+    Dimensions are dictionary-encoded (one integer code per row), measures are
+    array('d') columns. Period rows reference their project row, so changes of
+    client, manager or company are visible in both tables after a refresh.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.version = 0
+        self.checked_at = 0.0
+        self.project_signature = None
+        self.period_signature = None
+        self.query_cache = OrderedDict()
+
+        # Dictionary encoding for text dimensions (code 0 = empty)
+        self.labels = {'client_name': [False], 'head_of_project': [False], 'period': []}
+        self.codes = {'client_name': {False: 0}, 'head_of_project': {False: 0}, 'period': {}}
+
+        # Project facts
+        self.project_rows = {}  # project_id -> row index
+        self.project_ids = array('q')
+        self.write_dates = []
+        self.visible = array('b')  # active projects with analytic account
+        self.project_dims = {
+            'client_name': array('l'),
+            'head_of_project': array('l'),
+            'company_id': array('l'),
+        }
+        self.project_measures = {m: array('d') for m in PROJECT_MEASURES}
+
+        self._reset_periods()
+
+    def _reset_periods(self):
+        self.max_snapshot_id = 0
+        self.period_loaded_count = 0
+        self.period_write_watermark = None
+        self.period_project_row = array('l')
+        self.period_codes = array('l')
+        self.period_measures = {m: array('d') for m in PERIOD_MEASURES}
+
+    def _encode(self, dim, value):
+        value = value or False
+        code = self.codes[dim].get(value)
+        if code is None:
+            code = len(self.labels[dim])
+            self.labels[dim].append(value)
+            self.codes[dim][value] = code
+        return code
+
+    def load_project_rows(self, rows):
+        """Insert or update project rows: (id, write_date, client, manager, company, visible, *measures)."""
+        for row in rows:
+            project_id, write_date, client_name, head_of_project, company_id, visible = row[:6]
+            values = row[6:]
+            index = self.project_rows.get(project_id)
+            if index is None:
+                index = len(self.project_ids)
+                self.project_rows[project_id] = index
+                self.project_ids.append(project_id)
+                self.write_dates.append(write_date)
+                self.visible.append(1 if visible else 0)
+                self.project_dims['client_name'].append(self._encode('client_name', client_name))
+                self.project_dims['head_of_project'].append(self._encode('head_of_project', head_of_project))
+                self.project_dims['company_id'].append(company_id or 0)
+                for measure, value in zip(PROJECT_MEASURES, values):
+                    self.project_measures[measure].append(value or 0.0)
+            else:
+                self.write_dates[index] = write_date
+                self.visible[index] = 1 if visible else 0
+                self.project_dims['client_name'][index] = self._encode('client_name', client_name)
+                self.project_dims['head_of_project'][index] = self._encode('head_of_project', head_of_project)
+                self.project_dims['company_id'][index] = company_id or 0
+                for measure, value in zip(PROJECT_MEASURES, values):
+                    self.project_measures[measure][index] = value or 0.0
+
+    def hide_projects(self, project_ids):
+        """Deleted projects keep their row (no compaction) but are excluded from all results."""
+        for project_id in project_ids:
+            index = self.project_rows.get(project_id)
+            if index is not None:
+                self.visible[index] = 0
+                self.write_dates[index] = None
+
+    def load_period_rows(self, rows):
+        """Append monthly snapshot rows: (id, project_id, period, write_date, *measures)."""
+        for row in rows:
+            snapshot_id, project_id, period, write_date = row[:4]
+            self.period_loaded_count += 1
+            self.max_snapshot_id = max(self.max_snapshot_id, snapshot_id)
+            if write_date and (self.period_write_watermark is None or write_date > self.period_write_watermark):
+                self.period_write_watermark = write_date
+            project_row = self.project_rows.get(project_id)
+            if project_row is None:
+                continue
+            self.period_project_row.append(project_row)
+            self.period_codes.append(self._encode('period', period))
+            for measure, value in zip(PERIOD_MEASURES, row[4:]):
+                self.period_measures[measure].append(value or 0.0)
+
+    def bump_version(self):
+        self.version += 1
+        self.query_cache.clear()
+
+    def _filter_codes(self, dim, values):
+        """Translate filter values of a dimension into the set of matching codes."""
+        if dim == 'company_id':
+            return {int(v) for v in values}
+        if dim == 'period' and isinstance(values, dict):
+            return {code for code, label in enumerate(self.labels['period'])
+                    if _period_matches(label, values)}
+        return {self.codes[dim][v or False] for v in values if (v or False) in self.codes[dim]}
+
+    def query(self, group_by, filters, measures, order, limit, company_ids):
+        """Group, filter and rank the facts. Results are cached per query shape until the next refresh."""
+        cache_key = (
+            tuple(group_by),
+            tuple(sorted((dim, repr(value)) for dim, value in filters.items())),
+            tuple(measures), order, limit, tuple(sorted(company_ids)),
+        )
+        cached = self.query_cache.get(cache_key)
+        if cached is not None:
+            self.query_cache.move_to_end(cache_key)
+            return cached
+
+        use_periods = 'period' in group_by or 'period' in filters
+        if use_periods:
+            row_count = len(self.period_codes)
+            project_row = self.period_project_row
+            measure_columns = self.period_measures
+        else:
+            row_count = len(self.project_ids)
+            project_row = range(row_count)
+            measure_columns = self.project_measures
+
+        def dimension_column(dim):
+            if dim == 'period':
+                return self.period_codes
+            column = self.project_dims[dim]
+            return [column[p] for p in project_row] if use_periods else column
+
+        # Row selection: visible projects of the allowed companies (or without
+        # company, stored as 0) matching all filters
+        company_column = self.project_dims['company_id']
+        allowed_companies = set(company_ids) | {0}
+        rows = [
+            i for i in range(row_count)
+            if self.visible[project_row[i]] and company_column[project_row[i]] in allowed_companies
+        ]
+        for dim, values in filters.items():
+            if not isinstance(values, (list, tuple, dict)):
+                values = [values]
+            allowed = self._filter_codes(dim, values)
+            column = dimension_column(dim)
+            rows = [i for i in rows if column[i] in allowed]
+
+        # Grouping on dictionary codes, decoded only for the output
+        key_columns = [dimension_column(dim) for dim in group_by]
+        groups = {}
+        for i in rows:
+            key = tuple(column[i] for column in key_columns)
+            groups.setdefault(key, []).append(i)
+
+        result_groups = []
+        totals = {measure: 0.0 for measure in measures}
+        for key, group_rows in groups.items():
+            group = {'__count': len(group_rows)}
+            for dim, code in zip(group_by, key):
+                group[dim] = code if dim == 'company_id' else self.labels[dim][code]
+            for measure in measures:
+                column = measure_columns[measure]
+                value = sum(column[i] for i in group_rows)
+                group[measure] = value
+                totals[measure] += value
+            result_groups.append(group)
+
+        result_groups = _rank_groups(result_groups, order, limit)
+
+        result = {
+            'fact_table': 'period' if use_periods else 'project',
+            'groups': result_groups,
+            'totals': dict(totals, __count=len(rows)),
+        }
+        self.query_cache[cache_key] = result
+        if len(self.query_cache) > QUERY_CACHE_SIZE:
+            self.query_cache.popitem(last=False)
+        return result
+
+
+class ProjectPortfolioCube(models.AbstractModel):
+    """
+    In-memory analytic cube over the project portfolio.
+
+    Serves grouping, filtering and top-N queries by client, project manager,
+    company and month without going through read_group on project.project.
+    The cube is built once per database and worker, then refreshed
+    incrementally: only projects whose write_date changed are reloaded and
+    only new monthly snapshots are appended.
+    """
+    _name = 'project.portfolio.cube'
+    _description = 'Project Portfolio Cube'
+
+    @api.model
+    def _get_cube(self):
+        dbname = self.env.cr.dbname
+        with _cubes_lock:
+            cube = _cubes.get(dbname)
+            if cube is None:
+                cube = _cubes[dbname] = PortfolioCube()
+        return cube
+
+    @api.model
+    def invalidate_cube(self):
+        """Drop the in-memory cube of this database; it is rebuilt on the next query."""
+        with _cubes_lock:
+            _cubes.pop(self.env.cr.dbname, None)
+
+    @api.model
+    def _refresh_cube(self, cube, force=False):
+        """Bring the cube up to date with the database (incremental)."""
+        now = time.monotonic()
+        if not force and now - cube.checked_at < REFRESH_CHECK_INTERVAL:
+            return
+        self.env['project.project'].flush_model()
+        self.env['project.financial.snapshot'].flush_model()
+        cr = self.env.cr
+        changed = False
+
+        # 1. Project facts: cheap signature first, then reload changed rows only
+        cr.execute(SQL("""
+            SELECT count(*), max(write_date), sum(extract(epoch FROM write_date))
+              FROM project_project
+        """))
+        project_signature = cr.fetchone()
+        if project_signature != cube.project_signature:
+            cr.execute(SQL("SELECT id, write_date FROM project_project"))
+            current = dict(cr.fetchall())
+            changed_ids = [
+                project_id for project_id, write_date in current.items()
+                if project_id not in cube.project_rows
+                or cube.write_dates[cube.project_rows[project_id]] != write_date
+            ]
+            removed_ids = [project_id for project_id in cube.project_rows if project_id not in current]
+            if changed_ids:
+                cr.execute(SQL(
+                    """
+                    SELECT id, write_date, client_name, head_of_project, company_id,
+                           active AND COALESCE(has_analytic_account, FALSE), %s
+                      FROM project_project
+                     WHERE id = ANY(%s)
+                    """,
+                    SQL(', ').join(SQL.identifier(m) for m in PROJECT_MEASURES),
+                    changed_ids,
+                ))
+                cube.load_project_rows(cr.fetchall())
+            if removed_ids:
+                cube.hide_projects(removed_ids)
+            cube.project_signature = project_signature
+            changed = changed or bool(changed_ids or removed_ids)
+            _logger.debug(f"Portfolio cube: reloaded {len(changed_ids)} project row(s), removed {len(removed_ids)}")
+
+        # 2. Period facts: append new monthly snapshots, rebuild if loaded ones were removed or edited
+        cr.execute(SQL("""
+            SELECT count(*), max(id), max(write_date)
+              FROM project_financial_snapshot
+             WHERE snapshot_type = 'monthly'
+        """))
+        period_signature = cr.fetchone()
+        if period_signature != cube.period_signature:
+            cr.execute(SQL(
+                """
+                SELECT count(*),
+                       count(*) FILTER (WHERE write_date > %s)
+                  FROM project_financial_snapshot
+                 WHERE snapshot_type = 'monthly' AND id <= %s
+                """,
+                cube.period_write_watermark or '1970-01-01',
+                cube.max_snapshot_id,
+            ))
+            loaded_count, edited_count = cr.fetchone()
+            if loaded_count != cube.period_loaded_count or edited_count:
+                cube._reset_periods()
+            cr.execute(SQL(
+                """
+                SELECT id, project_id, to_char(snapshot_date, 'YYYY-MM'), write_date, %s
+                  FROM project_financial_snapshot
+                 WHERE snapshot_type = 'monthly' AND id > %s
+                 ORDER BY id
+                """,
+                SQL(', ').join(SQL.identifier(m) for m in PERIOD_MEASURES),
+                cube.max_snapshot_id,
+            ))
+            cube.load_period_rows(cr.fetchall())
+            cube.period_signature = period_signature
+            changed = True
+
+        if changed:
+            cube.bump_version()
+        cube.checked_at = now
+
+    @api.model
+    def query(self, group_by=None, filters=None, measures=None, order=None, limit=None):
+        """
+        Group, filter and rank portfolio facts.
+
+        Queries touching the 'period' dimension (group or filter) run on the
+        monthly snapshot facts, all others on the current project totals.
+        Only active projects with an analytic account in the user's allowed
+        companies, or without company, are included.
+
+        Args:
+            group_by: List of dimensions ('client_name', 'head_of_project', 'company_id', 'period')
+            filters: Dict {dimension: value or list of values}. 'period' also
+                     accepts {'from': 'YYYY-MM', 'to': 'YYYY-MM'}
+            measures: List of measure fields (defaults to revenue, costs, profit, hours)
+            order: Measure to sort by, e.g. 'profit_loss_net desc'
+            limit: Top-N groups to return
+
+        Returns:
+            dict: {
+                'fact_table': 'project' or 'period',
+                'groups': [{<dimension>: value, '__count': int, <measure>: float}, ...],
+                'totals': {'__count': int, <measure>: float},
+            }
+        """
+        if not self.env.user.has_group('account.group_account_readonly'):
+            raise AccessError(_('You are not allowed to access the project portfolio cube.'))
+        self.env['project.project'].check_access('read')
+
+        group_by = list(group_by or [])
+        filters = dict(filters or {})
+        measures = list(measures or DEFAULT_MEASURES)
+
+        invalid_dims = [dim for dim in list(group_by) + list(filters) if dim not in CUBE_DIMENSIONS]
+        if invalid_dims:
+            raise UserError(_('Unknown cube dimension(s): %s') % ', '.join(invalid_dims))
+        available_measures = PERIOD_MEASURES if ('period' in group_by or 'period' in filters) else PROJECT_MEASURES
+        invalid_measures = [m for m in measures if m not in available_measures]
+        if order:
+            order_field = order.split(' ')[0]
+            if order_field not in measures:
+                invalid_measures.append(order_field)
+        if invalid_measures:
+            raise UserError(_('Unknown cube measure(s): %s') % ', '.join(invalid_measures))
+        for dim, values in filters.items():
+            if dim != 'period' and not isinstance(values, (list, tuple)):
+                filters[dim] = [values]
+        if 'company_id' in filters:
+            try:
+                filters['company_id'] = [int(v or 0) for v in filters['company_id']]
+            except (TypeError, ValueError):
+                raise UserError(_('Invalid company filter: %s') % (filters['company_id'],))
+
+        # The cube ignores project record rules: users who may not read every
+        # project get the same result grouped over their visible projects
+        if not self._can_read_all_projects():
+            return self._query_visible_projects(group_by, filters, measures, order or None, int(limit or 0))
+
+        cube = self._get_cube()
+        with cube.lock:
+            self._refresh_cube(cube)
+            return cube.query(
+                group_by, filters, measures, order or None, int(limit or 0),
+                self.env.companies.ids,
+            )
+
+    @api.model
+    def _get_project_domain(self, filters=None):
+        """Domain of the projects in the cube, restricted by the non-period filters."""
+        domain = [
+            ('active', '=', True),
+            ('has_analytic_account', '=', True),
+            ('company_id', 'in', self.env.companies.ids + [False]),
+        ]
+        for dim, values in (filters or {}).items():
+            if dim != 'period':
+                domain.append((dim, 'in', [v or False for v in values]))
+        return domain
+
+    @api.model
+    def _can_read_all_projects(self):
+        """Whether the record rules let the user read every project of the cube."""
+        if self.env.su:
+            return True
+        Project = self.env['project.project']
+        domain = self._get_project_domain()
+        return Project.search_count(domain) == Project.sudo().search_count(domain)
+
+    @api.model
+    def _query_visible_projects(self, group_by, filters, measures, order, limit):
+        """
+        Same result as PortfolioCube.query, grouped with _read_group over the
+        projects (or their monthly snapshots) visible to the user.
+        """
+        Project = self.env['project.project']
+        project_domain = self._get_project_domain(filters)
+        aggregates = ['__count'] + ['%s:sum' % measure for measure in measures]
+        use_periods = 'period' in group_by or 'period' in filters
+
+        groups = {}
+        if use_periods:
+            # Group per project and month, then fold into the requested dimensions
+            rows = self.env['project.financial.snapshot']._read_group(
+                [('snapshot_type', '=', 'monthly'), ('project_id', 'in', Project._search(project_domain))],
+                ['project_id', 'snapshot_date:month'], aggregates,
+            )
+            for project, month, count, *values in rows:
+                label = month.strftime('%Y-%m')
+                if 'period' in filters and not _period_matches(label, filters['period']):
+                    continue
+                dims = {
+                    'client_name': project.client_name or False,
+                    'head_of_project': project.head_of_project or False,
+                    'company_id': project.company_id.id or 0,
+                    'period': label,
+                }
+                key = tuple(dims[dim] for dim in group_by)
+                group = groups.get(key)
+                if group is None:
+                    group = groups[key] = dict({dim: dims[dim] for dim in group_by}, __count=0)
+                    group.update(dict.fromkeys(measures, 0.0))
+                group['__count'] += count
+                for measure, value in zip(measures, values):
+                    group[measure] += value or 0.0
+        else:
+            for key in Project._read_group(project_domain, group_by, aggregates):
+                group = {}
+                for dim, value in zip(group_by, key):
+                    group[dim] = (value.id or 0) if dim == 'company_id' else (value or False)
+                group['__count'] = key[len(group_by)]
+                for measure, value in zip(measures, key[len(group_by) + 1:]):
+                    group[measure] = value or 0.0
+                groups[len(groups)] = group
+
+        result_groups = list(groups.values())
+        totals = {measure: sum(group[measure] for group in result_groups) for measure in measures}
+        totals['__count'] = sum(group['__count'] for group in result_groups)
+        return {
+            'fact_table': 'period' if use_periods else 'project',
+            'groups': _rank_groups(result_groups, order, limit),
+            'totals': totals,
+        }
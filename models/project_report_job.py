@@ -0,0 +1,267 @@
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from odoo.tools import SQL
+from datetime import timedelta
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+
+class ProjectReportJob(models.Model):
+    """
+    Queue of project financial PDF reports rendered in the background.
+
+    Printing reports for hundreds of projects blocks an HTTP worker for minutes.
+    Instead, the print action enqueues a job; the cron renders queued jobs one
+    after the other, in batches, and notifies the user (bus notification, and
+    the project chatter for single-project reports) when the PDF is ready.
+    """
+    _name = 'project.report.job'
+    _description = 'Project Report Job'
+    _order = 'create_date desc, id desc'
+
+    name = fields.Char(string='Name', required=True)
+    report_id = fields.Many2one(
+        'ir.actions.report',
+        string='Report',
+        required=True,
+        ondelete='cascade',
+    )
+    project_ids = fields.Many2many(
+        'project.project',
+        string='Projects',
+    )
+    project_count = fields.Integer(
+        string='Projects',
+        compute='_compute_project_count',
+    )
+    user_id = fields.Many2one(
+        'res.users',
+        string='Requested By',
+        required=True,
+        default=lambda self: self.env.user,
+        index=True,
+    )
+    company_id = fields.Many2one(
+        'res.company',
+        string='Company',
+        required=True,
+        default=lambda self: self.env.company,
+    )
+    state = fields.Selection([
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', required=True, default='queued', index=True)
+    attachment_id = fields.Many2one(
+        'ir.attachment',
+        string='PDF',
+        readonly=True,
+        ondelete='set null',
+    )
+    date_started = fields.Datetime(string='Started', readonly=True)
+    date_done = fields.Datetime(string='Finished', readonly=True)
+    duration = fields.Float(string='Duration (s)', readonly=True)
+    error_message = fields.Text(string='Error', readonly=True)
+
+    @api.depends('project_ids')
+    def _compute_project_count(self):
+        for job in self:
+            job.project_count = len(job.project_ids)
+
+    @api.model
+    def enqueue(self, report_ref, project_ids):
+        """
+        Enqueue a background rendering of a project report.
+
+        Args:
+            report_ref: XML id or record of the ir.actions.report
+            project_ids: List of project IDs to print
+
+        Returns:
+            dict: Client notification action
+        """
+        if not project_ids:
+            raise UserError(_('Please select at least one project.'))
+        report = self.env['ir.actions.report']._get_report(report_ref)
+        projects = self.env['project.project'].browse(project_ids)
+        projects.check_access('read')
+
+        job = self.create({
+            'name': _('%(report)s (%(count)s project(s))', report=report.name, count=len(projects)),
+            'report_id': report.id,
+            'project_ids': [(6, 0, projects.ids)],
+        })
+        cron = self.env.ref('project_statistic.ir_cron_process_report_jobs', raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger()
+
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Report Queued'),
+                'message': _('"%s" is being generated in the background. You will be notified when the PDF is ready.') % job.name,
+                'type': 'info',
+                'sticky': False,
+            }
+        }
+
+    @api.model
+    def _get_batch_size(self):
+        """Maximum number of jobs rendered per cron run (system parameter)."""
+        return max(1, int(self.env['ir.config_parameter'].sudo().get_param(
+            'project_statistic.report_job_batch_size', default='2'
+        )))
+
+    @api.model
+    def _process_queued_jobs(self, auto_commit=True):
+        """
+        Cron job: render queued report jobs.
+
+        The cron runs in one worker at a time, so the jobs are rendered
+        sequentially. Each run claims at most project_statistic.report_job_batch_size
+        jobs (with FOR UPDATE SKIP LOCKED, so a manual run never renders the same
+        job as the cron) and triggers itself again while jobs are queued, which
+        keeps a run short and lets other crons in between.
+
+        Args:
+            auto_commit: Commit after each job (disabled in tests)
+
+        Returns:
+            int: Number of processed jobs
+        """
+        self._fail_stale_jobs()
+
+        self.env.cr.execute(SQL(
+            """
+            SELECT id FROM project_report_job
+             WHERE state = 'queued'
+             ORDER BY id
+             LIMIT %s
+               FOR UPDATE SKIP LOCKED
+            """,
+            self._get_batch_size(),
+        ))
+        jobs = self.browse([row[0] for row in self.env.cr.fetchall()])
+        if not jobs:
+            return 0
+
+        jobs.write({'state': 'running', 'date_started': fields.Datetime.now()})
+        if auto_commit:
+            self.env.cr.commit()
+
+        for job in jobs:
+            job._render_job()
+            if auto_commit:
+                self.env.cr.commit()
+
+        # More work waiting: run again as soon as possible
+        if self.search_count([('state', '=', 'queued')], limit=1):
+            cron = self.env.ref('project_statistic.ir_cron_process_report_jobs', raise_if_not_found=False)
+            if cron:
+                cron._trigger()
+
+        return len(jobs)
+
+    @api.model
+    def _fail_stale_jobs(self):
+        """Mark jobs stuck in 'running' (e.g. worker killed) as failed."""
+        timeout = int(self.env['ir.config_parameter'].sudo().get_param(
+            'project_statistic.report_job_timeout_minutes', default='60'
+        ))
+        stale = self.search([
+            ('state', '=', 'running'),
+            ('date_started', '<', fields.Datetime.now() - timedelta(minutes=timeout)),
+        ])
+        if stale:
+            stale.write({
+                'state': 'failed',
+                'date_done': fields.Datetime.now(),
+                'error_message': _('Rendering did not finish within %s minutes.') % timeout,
+            })
+
+    def _render_job(self):
+        """Render the PDF of one job as the requesting user and notify them."""
+        self.ensure_one()
+        start = time.perf_counter()
+        report_env = self.env(user=self.user_id, context=dict(self.env.context, lang=self.user_id.lang))
+        try:
+            with self.env.cr.savepoint():
+                pdf_content, _report_type = report_env['ir.actions.report'].with_company(self.company_id)._render_qweb_pdf(
+                    self.report_id.report_name, res_ids=self.project_ids.ids,
+                )
+                attachment = self.env['ir.attachment'].create({
+                    'name': '%s - %s.pdf' % (self.report_id.name, fields.Date.context_today(self)),
+                    'type': 'binary',
+                    'raw': pdf_content,
+                    'mimetype': 'application/pdf',
+                    'res_model': self._name,
+                    'res_id': self.id,
+                })
+        except Exception as e:
+            _logger.error(f"Error rendering report job {self.id}: {e}", exc_info=True)
+            self.write({
+                'state': 'failed',
+                'date_done': fields.Datetime.now(),
+                'duration': time.perf_counter() - start,
+                'error_message': str(e),
+            })
+            self._notify_user(_('Report Failed'), _('"%s" could not be generated.') % self.name, 'danger')
+            return
+
+        self.write({
+            'state': 'done',
+            'attachment_id': attachment.id,
+            'date_done': fields.Datetime.now(),
+            'duration': time.perf_counter() - start,
+            'error_message': False,
+        })
+
+        # Single-project reports are also posted in the project's chatter
+        if len(self.project_ids) == 1:
+            self.project_ids.message_post(
+                body=_('Financial report generated in the background.'),
+                attachment_ids=attachment.ids,
+                author_id=self.user_id.partner_id.id,
+            )
+        self._notify_user(_('Report Ready'), _('"%s" is ready for download.') % self.name, 'success')
+
+    def _notify_user(self, title, message, notification_type):
+        """Send a plain bus notification to the requesting user.
+
+        The web client shows the message as text, so it points to the job
+        list, where the Download button (action_download) serves the PDF.
+        """
+        self.ensure_one()
+        if self.attachment_id:
+            message = '%s %s' % (message, _('Download it from Report Jobs.'))
+        self.env['bus.bus']._sendone(self.user_id.partner_id, 'simple_notification', {
+            'title': title,
+            'message': message,
+            'type': notification_type,
+            'sticky': True,
+        })
+
+    def action_download(self):
+        """Download the generated PDF."""
+        self.ensure_one()
+        if not self.attachment_id:
+            raise UserError(_('The report has not been generated yet.'))
+        return {
+            'type': 'ir.actions.act_url',
+            'url': '/web/content/%s?download=true' % self.attachment_id.id,
+            'target': 'self',
+        }
+
+    def action_retry(self):
+        """Put failed jobs back into the queue."""
+        self.filtered(lambda job: job.state == 'failed').write({
+            'state': 'queued',
+            'error_message': False,
+            'date_started': False,
+            'date_done': False,
+        })
+        self.env.ref('project_statistic.ir_cron_process_report_jobs').sudo()._trigger()
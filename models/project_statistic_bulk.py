@@ -0,0 +1,221 @@
+from odoo import models, fields, api, _
+from odoo.exceptions import AccessError, UserError
+from odoo.tools import SQL
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Models served by the bulk API
+BULK_MODELS = ('project.project', 'project.financial.snapshot')
+
+DEFAULT_BULK_LIMIT = 10000
+MAX_BULK_LIMIT = 50000
+
+# Cursor of the "changed since" mode: '<write_date>|<id>'
+CURSOR_SEPARATOR = '|'
+
+# Rows per FETCH of a streamed export
+STREAM_BATCH_SIZE = 2000
+
+
+class ProjectStatisticBulk(models.AbstractModel):
+    """
+    Columnar bulk read of project financials and snapshots for BI extracts.
+
+    Returns the requested stored fields as one array per field, read with a
+    single SELECT per page (no recordsets, no per-row conversion through the
+    ORM). Pages are addressed with a keyset cursor instead of OFFSET, so every
+    page costs the same regardless of its position.
+
+    Two modes:
+    - full extract: rows ordered by id, cursor = last id
+    - changed since: rows with write_date after a timestamp, ordered by
+      (write_date, id), cursor = '<write_date>|<id>'. The last cursor of a run
+      can be passed to the next run to fetch only the rows changed meanwhile.
+    """
+    _name = 'project.statistic.bulk'
+    _description = 'Project Statistic Bulk Read'
+
+    @api.model
+    def _check_bulk_fields(self, Model, field_names):
+        """Validate the requested fields: stored, single-valued and readable by the user."""
+        invalid = []
+        for fname in field_names:
+            field = Model._fields.get(fname)
+            if (
+                not field or not field.store or not field.column_type
+                or (field.groups and not self.env.su and not self.env.user.has_groups(field.groups))
+            ):
+                invalid.append(fname)
+        if invalid:
+            raise UserError(_('Fields not available for bulk read on %(model)s: %(fields)s',
+                              model=Model._name, fields=', '.join(invalid)))
+
+    @api.model
+    def _get_bulk_model(self, model):
+        """Model of a bulk read after the access checks."""
+        if model not in BULK_MODELS:
+            raise UserError(_('Bulk read is not available for %s.', model))
+        if not self.env.su and not self.env.user.has_group('account.group_account_readonly'):
+            raise AccessError(_('You are not allowed to use the project statistic bulk read.'))
+        Model = self.env[model]
+        Model.check_access('read')
+        return Model
+
+    @api.model
+    def _get_bulk_field_names(self, Model, field_names):
+        """Requested field names, deduplicated, with 'id' first, after validation."""
+        field_names = ['id'] + [fname for fname in dict.fromkeys(field_names or []) if fname != 'id']
+        self._check_bulk_fields(Model, field_names)
+        return field_names
+
+    @api.model
+    def _parse_cursor(self, cursor):
+        """Split a cursor into (write_date string or None, id)."""
+        try:
+            if CURSOR_SEPARATOR in cursor:
+                write_date, record_id = cursor.split(CURSOR_SEPARATOR, 1)
+                return write_date, int(record_id)
+            return None, int(cursor)
+        except (TypeError, ValueError):
+            raise UserError(_('Invalid bulk read cursor: %s', cursor))
+
+    @api.model
+    def read_columns(self, model, field_names, domain=None, cursor=None, changed_since=None, limit=None):
+        """
+        Read stored fields of project.project or project.financial.snapshot as columns.
+
+        Record rules, the active filter and the allowed companies apply as for
+        search_read. Many2one fields are returned as ids, dates and datetimes as
+        strings.
+
+        Args:
+            model: 'project.project' or 'project.financial.snapshot'
+            field_names: List of stored field names ('id' is always included)
+            domain: Optional search domain (same syntax as search_read)
+            cursor: next_cursor of the previous page (or of the previous run)
+            changed_since: 'YYYY-MM-DD HH:MM:SS' to start a changed-since extract
+                           (ignored when a changed-since cursor is given)
+            limit: Rows per page (default 10000, at most 50000)
+
+        Returns:
+            dict: {
+                'fields': [field names],
+                'columns': {field name: [values]},
+                'count': int,  # rows in this page
+                'next_cursor': str,  # position after this page, pass it back to continue
+                'has_more': bool,
+                'max_write_date': str,  # latest write_date of this page (changed_since of the next run)
+            }
+
+        Example (JSON-RPC):
+            {"model": "project.financial.snapshot",
+             "field_names": ["project_id", "snapshot_date", "profit_loss_net"],
+             "domain": [["snapshot_type", "=", "monthly"]],
+             "changed_since": "2025-01-01 00:00:00"}
+        """
+        Model = self._get_bulk_model(model)
+        field_names = self._get_bulk_field_names(Model, field_names)
+        limit = min(int(limit or DEFAULT_BULK_LIMIT), MAX_BULK_LIMIT)
+
+        cursor_write_date, cursor_id = self._parse_cursor(cursor) if cursor else (None, 0)
+        if cursor_write_date is None and changed_since and not cursor:
+            cursor_write_date = changed_since
+        incremental = cursor_write_date is not None
+
+        Model.flush_model(field_names + ['write_date'])
+        query = Model._search(domain or [])
+        id_column = SQL.identifier(query.table, 'id')
+        write_date_column = SQL.identifier(query.table, 'write_date')
+        if incremental:
+            query.add_where(SQL(
+                "(%s, %s) > (%s::timestamp, %s)", write_date_column, id_column, cursor_write_date, cursor_id,
+            ))
+            query.order = SQL("%s, %s", write_date_column, id_column)
+        else:
+            query.add_where(SQL("%s > %s", id_column, cursor_id))
+            query.order = id_column
+        query.limit = limit + 1
+
+        self.env.cr.execute(query.select(
+            *(Model._field_to_sql(query.table, fname, query) for fname in field_names),
+            SQL("%s::text", write_date_column),
+        ))
+        rows = self.env.cr.fetchall()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        if rows:
+            last = rows[-1]
+            next_cursor = f"{last[-1]}{CURSOR_SEPARATOR}{last[0]}" if incremental else str(last[0])
+        elif incremental:
+            next_cursor = f"{cursor_write_date}{CURSOR_SEPARATOR}{cursor_id}"
+        else:
+            next_cursor = str(cursor_id)
+
+        columns = {}
+        for index, fname in enumerate(field_names):
+            field = Model._fields[fname]
+            values = [row[index] for row in rows]
+            if field.type == 'date':
+                values = [fields.Date.to_string(value) if value else None for value in values]
+            elif field.type == 'datetime':
+                values = [fields.Datetime.to_string(value) if value else None for value in values]
+            columns[fname] = values
+
+        _logger.debug("Bulk read %s: %s row(s), has_more=%s", model, len(rows), has_more)
+        return {
+            'fields': field_names,
+            'columns': columns,
+            'count': len(rows),
+            'next_cursor': next_cursor,
+            'has_more': has_more,
+            'max_write_date': max((row[-1] for row in rows), default=None),
+        }
+
+    @api.model
+    def _prepare_stream_query(self, model, field_names, domain=None):
+        """
+        SELECT of a streamed export, ordered by id.
+
+        Record rules are applied here, in the requesting environment; the
+        returned SQL can then be executed on a separate cursor by stream_rows().
+
+        Returns:
+            tuple: (field names, SQL)
+        """
+        Model = self._get_bulk_model(model)
+        field_names = self._get_bulk_field_names(Model, field_names)
+        Model.flush_model(field_names)
+        query = Model._search(domain or [])
+        query.order = SQL.identifier(query.table, 'id')
+        return field_names, query.select(
+            *(Model._field_to_sql(query.table, fname, query) for fname in field_names)
+        )
+
+
+def stream_rows(registry, query, batch_size=STREAM_BATCH_SIZE):
+    """
+    Yield the rows of a SELECT in batches through a server-side cursor.
+
+    Runs on its own database cursor, because a streamed HTTP response is
+    consumed after the request cursor is closed. Only one batch is held in
+    memory at a time.
+
+    Args:
+        registry: Registry of the database
+        query: SQL of the SELECT (see _prepare_stream_query)
+        batch_size: Rows per FETCH
+
+    Yields:
+        list: Rows (tuples) of one batch
+    """
+    with registry.cursor() as cr:
+        cr.execute(SQL("DECLARE project_statistic_stream NO SCROLL CURSOR FOR %s", query))
+        while True:
+            cr.execute(SQL("FETCH FORWARD %s FROM project_statistic_stream", batch_size))
+            rows = cr.fetchall()
+            if not rows:
+                break
+            yield rows
+        cr.execute(SQL("CLOSE project_statistic_stream"))
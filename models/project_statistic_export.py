@@ -0,0 +1,274 @@
+from odoo import models, fields, api, tools, _
+from odoo.exceptions import UserError, ValidationError
+import logging
+import os
+import shutil
+import time
+
+from .project_portfolio_cube import PERIOD_MEASURES, PROJECT_MEASURES
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+_logger = logging.getLogger(__name__)
+
+# Exported fields per dataset (all stored, read through project.statistic.bulk)
+EXPORT_DATASETS = {
+    'projects': {
+        'model': 'project.project',
+        'fields': ('name', 'client_name', 'head_of_project', 'company_id', 'currency_id',
+                   'date_start', 'date', 'write_date') + PROJECT_MEASURES,
+        'year_field': None,
+    },
+    'snapshots': {
+        'model': 'project.financial.snapshot',
+        'fields': ('project_id', 'company_id', 'currency_id', 'snapshot_date', 'snapshot_type',
+                   'period_label', 'write_date') + PERIOD_MEASURES,
+        'year_field': 'snapshot_date',
+    },
+}
+
+# Hive convention for partitions without value
+NULL_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+
+
+class ProjectStatisticExport(models.Model):
+    """
+    Export of the project financial facts to Parquet or Arrow IPC files.
+
+    Writes project totals and financial snapshots (monthly snapshots are the
+    per-period facts) into a directory analysts can query directly with DuckDB,
+    pandas or Spark. Rows are read page by page with the keyset bulk read and
+    written as record batches, so memory stays bounded by the batch size.
+    Optional Hive-style partitioning by company and snapshot year:
+
+        <directory>/snapshots/company_id=1/year=2025/snapshots.parquet
+
+    Each run replaces the dataset directories atomically. Requires the Python
+    package pyarrow.
+    """
+    _name = 'project.statistic.export'
+    _description = 'Project Statistic Data Export'
+    _order = 'name, id'
+
+    name = fields.Char(string='Name', required=True)
+    active = fields.Boolean(string='Active', default=True,
+                            help="Active exports are run by the nightly cron.")
+    file_format = fields.Selection([
+        ('parquet', 'Parquet'),
+        ('arrow', 'Arrow IPC'),
+    ], string='Format', required=True, default='parquet')
+    export_projects = fields.Boolean(string='Project Financials', default=True)
+    export_snapshots = fields.Boolean(string='Financial Snapshots', default=True)
+    partition_by_company = fields.Boolean(string='Partition by Company', default=True)
+    partition_by_year = fields.Boolean(
+        string='Partition by Year',
+        default=True,
+        help="Partition the snapshots by the year of the snapshot date (projects are not dated)."
+    )
+    directory = fields.Char(
+        string='Directory',
+        groups='base.group_system',
+        help="Target directory on the server, inside the base directory "
+             "(project_statistic.export_directory or the filestore of the database). Empty: the base directory."
+    )
+    batch_size = fields.Integer(string='Batch Size', default=10000,
+                                help="Rows per record batch (bounds the memory use).")
+
+    last_run = fields.Datetime(string='Last Run', readonly=True)
+    last_duration = fields.Float(string='Duration (s)', readonly=True)
+    last_row_count = fields.Integer(string='Rows', readonly=True)
+    last_file_count = fields.Integer(string='Files', readonly=True)
+    last_error = fields.Text(string='Error', readonly=True)
+
+    @api.model
+    def _get_base_directory(self):
+        """Base directory of all exports: project_statistic.export_directory or the filestore."""
+        directory = self.env['ir.config_parameter'].sudo().get_param('project_statistic.export_directory')
+        if not directory:
+            directory = os.path.join(tools.config.filestore(self.env.cr.dbname), 'project_statistic_export')
+        return os.path.realpath(directory)
+
+    def _get_directory(self):
+        """Target directory of this export (always inside the base directory)."""
+        self.ensure_one()
+        base_directory = self._get_base_directory()
+        directory = os.path.realpath(os.path.join(base_directory, self.sudo().directory or ''))
+        if os.path.commonpath([base_directory, directory]) != base_directory:
+            raise ValidationError(_('The export directory %(directory)s is outside of the base directory '
+                                    '%(base)s.', directory=self.sudo().directory, base=base_directory))
+        return os.path.join(directory, f'export_{self.id}')
+
+    @api.constrains('directory')
+    def _check_directory(self):
+        for export in self:
+            export._get_directory()
+
+    def action_run_export(self):
+        """Run the export now (button)."""
+        if pyarrow is None:
+            raise UserError(_('The Parquet/Arrow export requires the Python package "pyarrow" '
+                              '(pip install pyarrow).'))
+        for export in self:
+            export._run_export()
+        return True
+
+    @api.model
+    def _cron_run_exports(self):
+        """Cron job: run all active exports."""
+        if pyarrow is None:
+            _logger.warning("Skipping project statistic exports: the Python package pyarrow is not installed")
+            return
+        for export in self.search([]):
+            try:
+                with self.env.cr.savepoint():
+                    export._run_export()
+            except Exception as e:
+                _logger.exception(f"Project statistic export {export.id} failed")
+                export.write({'last_run': fields.Datetime.now(), 'last_error': str(e)})
+
+    def _run_export(self):
+        """Export the selected datasets and record the run statistics."""
+        self.ensure_one()
+        start = time.perf_counter()
+        directory = self._get_directory()
+        os.makedirs(directory, exist_ok=True)
+
+        row_count = file_count = 0
+        for dataset, selected in (('projects', self.export_projects), ('snapshots', self.export_snapshots)):
+            if not selected:
+                continue
+            # Write into a temporary directory, then swap it with the previous export
+            target = os.path.join(directory, dataset)
+            staging = os.path.join(directory, f'.{dataset}.{os.getpid()}.tmp')
+            shutil.rmtree(staging, ignore_errors=True)
+            try:
+                rows, files = self._export_dataset(dataset, staging)
+                if os.path.isdir(target):
+                    shutil.rmtree(target)
+                os.replace(staging, target)
+            finally:
+                shutil.rmtree(staging, ignore_errors=True)
+            row_count += rows
+            file_count += files
+
+        duration = time.perf_counter() - start
+        self.write({
+            'last_run': fields.Datetime.now(),
+            'last_duration': duration,
+            'last_row_count': row_count,
+            'last_file_count': file_count,
+            'last_error': False,
+        })
+        _logger.info(f"Project statistic export {self.id}: {row_count} rows in {file_count} file(s) "
+                     f"written to {directory} in {duration:.2f}s")
+
+    def _get_partitions(self, dataset):
+        """
+        Partitions of a dataset as (relative path, domain) pairs.
+
+        Returns:
+            list: [(path, domain), ...]; a single ('', []) when not partitioned
+        """
+        spec = EXPORT_DATASETS[dataset]
+        groupby = []
+        if self.partition_by_company:
+            groupby.append('company_id')
+        if self.partition_by_year and spec['year_field']:
+            groupby.append(f"{spec['year_field']}:year")
+        if not groupby:
+            return [('', [])]
+
+        partitions = []
+        Model = self.env[spec['model']].sudo().with_context(active_test=False)
+        for group in Model._read_group([], groupby):
+            path, domain = [], []
+            for gb, value in zip(groupby, group):
+                if gb == 'company_id':
+                    path.append(f"company_id={value.id or NULL_PARTITION}")
+                    domain.append(('company_id', '=', value.id or False))
+                else:
+                    year_field = spec['year_field']
+                    if value:
+                        path.append(f"year={value.year}")
+                        domain += [(year_field, '>=', f'{value.year}-01-01'),
+                                   (year_field, '<=', f'{value.year}-12-31')]
+                    else:
+                        path.append(f"year={NULL_PARTITION}")
+                        domain.append((year_field, '=', False))
+            partitions.append((os.path.join(*path), domain))
+        return partitions
+
+    def _get_arrow_schema(self, dataset):
+        """Arrow schema of a dataset, derived from the Odoo field types."""
+        spec = EXPORT_DATASETS[dataset]
+        Model = self.env[spec['model']]
+        arrow_types = {
+            'float': pyarrow.float64(),
+            'monetary': pyarrow.float64(),
+            'integer': pyarrow.int64(),
+            'many2one': pyarrow.int64(),
+            'boolean': pyarrow.bool_(),
+            'date': pyarrow.date32(),
+            'datetime': pyarrow.timestamp('s'),
+        }
+        return pyarrow.schema(
+            [pyarrow.field('id', pyarrow.int64(), nullable=False)]
+            + [pyarrow.field(fname, arrow_types.get(Model._fields[fname].type, pyarrow.string()))
+               for fname in spec['fields']]
+        )
+
+    def _export_dataset(self, dataset, directory):
+        """
+        Write one dataset, partition by partition, batch by batch.
+
+        Returns:
+            tuple: (number of rows, number of files)
+        """
+        spec = EXPORT_DATASETS[dataset]
+        schema = self._get_arrow_schema(dataset)
+        Model = self.env[spec['model']]
+        Bulk = self.env['project.statistic.bulk'].sudo().with_context(active_test=False)
+        extension = 'parquet' if self.file_format == 'parquet' else 'arrow'
+
+        row_count = file_count = 0
+        for path, domain in self._get_partitions(dataset):
+            partition_dir = os.path.join(directory, path)
+            os.makedirs(partition_dir, exist_ok=True)
+            file_path = os.path.join(partition_dir, f'{dataset}.{extension}')
+            if self.file_format == 'parquet':
+                writer = pyarrow.parquet.ParquetWriter(file_path, schema, compression='zstd')
+            else:
+                writer = pyarrow.ipc.new_file(file_path, schema)
+            try:
+                cursor = None
+                while True:
+                    page = Bulk.read_columns(spec['model'], list(spec['fields']), domain=domain,
+                                             cursor=cursor, limit=self.batch_size or None)
+                    if page['count']:
+                        writer.write_batch(self._to_record_batch(Model, schema, page['columns']))
+                        row_count += page['count']
+                    if not page['has_more']:
+                        break
+                    cursor = page['next_cursor']
+            finally:
+                writer.close()
+            file_count += 1
+        return row_count, file_count
+
+    def _to_record_batch(self, Model, schema, columns):
+        """Convert the column arrays of a bulk read page into an Arrow record batch."""
+        arrays = []
+        for arrow_field in schema:
+            values = columns[arrow_field.name]
+            field_type = Model._fields[arrow_field.name].type
+            if field_type == 'date':
+                values = [fields.Date.to_date(value) for value in values]
+            elif field_type == 'datetime':
+                values = [fields.Datetime.to_datetime(value) for value in values]
+            arrays.append(pyarrow.array(values, type=arrow_field.type))
+        return pyarrow.RecordBatch.from_arrays(arrays, schema=schema)
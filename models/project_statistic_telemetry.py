@@ -0,0 +1,221 @@
+from odoo import models, fields, api, tools, _
+from odoo.exceptions import UserError
+from odoo.tools import SQL, str2bool
+from contextlib import contextmanager
+from datetime import timedelta
+import logging
+import time
+
+from .compute_profiler import PROFILE_ATTACHMENT_PREFIX
+
+_logger = logging.getLogger(__name__)
+
+TELEMETRY_OPERATIONS = [
+    ('compute', 'Recompute'),
+    ('compute_hook', 'Recompute (Hook)'),
+    ('install', 'Initialization'),
+    ('wizard_refresh', 'Wizard Refresh'),
+    ('snapshot_cron', 'Snapshot Cron'),
+    ('dashboard', 'Dashboard'),
+    ('trend', 'Trend Data'),
+    ('report_render', 'Report Render'),
+]
+
+
+class ProjectStatisticTelemetry(models.Model):
+    """
+    Durations and volumes of the module's heavy operations.
+
+    One row per operation run, written with a single INSERT and without the
+    create/write audit columns. Rows older than
+    project_statistic.telemetry_retention_days are removed by a daily cron.
+    """
+    _name = 'project.statistic.telemetry'
+    _description = 'Project Statistic Telemetry'
+    _order = 'date desc, id desc'
+    _log_access = False
+
+    date = fields.Datetime(string='Date', required=True, readonly=True, index=True)
+    operation = fields.Selection(TELEMETRY_OPERATIONS, string='Operation', required=True, readonly=True)
+    duration = fields.Float(string='Duration (s)', readonly=True, digits=(16, 4))
+    query_count = fields.Integer(string='Queries', readonly=True)
+    record_count = fields.Integer(string='Records', readonly=True)
+    user_id = fields.Many2one('res.users', string='User', readonly=True)
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
+    profile_attachment_ids = fields.One2many(
+        'ir.attachment', 'res_id',
+        string='Compute Profile',
+        domain=[('res_model', '=', 'project.statistic.telemetry')],
+        readonly=True,
+    )
+
+    @api.model
+    def _is_enabled(self):
+        """Telemetry switch (system parameter project_statistic.telemetry_enabled)."""
+        return str2bool(self.env['ir.config_parameter'].sudo().get_param(
+            'project_statistic.telemetry_enabled', default='True'
+        ), default=True)
+
+    @api.model
+    def record(self, operation, duration, query_count=0, record_count=0):
+        """
+        Record one run of an operation.
+
+        Args:
+            operation: Key of TELEMETRY_OPERATIONS
+            duration: Wall time in seconds
+            query_count: Number of SQL queries
+            record_count: Number of processed records (projects, snapshots, ...)
+
+        Returns:
+            int: Id of the recorded run, or None when telemetry is disabled
+        """
+        if not self._is_enabled():
+            return None
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO project_statistic_telemetry
+                (date, operation, duration, query_count, record_count, user_id, company_id)
+            VALUES (now() at time zone 'UTC', %s, %s, %s, %s, %s, %s)
+            RETURNING id
+            """,
+            operation, duration, query_count, record_count, self.env.uid, self.env.company.id,
+        ))
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    @contextmanager
+    def track(self, operation, record_count=0):
+        """
+        Measure the enclosed block and record it.
+
+        Yields a dict whose 'record_count' can be set inside the block.
+        """
+        cr = self.env.cr
+        run = {'record_count': record_count}
+        queries = cr.sql_log_count
+        start = time.perf_counter()
+        yield run
+        self.record(operation, time.perf_counter() - start, cr.sql_log_count - queries, run['record_count'])
+
+    @api.model
+    def _gc_telemetry(self):
+        """
+        Cron job: remove telemetry older than project_statistic.telemetry_retention_days.
+
+        Also removes the stored compute profiles, see _gc_compute_profiles.
+
+        Returns:
+            int: Number of removed rows
+        """
+        self._gc_compute_profiles()
+        retention_days = int(self.env['ir.config_parameter'].sudo().get_param(
+            'project_statistic.telemetry_retention_days', default='30'
+        ))
+        if retention_days <= 0:
+            return 0
+        self.env.cr.execute(SQL(
+            "DELETE FROM project_statistic_telemetry WHERE date < %s",
+            fields.Datetime.now() - timedelta(days=retention_days),
+        ))
+        removed = self.env.cr.rowcount
+        if removed:
+            _logger.info(f"Removed {removed} telemetry row(s) older than {retention_days} days")
+        return removed
+
+    @api.model
+    def _gc_compute_profiles(self):
+        """
+        Remove compute profile attachments older than project_statistic.profile_retention_days.
+
+        Returns:
+            int: Number of removed attachments
+        """
+        retention_days = int(self.env['ir.config_parameter'].sudo().get_param(
+            'project_statistic.profile_retention_days', default='7'
+        ))
+        if retention_days <= 0:
+            return 0
+        profiles = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('name', '=like', PROFILE_ATTACHMENT_PREFIX + '%'),
+            ('create_date', '<', fields.Datetime.now() - timedelta(days=retention_days)),
+        ])
+        if profiles:
+            _logger.info(f"Removing {len(profiles)} compute profile attachment(s) older than {retention_days} days")
+            profiles.unlink()
+        return len(profiles)
+
+    def action_download_profile(self):
+        """Download the stage table and cProfile output stored with this run."""
+        self.ensure_one()
+        table = self.profile_attachment_ids.filtered(lambda a: a.mimetype == 'text/plain')[:1]
+        if not table:
+            raise UserError(_('No compute profile is stored for this run.'))
+        return {
+            'type': 'ir.actions.act_url',
+            'url': '/web/content/%s?download=true' % table.id,
+            'target': 'self',
+        }
+
+
+class ProjectStatisticTelemetryStats(models.Model):
+    """
+    Percentiles of the telemetry per operation and day (SQL view).
+
+    Each row is one operation on one day, so grouping the pivot by operation
+    and day shows the exact percentiles.
+    """
+    _name = 'project.statistic.telemetry.stats'
+    _description = 'Project Statistic Telemetry Percentiles'
+    _auto = False
+    _order = 'day desc, operation'
+
+    day = fields.Date(string='Day', readonly=True)
+    operation = fields.Selection(TELEMETRY_OPERATIONS, string='Operation', readonly=True)
+    run_count = fields.Integer(string='Runs', readonly=True, aggregator='sum')
+    duration_p50 = fields.Float(string='p50 (s)', readonly=True, digits=(16, 4), aggregator='max')
+    duration_p95 = fields.Float(string='p95 (s)', readonly=True, digits=(16, 4), aggregator='max')
+    duration_p99 = fields.Float(string='p99 (s)', readonly=True, digits=(16, 4), aggregator='max')
+    duration_max = fields.Float(string='Max (s)', readonly=True, digits=(16, 4), aggregator='max')
+    duration_avg = fields.Float(string='Average (s)', readonly=True, digits=(16, 4), aggregator='avg')
+    query_count_p95 = fields.Float(string='Queries p95', readonly=True, aggregator='max')
+    record_count_avg = fields.Float(string='Records (avg)', readonly=True, aggregator='avg')
+
+    def init(self):
+        """Create the SQL view with the percentiles per operation and day."""
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute(SQL(
+            """
+            CREATE OR REPLACE VIEW %s AS (
+                SELECT
+                    row_number() OVER (ORDER BY day, operation) AS id,
+                    day,
+                    operation,
+                    run_count,
+                    duration_p50,
+                    duration_p95,
+                    duration_p99,
+                    duration_max,
+                    duration_avg,
+                    query_count_p95,
+                    record_count_avg
+                FROM (
+                    SELECT
+                        date_trunc('day', date)::date AS day,
+                        operation,
+                        COUNT(*) AS run_count,
+                        percentile_cont(0.50) WITHIN GROUP (ORDER BY duration) AS duration_p50,
+                        percentile_cont(0.95) WITHIN GROUP (ORDER BY duration) AS duration_p95,
+                        percentile_cont(0.99) WITHIN GROUP (ORDER BY duration) AS duration_p99,
+                        MAX(duration) AS duration_max,
+                        AVG(duration) AS duration_avg,
+                        percentile_cont(0.95) WITHIN GROUP (ORDER BY query_count) AS query_count_p95,
+                        AVG(record_count) AS record_count_avg
+                    FROM project_statistic_telemetry
+                    GROUP BY 1, 2
+                ) stats
+            )
+            """,
+            SQL.identifier(self._table),
+        ))
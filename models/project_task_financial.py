@@ -0,0 +1,122 @@
+from odoo import models, fields, api
+from odoo.tools import SQL
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Measures of a task row, in INSERT order
+TASK_FINANCIAL_MEASURES = (
+    'hours_booked',
+    'hours_booked_adjusted',
+    'labor_costs',
+    'labor_costs_adjusted',
+    'other_costs_net',
+    'total_costs_net',
+    'total_costs_adjusted',
+)
+
+
+class ProjectTaskFinancial(models.Model):
+    """
+    Per-task financial breakdown of a project (task fact table).
+
+    One row per project and task with the timesheet hours, labor costs and
+    directly attributable other costs (analytic lines booked with the task).
+    Hours and costs without task are kept in a row without task, so the rows
+    of a project add up to its labor and other costs.
+
+    The rows are written by the project financial compute from the same
+    grouped timesheet and other cost reads as the project totals (no second
+    scan of the analytic lines), replaced per project with one DELETE and one
+    INSERT and without the create/write audit columns.
+    """
+    _name = 'project.task.financial'
+    _description = 'Project Task Financials'
+    _order = 'project_id, total_costs_net desc, id'
+    _log_access = False
+
+    project_id = fields.Many2one('project.project', string='Project', required=True, readonly=True,
+                                 index=True, ondelete='cascade')
+    task_id = fields.Many2one('project.task', string='Task', readonly=True, index=True, ondelete='cascade',
+                              help="Empty: hours and costs booked on the project without task.")
+    company_id = fields.Many2one('res.company', string='Company', readonly=True, index=True)
+
+    hours_booked = fields.Float(string='Hours Booked', readonly=True, aggregator='sum')
+    hours_booked_adjusted = fields.Float(
+        string='Hours Booked (Adjusted)', readonly=True, aggregator='sum',
+        help="Hours weighted with the HFC factor of the employee."
+    )
+    labor_costs = fields.Float(string='Labor Costs', readonly=True, aggregator='sum')
+    labor_costs_adjusted = fields.Float(
+        string='Labor Costs (Adjusted)', readonly=True, aggregator='sum',
+        help="Adjusted hours multiplied by project_statistic.general_hourly_rate."
+    )
+    other_costs_net = fields.Float(
+        string='Other Costs NET', readonly=True, aggregator='sum',
+        help="Non-timesheet cost lines booked with this task (same rules as the project's Other Costs)."
+    )
+    total_costs_net = fields.Float(
+        string='Total Costs NET', readonly=True, aggregator='sum',
+        help="Labor Costs + Other Costs NET."
+    )
+    total_costs_adjusted = fields.Float(
+        string='Total Costs (Adjusted)', readonly=True, aggregator='sum',
+        help="Adjusted Labor Costs + Other Costs NET."
+    )
+
+    @api.model
+    def _prepare_rows(self, project, timesheet_data, other_costs_data, general_hourly_rate):
+        """
+        Task rows of one project from the grouped compute reads.
+
+        Args:
+            project: project.project record
+            timesheet_data: Timesheet totals of the project's analytic account
+                            (see project.project._get_timesheet_costs)
+            other_costs_data: Other cost totals of the project's analytic account
+                              (see project.project._get_other_costs_from_analytic)
+            general_hourly_rate: Rate of the adjusted labor costs
+
+        Returns:
+            list: [(project id, task id, company id, *TASK_FINANCIAL_MEASURES), ...]
+        """
+        rows = []
+        task_ids = set(timesheet_data['tasks']) | set(other_costs_data['tasks'])
+        company_id = project.company_id.id or self.env.company.id
+        for task_id in sorted(task_ids, key=lambda task_id: task_id or 0):
+            timesheets = timesheet_data['tasks'].get(task_id, {})
+            hours = timesheets.get('hours', 0.0)
+            adjusted_hours = timesheets.get('adjusted_hours', 0.0)
+            labor_costs = timesheets.get('costs', 0.0)
+            labor_costs_adjusted = adjusted_hours * general_hourly_rate
+            other_costs = other_costs_data['tasks'].get(task_id, 0.0)
+            rows.append((
+                project.id, task_id, company_id,
+                hours, adjusted_hours, labor_costs, labor_costs_adjusted, other_costs,
+                labor_costs + other_costs, labor_costs_adjusted + other_costs,
+            ))
+        return rows
+
+    @api.model
+    def _replace_project_rows(self, project_ids, rows):
+        """
+        Replace the task rows of the given projects.
+
+        Args:
+            project_ids: Projects whose rows are replaced (also those without rows now)
+            rows: Rows as returned by _prepare_rows
+        """
+        if not project_ids:
+            return
+        self.env.cr.execute(SQL(
+            "DELETE FROM project_task_financial WHERE project_id IN %s", tuple(project_ids),
+        ))
+        if rows:
+            columns = ('project_id', 'task_id', 'company_id') + TASK_FINANCIAL_MEASURES
+            self.env.cr.execute(SQL(
+                "INSERT INTO project_task_financial (%s) VALUES %s",
+                SQL(", ").join(SQL.identifier(column) for column in columns),
+                SQL(", ").join(SQL("%s", row) for row in rows),
+            ))
+        self.invalidate_model()
+        _logger.debug("Replaced task financials of %s project(s): %s row(s)", len(project_ids), len(rows))
@@ -0,0 +1,85 @@
+"""
+Read-only replica routing of the heavy analytic reads.
+
+The dashboard data, the trend data, the portfolio summary report (totals and
+rows on the same cursor, unless rendered in segments) and the pivot/graph
+groupings of the snapshots and the dashboard view only read. With
+project_statistic.read_replica_enabled they run on a read-only cursor of the
+streaming replica configured in the Odoo server config (db_replica_host /
+db_replica_port), so they do not compete with bookkeeping on the primary.
+
+The primary is used instead when:
+- the option is disabled or no replica is configured,
+- the registry is in test mode, or the current cursor is already read-only,
+- the replica cannot be reached,
+- the replica lags more than project_statistic.read_replica_max_lag_seconds.
+
+Code running in replica_env() must return plain data (dicts, lists), never
+records: the replica cursor is closed when the block exits.
+"""
+from contextlib import contextmanager
+import logging
+
+import psycopg2
+
+from odoo import api, tools
+from odoo.tools import SQL, str2bool
+
+_logger = logging.getLogger(__name__)
+
+
+def is_replica_configured():
+    """Whether the Odoo server config defines a streaming replica."""
+    return bool(tools.config.get('db_replica_host') or tools.config.get('db_replica_port'))
+
+
+def _get_replica_lag(cr):
+    """Replay lag of the server behind cr in seconds (0 on a primary or a caught-up replica)."""
+    cr.execute(SQL("""
+        SELECT CASE
+                   WHEN NOT pg_is_in_recovery() THEN 0
+                   WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                   ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+               END
+    """))
+    return float(cr.fetchone()[0])
+
+
+@contextmanager
+def replica_env(env):
+    """
+    Environment on the read-only replica, or env itself (see module docstring).
+
+    Usage:
+        with replica_env(self.env) as env:
+            data = self.with_env(env)._get_dashboard_data()
+    """
+    config = env['ir.config_parameter'].sudo()
+    if (
+        not str2bool(config.get_param('project_statistic.read_replica_enabled', default='False'), default=False)
+        or not is_replica_configured()
+        or env.registry.in_test_mode()
+        or getattr(env.cr, 'readonly', False)
+    ):
+        yield env
+        return
+
+    max_lag = float(config.get_param('project_statistic.read_replica_max_lag_seconds', default='30'))
+    cr = lag = None
+    try:
+        cr = env.registry.cursor(readonly=True)
+        lag = _get_replica_lag(cr)
+    except psycopg2.Error as e:
+        _logger.warning("Read replica unavailable, using the primary: %s", e)
+    if lag is None or lag > max_lag:
+        if lag is not None:
+            _logger.warning("Read replica lags %.1fs (max %.1fs), using the primary", lag, max_lag)
+        if cr is not None:
+            cr.close()
+        yield env
+        return
+
+    try:
+        yield api.Environment(cr, env.uid, env.context, su=env.su)
+    finally:
+        cr.close()
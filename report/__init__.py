@@ -1 +1,2 @@
 from . import project_financial_report
+from . import ir_actions_report
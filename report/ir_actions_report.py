@@ -0,0 +1,158 @@
+from odoo import models, fields, api
+from odoo.tools import config
+from odoo.tools.pdf import merge_pdf
+from datetime import datetime, timedelta
+import logging
+
+
+_logger = logging.getLogger(__name__)
+
+SUMMARY_REPORT_NAME = 'project_statistic.project_financial_report_summary'
+
+# Attachment name prefix of the cached project financial reports (see report action 'attachment')
+REPORT_CACHE_PREFIX = 'Project_Financial_Report_'
+
+
+class IrActionsReport(models.Model):
+    _inherit = 'ir.actions.report'
+
+    @api.model
+    def _get_summary_report_chunk_size(self):
+        """Number of projects per PDF segment of the portfolio summary report."""
+        return int(self.env['ir.config_parameter'].sudo().get_param(
+            'project_statistic.summary_report_chunk_size', default='500'
+        ))
+
+    def _render_qweb_pdf(self, report_ref, res_ids=None, data=None):
+        """
+        Render the reports of this module with telemetry (see project.statistic.telemetry).
+
+        Large portfolio summaries are rendered in segments, see
+        _render_project_statistic_pdf.
+        """
+        report = self._get_report(report_ref)
+        if report.report_name.startswith('project_statistic.') and not (data or {}).get('segment'):
+            with self.env['project.statistic.telemetry'].track('report_render', len(res_ids or [])):
+                return self._render_project_statistic_pdf(report, report_ref, res_ids, data)
+        return super()._render_qweb_pdf(report_ref, res_ids=res_ids, data=data)
+
+    def _render_project_statistic_pdf(self, report, report_ref, res_ids, data):
+        """
+        Render a report of this module, in segments for large portfolio summaries.
+
+        Above the configured chunk size, the summary report is not rendered as
+        one huge QWeb document. Instead:
+        1. Portfolio totals and rankings are aggregated once in SQL
+        2. Each chunk of projects is rendered as its own PDF segment
+           (overview on the first segment, totals row on the last one)
+        3. The segments are merged into one PDF
+
+        Only one chunk is held in memory and passed to wkhtmltopdf at a time,
+        so memory stays bounded and rendering time grows linearly.
+        """
+        chunk_size = self._get_summary_report_chunk_size()
+        if (
+            report.report_name != SUMMARY_REPORT_NAME
+            or not res_ids
+            or chunk_size <= 0
+            or len(res_ids) <= chunk_size
+            # Test mode renders HTML instead of PDF, keep the standard path there
+            or ((config['test_enable'] or config['test_file']) and not self.env.context.get('force_report_rendering'))
+        ):
+            return super()._render_qweb_pdf(report_ref, res_ids=res_ids, data=data)
+
+        segments_data = self._prepare_summary_segments(res_ids, chunk_size, data)
+        _logger.info(f"Rendering portfolio summary for {len(res_ids)} project(s) in {len(segments_data)} segment(s)")
+
+        # Segments are rendered one after the other: the ORM environment is not
+        # thread-safe, and each wkhtmltopdf run already uses its own process.
+        segments = []
+        for chunk, segment_data in segments_data:
+            pdf_content, _report_type = super()._render_qweb_pdf(report_ref, res_ids=chunk, data=segment_data)
+            segments.append(pdf_content)
+            # Drop the records of this chunk from the cache to keep memory bounded
+            self.env.invalidate_all()
+
+        return merge_pdf(segments), 'pdf'
+
+    @api.model
+    def _prepare_summary_segments(self, res_ids, chunk_size, data=None):
+        """
+        Split a portfolio summary selection into segments and prepare their report data.
+
+        The portfolio totals and rankings are aggregated once for the whole
+        selection and shared by all segments; the report of each segment shows
+        the overview on the first one and the totals row on the last one.
+
+        Args:
+            res_ids: Project ids of the whole selection, in print order
+            chunk_size: Projects per segment
+            data: Report data of the print, copied into every segment
+
+        Returns:
+            list: [(project ids of the chunk, report data of the segment), ...]
+        """
+        res_ids = list(res_ids)
+        # On the primary: the rows of the segments are read there too, one
+        # segment after the other, and must add up to these totals
+        summary = self.env['report.' + SUMMARY_REPORT_NAME]._get_portfolio_summary(res_ids)
+        report_date = datetime.now().strftime('%Y-%m-%d %H:%M')
+
+        chunks = [res_ids[i:i + chunk_size] for i in range(0, len(res_ids), chunk_size)]
+        return [
+            (chunk, dict(
+                data or {},
+                summary=summary,
+                report_date=report_date,
+                segment={'index': index, 'count': len(chunks)},
+            ))
+            for index, chunk in enumerate(chunks)
+        ]
+
+    @api.model
+    def _gc_financial_report_cache(self):
+        """
+        Cron job: evict cached project financial report PDFs.
+
+        1. Age: remove cached PDFs older than project_statistic.report_cache_max_age_days
+        2. Size: if the remaining cache exceeds project_statistic.report_cache_max_size_mb,
+           remove the oldest PDFs until it fits
+
+        Returns:
+            int: Number of removed attachments
+        """
+        config_params = self.env['ir.config_parameter'].sudo()
+        max_age_days = int(config_params.get_param('project_statistic.report_cache_max_age_days', default='30'))
+        max_size = int(config_params.get_param('project_statistic.report_cache_max_size_mb', default='500')) * 1024 * 1024
+
+        Attachment = self.env['ir.attachment'].sudo()
+        cache_domain = [
+            ('res_model', '=', 'project.project'),
+            ('type', '=', 'binary'),
+            ('name', '=like', REPORT_CACHE_PREFIX + '%.pdf'),
+        ]
+
+        expired = Attachment.browse()
+        if max_age_days > 0:
+            expired = Attachment.search(cache_domain + [
+                ('create_date', '<', fields.Datetime.now() - timedelta(days=max_age_days)),
+            ])
+
+        oversized = Attachment.browse()
+        if max_size > 0:
+            remaining = Attachment.search_fetch(
+                cache_domain + [('id', 'not in', expired.ids)], ['file_size'], order='create_date desc, id desc',
+            )
+            total_size = 0
+            oversized_ids = []
+            for attachment in remaining:
+                total_size += attachment.file_size
+                if total_size > max_size:
+                    oversized_ids.append(attachment.id)
+            oversized = Attachment.browse(oversized_ids)
+
+        to_remove = expired | oversized
+        if to_remove:
+            _logger.info(f"Removing {len(expired)} expired and {len(oversized)} oversized cached financial report(s)")
+            to_remove.unlink()
+        return len(to_remove)
@@ -1,7 +1,11 @@
 from odoo import models, api, _
+from odoo.tools import SQL
+from collections import defaultdict
 from datetime import datetime
 import logging
 
+from ..models.read_replica import replica_env
+
 _logger = logging.getLogger(__name__)
 
 
@@ -27,6 +31,58 @@ class ProjectFinancialReport(models.AbstractModel):
     _name = 'report.project_statistic.project_financial_report'
     _description = 'Project Financial Report'
 
+    @api.model
+    def _get_recent_snapshots(self, project_ids, limit=6):
+        """
+        Get the formatted last snapshots of all projects with ONE windowed query.
+
+        Args:
+            project_ids: List of project IDs
+            limit: Number of most recent snapshots per project
+
+        Returns:
+            dict: {project_id: [formatted snapshot dict, ...]} (newest first)
+        """
+        result = defaultdict(list)
+        if not project_ids:
+            return result
+
+        Snapshot = self.env['project.financial.snapshot']
+        Snapshot.check_access('read')
+        Snapshot.flush_model([
+            'project_id', 'snapshot_date', 'period_label', 'customer_invoiced_amount_net',
+            'total_costs_net', 'vendor_bills_total_net', 'profit_loss_net', 'total_hours_booked',
+        ])
+        self.env.cr.execute(SQL(
+            """
+            SELECT project_id, period_label, customer_invoiced_amount_net,
+                   COALESCE(total_costs_net, 0) + COALESCE(vendor_bills_total_net, 0),
+                   profit_loss_net, total_hours_booked
+              FROM (
+                    SELECT s.*,
+                           row_number() OVER (
+                               PARTITION BY s.project_id ORDER BY s.snapshot_date DESC, s.id DESC
+                           ) AS snapshot_rank
+                      FROM project_financial_snapshot s
+                     WHERE s.project_id = ANY(%s)
+                   ) ranked
+             WHERE snapshot_rank <= %s
+             ORDER BY project_id, snapshot_rank
+            """,
+            list(project_ids), limit,
+        ))
+
+        for project_id, period_label, revenue, total_costs, profit_loss, hours in self.env.cr.fetchall():
+            result[project_id].append({
+                'period_label': period_label,
+                'customer_invoiced_amount_net': format_amount(revenue),
+                'total_costs': format_amount(total_costs),
+                'profit_loss_net': format_amount(profit_loss),
+                'profit_loss_net_raw': profit_loss or 0.0,
+                'total_hours_booked': format_amount(hours),
+            })
+        return result
+
     @api.model
     def _get_report_values(self, docids, data=None):
         """
@@ -41,9 +97,6 @@ class ProjectFinancialReport(models.AbstractModel):
         """
         projects = self.env['project.project'].browse(docids)
 
-        # Get company info
-        company = self.env.company
-
         # Get configuration values
         config_params = self.env['ir.config_parameter'].sudo()
         general_hourly_rate = float(config_params.get_param(
@@ -53,6 +106,11 @@ class ProjectFinancialReport(models.AbstractModel):
             'project_statistic.vendor_bill_surcharge_factor', '1.30'
         ))
 
+        # Load the recent snapshots of ALL projects at once (no per-project search).
+        # Read on the primary like the rest of the report: the PDF is cached under
+        # a key computed from the primary (see _get_financial_report_fingerprint)
+        snapshots_by_project = self._get_recent_snapshots(projects.ids)
+
         # Prepare project data with additional calculations
         project_data = []
         for project in projects:
@@ -73,37 +131,26 @@ class ProjectFinancialReport(models.AbstractModel):
             other_pct = (project.other_costs_net / total_costs * 100
                         if total_costs > 0 else 0)
 
-            # Get recent snapshots for trend
-            snapshots = self.env['project.financial.snapshot'].search([
-                ('project_id', '=', project.id),
-            ], order='snapshot_date desc', limit=6)
-
             # Calculate revenue vs budget variance
             budget = project.sale_order_amount_net or 0
             revenue_variance = project.customer_invoiced_amount_net - budget if budget > 0 else 0
             revenue_variance_pct = (revenue_variance / budget * 100) if budget > 0 else 0
 
-            # Format snapshot data
-            formatted_snapshots = []
-            for snapshot in snapshots:
-                formatted_snapshots.append({
-                    'period_label': snapshot.period_label,
-                    'customer_invoiced_amount_net': format_amount(snapshot.customer_invoiced_amount_net),
-                    'total_costs': format_amount(snapshot.total_costs_net + snapshot.vendor_bills_total_net),
-                    'profit_loss_net': format_amount(snapshot.profit_loss_net),
-                    'profit_loss_net_raw': snapshot.profit_loss_net,
-                    'total_hours_booked': format_amount(snapshot.total_hours_booked),
-                })
+            # Letterhead and amounts of the project's company, independent of the
+            # active company (covered by _get_financial_report_fingerprint)
+            company = project.company_id or self.env.company
 
             project_data.append({
                 'project': project,
+                'company': company,
+                'currency_symbol': company.currency_id.symbol,
                 'profit_margin': round(profit_margin, 2),
                 'total_costs': total_costs,
                 'total_costs_fmt': format_amount(total_costs),
                 'vendor_pct': round(vendor_pct, 1),
                 'labor_pct': round(labor_pct, 1),
                 'other_pct': round(other_pct, 1),
-                'snapshots': formatted_snapshots,
+                'snapshots': snapshots_by_project.get(project.id, []),
                 'budget': budget,
                 'budget_fmt': format_amount(budget),
                 'revenue_variance': revenue_variance,
@@ -137,11 +184,9 @@ class ProjectFinancialReport(models.AbstractModel):
             'doc_model': 'project.project',
             'docs': projects,
             'project_data': project_data,
-            'company': company,
             'report_date': datetime.now().strftime('%Y-%m-%d %H:%M'),
             'general_hourly_rate': general_hourly_rate,
             'vendor_bill_surcharge': vendor_bill_surcharge,
-            'currency_symbol': company.currency_id.symbol,
         }
 
 
@@ -149,84 +194,155 @@ class ProjectFinancialReportSummary(models.AbstractModel):
     """
     Summary report model for multiple projects.
     Provides aggregated data for portfolio analysis.
+
+    Large selections are rendered in segments (see ir_actions_report.py):
+    the portfolio totals are aggregated once in SQL for the whole selection,
+    each segment only formats its own chunk of projects.
     """
     _name = 'report.project_statistic.project_financial_report_summary'
     _description = 'Project Financial Summary Report'
 
     @api.model
-    def _get_report_values(self, docids, data=None):
-        """
-        Generate summary report values.
+    def _get_portfolio_summary(self, project_ids):
         """
-        projects = self.env['project.project'].browse(docids)
-        company = self.env.company
+        Aggregate KPIs, status counts and top/bottom 5 of a selection in SQL,
+        without loading the whole selection into memory.
 
-        # Aggregated metrics
-        total_revenue = sum(projects.mapped('customer_invoiced_amount_net'))
-        total_costs = sum(projects.mapped('total_costs_net'))
-        total_vendor_bills = sum(projects.mapped('vendor_bills_total_net'))
-        total_profit = sum(projects.mapped('profit_loss_net'))
-        total_hours = sum(projects.mapped('total_hours_booked'))
-        total_outstanding = sum(projects.mapped('customer_outstanding_amount_net'))
+        Args:
+            project_ids: List of project IDs (the complete selection)
 
-        # Project status counts
-        profitable_count = len(projects.filtered(lambda p: p.profit_loss_net > 0))
-        loss_count = len(projects.filtered(lambda p: p.profit_loss_net < 0))
-        breakeven_count = len(projects.filtered(lambda p: p.profit_loss_net == 0))
+        Returns:
+            dict: Totals, counts and formatted top/bottom 5 (JSON-serializable)
+        """
+        Project = self.env['project.project']
+        Project.flush_model([
+            'customer_invoiced_amount_net', 'total_costs_net', 'vendor_bills_total_net',
+            'profit_loss_net', 'total_hours_booked', 'customer_outstanding_amount_net',
+        ])
+        # _search applies the record rules of the current user
+        selection = Project._search([('id', 'in', list(project_ids))]).subselect()
 
-        # Top and bottom projects
-        sorted_by_profit = projects.sorted(key=lambda p: p.profit_loss_net, reverse=True)
-        top_5 = sorted_by_profit[:5]
-        bottom_5 = sorted_by_profit[-5:] if len(sorted_by_profit) >= 5 else sorted_by_profit
+        self.env.cr.execute(SQL(
+            """
+            SELECT count(*),
+                   COALESCE(SUM(customer_invoiced_amount_net), 0),
+                   COALESCE(SUM(total_costs_net), 0),
+                   COALESCE(SUM(vendor_bills_total_net), 0),
+                   COALESCE(SUM(profit_loss_net), 0),
+                   COALESCE(SUM(total_hours_booked), 0),
+                   COALESCE(SUM(customer_outstanding_amount_net), 0),
+                   count(*) FILTER (WHERE COALESCE(profit_loss_net, 0) > 0),
+                   count(*) FILTER (WHERE COALESCE(profit_loss_net, 0) < 0),
+                   count(*) FILTER (WHERE COALESCE(profit_loss_net, 0) = 0)
+              FROM project_project
+             WHERE id IN %s
+            """,
+            selection,
+        ))
+        (total_projects, total_revenue, total_costs, total_vendor_bills, total_profit, total_hours,
+         total_outstanding, profitable_count, loss_count, breakeven_count) = self.env.cr.fetchone()
 
-        # Calculate averages
-        avg_profit_margin = (total_profit / total_revenue * 100) if total_revenue > 0 else 0
-        avg_revenue_per_project = total_revenue / len(projects) if projects else 0
+        def ranked_ids(direction):
+            self.env.cr.execute(SQL(
+                "SELECT id FROM project_project WHERE id IN %s ORDER BY COALESCE(profit_loss_net, 0) %s, id LIMIT 5",
+                selection, SQL(direction),
+            ))
+            return [row[0] for row in self.env.cr.fetchall()]
 
-        # Format all projects data
-        formatted_projects = []
-        for project in projects:
-            total_project_costs = project.total_costs_net + project.vendor_bills_total_net
-            formatted_projects.append({
-                'name': project.name,
-                'client_name': project.client_name or '-',
-                'revenue': format_amount(project.customer_invoiced_amount_net),
-                'costs': format_amount(total_project_costs),
-                'profit_loss': format_amount(project.profit_loss_net),
-                'profit_loss_raw': project.profit_loss_net,
-                'hours': format_amount(project.total_hours_booked),
-            })
+        # Top 5 by profit (descending), bottom 5 = last 5 of the descending ranking
+        top_5 = Project.browse(ranked_ids('DESC'))
+        bottom_5 = Project.browse(list(reversed(ranked_ids('ASC'))))
 
-        # Format top 5
-        formatted_top_5 = []
-        for project in top_5:
-            formatted_top_5.append({
+        return {
+            'total_projects': total_projects,
+            'total_revenue': total_revenue,
+            'total_costs': total_costs,
+            'total_vendor_bills': total_vendor_bills,
+            'total_profit': total_profit,
+            'total_hours': total_hours,
+            'total_outstanding': total_outstanding,
+            'profitable_count': profitable_count,
+            'loss_count': loss_count,
+            'breakeven_count': breakeven_count,
+            'top_5': [{
                 'name': project.name,
                 'client_name': project.client_name or '-',
                 'revenue': format_amount(project.customer_invoiced_amount_net),
                 'profit_loss': format_amount(project.profit_loss_net),
-            })
-
-        # Format bottom 5
-        formatted_bottom_5 = []
-        for project in bottom_5:
-            formatted_bottom_5.append({
+            } for project in top_5],
+            'bottom_5': [{
                 'name': project.name,
                 'client_name': project.client_name or '-',
                 'revenue': format_amount(project.customer_invoiced_amount_net),
                 'profit_loss': format_amount(project.profit_loss_net),
                 'profit_loss_raw': project.profit_loss_net,
-            })
+            } for project in bottom_5],
+        }
+
+    @api.model
+    def _format_summary_projects(self, project_ids):
+        """Rows of the projects of this document (the chunk, when rendered in segments)."""
+        return [{
+            'name': project.name,
+            'client_name': project.client_name or '-',
+            'revenue': format_amount(project.customer_invoiced_amount_net),
+            'costs': format_amount(project.total_costs_net + project.vendor_bills_total_net),
+            'profit_loss': format_amount(project.profit_loss_net),
+            'profit_loss_raw': project.profit_loss_net,
+            'hours': format_amount(project.total_hours_booked),
+        } for project in self.env['project.project'].browse(project_ids)]
+
+    @api.model
+    def _get_report_values(self, docids, data=None):
+        """
+        Generate summary report values.
+
+        When rendered in segments, ``data`` carries:
+            - 'summary': precomputed result of _get_portfolio_summary() for the whole selection
+            - 'segment': {'index': int, 'count': int} of the chunk being rendered (docids)
+        """
+        data = data or {}
+        segment = data.get('segment')
+        summary = data.get('summary')
+        if summary:
+            formatted_projects = self._format_summary_projects(docids)
+        else:
+            # Totals and rows are read on the same cursor, so they always agree
+            with replica_env(self.env) as env:
+                report = self.with_env(env)
+                summary = report._get_portfolio_summary(docids)
+                formatted_projects = report._format_summary_projects(docids)
+        projects = self.env['project.project'].browse(docids)
+        company = self.env.company
+
+        total_revenue = summary['total_revenue']
+        total_costs = summary['total_costs']
+        total_vendor_bills = summary['total_vendor_bills']
+        total_profit = summary['total_profit']
+        total_hours = summary['total_hours']
+        total_projects = summary['total_projects']
+
+        # Calculate averages
+        avg_profit_margin = (total_profit / total_revenue * 100) if total_revenue > 0 else 0
+        avg_revenue_per_project = total_revenue / total_projects if total_projects else 0
+
+        segment_index = segment['index'] if segment else 0
+        segment_count = segment['count'] if segment else 1
 
         return {
             'doc_ids': docids,
             'doc_model': 'project.project',
             'docs': projects,
             'company': company,
-            'report_date': datetime.now().strftime('%Y-%m-%d %H:%M'),
+            'report_date': data.get('report_date') or datetime.now().strftime('%Y-%m-%d %H:%M'),
             'currency_symbol': company.currency_id.symbol,
+            # Segments (overview on the first, totals row on the last)
+            'segment_index': segment_index,
+            'segment_count': segment_count,
+            'show_overview': segment_index == 0,
+            'show_totals': segment_index == segment_count - 1,
             # Aggregated metrics
-            'total_projects': len(projects),
+            'total_projects': total_projects,
             'total_revenue': total_revenue,
             'total_revenue_fmt': format_amount(total_revenue),
             'total_costs': total_costs + total_vendor_bills,
@@ -236,14 +352,14 @@ class ProjectFinancialReportSummary(models.AbstractModel):
             'total_profit_fmt': format_amount(total_profit),
             'total_hours': total_hours,
             'total_hours_fmt': format_amount(total_hours),
-            'total_outstanding': total_outstanding,
+            'total_outstanding': summary['total_outstanding'],
             # Status counts
-            'profitable_count': profitable_count,
-            'loss_count': loss_count,
-            'breakeven_count': breakeven_count,
+            'profitable_count': summary['profitable_count'],
+            'loss_count': summary['loss_count'],
+            'breakeven_count': summary['breakeven_count'],
             # Rankings
-            'top_5': formatted_top_5,
-            'bottom_5': formatted_bottom_5,
+            'top_5': summary['top_5'],
+            'bottom_5': summary['bottom_5'],
             'all_projects': formatted_projects,
             # Averages
             'avg_profit_margin': round(avg_profit_margin, 2),
@@ -1 +1,5 @@
 from . import test_project_analytics
+from . import test_benchmark
+from . import test_performance
+from . import test_portfolio_cube
+from . import test_portal
@@ -0,0 +1,185 @@
+"""
+Deterministic synthetic data for the project_statistic benchmarks.
+
+The generator builds a realistic portfolio for a given scale: projects with
+analytic accounts, customer invoices and vendor bills whose lines are split
+over several project accounts, timesheets of employees with varied HFC
+factors, skonto postings and monthly snapshots. The same seed always yields
+the same amounts and distributions, so runs are comparable across commits.
+"""
+import random
+
+from odoo import fields
+
+
+# Volumes per scale step: the number of projects drives everything else
+DEFAULT_SCALES = (10, 50, 200)
+INVOICES_PER_PROJECT = 4
+BILLS_PER_PROJECT = 4
+TIMESHEETS_PER_PROJECT = 20
+SNAPSHOTS_PER_PROJECT = 6
+SKONTO_SHARE = 0.25
+
+
+class FinancialDataGenerator:
+    """Create benchmark data in the current transaction."""
+
+    def __init__(self, env, seed=42):
+        # The projects are computed once at the end instead of on every posted line
+        self.env = env(context=dict(env.context, project_statistic_skip_recompute=True))
+        self.caller_env = env
+        self.rng = random.Random(seed)
+        self.company = env.company
+        self.project_plan = env.ref('analytic.analytic_plan_projects')
+        self._accounts = {}
+
+    def _account(self, code, account_type):
+        """Return (and create if missing) the account with the given code."""
+        if code not in self._accounts:
+            Account = self.env['account.account']
+            account = Account.search([
+                ('code', '=', code),
+                ('company_ids', 'in', self.company.id),
+            ], limit=1)
+            if not account:
+                account = Account.create({
+                    'code': code,
+                    'name': 'Benchmark %s' % code,
+                    'account_type': account_type,
+                })
+            self._accounts[code] = account
+        return self._accounts[code]
+
+    def _distribution(self, accounts):
+        """Analytic distribution over one to three project accounts, summing to 100%."""
+        count = min(len(accounts), self.rng.choice((1, 1, 2, 3)))
+        chosen = self.rng.sample(accounts, count)
+        if count == 1:
+            return {str(chosen[0].id): 100.0}
+        shares = [self.rng.randint(1, 10) for _account in chosen]
+        total = sum(shares)
+        distribution = {str(account.id): round(share * 100.0 / total, 2) for account, share in zip(chosen, shares)}
+        # Put the rounding difference on the first account
+        first = str(chosen[0].id)
+        distribution[first] = round(distribution[first] + 100.0 - sum(distribution.values()), 2)
+        return distribution
+
+    def generate(self, project_count):
+        """
+        Generate a portfolio of project_count projects.
+
+        Returns:
+            dict: {'projects', 'analytic_accounts', 'employees', 'moves'} recordsets
+        """
+        env = self.env
+        rng = self.rng
+
+        analytic_accounts = env['account.analytic.account'].create([{
+            'name': 'Benchmark Analytic %05d' % index,
+            'plan_id': self.project_plan.id,
+        } for index in range(project_count)])
+        projects = env['project.project'].create([{
+            'name': 'Benchmark Project %05d' % index,
+            'account_id': account.id,
+            'budget_amount': rng.choice((0.0, 10000.0, 50000.0, 250000.0)),
+        } for index, account in enumerate(analytic_accounts)])
+
+        employees = env['hr.employee'].create([{
+            'name': 'Benchmark Employee %04d' % index,
+            'hourly_cost': rng.choice((35.0, 45.0, 55.0, 70.0)),
+            'faktor_hfc': rng.choice((0.5, 0.8, 1.0, 1.0, 1.2, 1.5)),
+        } for index in range(max(5, project_count // 5))])
+
+        partner = env['res.partner'].create({'name': 'Benchmark Customer'})
+        vendor = env['res.partner'].create({'name': 'Benchmark Vendor'})
+        income_account = self._account('800000', 'income')
+        expense_account = self._account('600000', 'expense')
+        customer_skonto_account = self._account('730000', 'expense')
+        vendor_skonto_account = self._account('473000', 'income_other')
+        counterpart_account = self._account('999000', 'asset_current')
+
+        accounts = list(analytic_accounts)
+        invoice_date = fields.Date.to_date('2025-06-30')
+        move_vals = []
+        for move_type, partner_rec, account, per_project in (
+            ('out_invoice', partner, income_account, INVOICES_PER_PROJECT),
+            ('out_refund', partner, income_account, 1),
+            ('in_invoice', vendor, expense_account, BILLS_PER_PROJECT),
+            ('in_refund', vendor, expense_account, 1),
+        ):
+            count = per_project * project_count if move_type in ('out_invoice', 'in_invoice') else project_count // 4
+            for _index in range(count):
+                move_vals.append({
+                    'move_type': move_type,
+                    'partner_id': partner_rec.id,
+                    'invoice_date': invoice_date,
+                    'invoice_line_ids': [(0, 0, {
+                        'name': 'Benchmark line',
+                        'quantity': rng.randint(1, 20),
+                        'price_unit': rng.randint(50, 5000),
+                        'account_id': account.id,
+                        'analytic_distribution': self._distribution(accounts),
+                    }) for _line in range(rng.randint(1, 4))],
+                })
+
+        # Skonto postings as miscellaneous entries on the cash discount accounts
+        for _index in range(int(project_count * SKONTO_SHARE)):
+            for skonto_account in (customer_skonto_account, vendor_skonto_account):
+                amount = float(rng.randint(5, 300))
+                debit = skonto_account is customer_skonto_account
+                move_vals.append({
+                    'move_type': 'entry',
+                    'date': invoice_date,
+                    'line_ids': [
+                        (0, 0, {
+                            'name': 'Benchmark skonto',
+                            'account_id': skonto_account.id,
+                            'debit': amount if debit else 0.0,
+                            'credit': 0.0 if debit else amount,
+                            'analytic_distribution': self._distribution(accounts),
+                        }),
+                        (0, 0, {
+                            'name': 'Benchmark skonto counterpart',
+                            'account_id': counterpart_account.id,
+                            'debit': 0.0 if debit else amount,
+                            'credit': amount if debit else 0.0,
+                        }),
+                    ],
+                })
+
+        moves = env['account.move'].create(move_vals)
+        moves.action_post()
+
+        timesheet_vals = []
+        for project in projects:
+            for _index in range(TIMESHEETS_PER_PROJECT):
+                timesheet_vals.append({
+                    'name': 'Benchmark work',
+                    'project_id': project.id,
+                    'employee_id': rng.choice(employees).id,
+                    'unit_amount': rng.choice((0.5, 1.0, 2.0, 4.0, 8.0)),
+                    'date': invoice_date,
+                })
+        env['account.analytic.line'].create(timesheet_vals)
+
+        projects._compute_financial_data()
+
+        snapshot_vals = []
+        for project in projects:
+            for month in range(1, SNAPSHOTS_PER_PROJECT + 1):
+                snapshot_vals.append({
+                    'project_id': project.id,
+                    'snapshot_date': fields.Date.to_date('2025-%02d-01' % month),
+                    'snapshot_type': 'monthly',
+                    'customer_invoiced_amount_net': project.customer_invoiced_amount_net * month / SNAPSHOTS_PER_PROJECT,
+                    'profit_loss_net': project.profit_loss_net * month / SNAPSHOTS_PER_PROJECT,
+                })
+        env['project.financial.snapshot'].create(snapshot_vals)
+
+        env.flush_all()
+        return {
+            'projects': projects.with_env(self.caller_env),
+            'analytic_accounts': analytic_accounts.with_env(self.caller_env),
+            'employees': employees.with_env(self.caller_env),
+            'moves': moves.with_env(self.caller_env),
+        }
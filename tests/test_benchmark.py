@@ -0,0 +1,280 @@
+"""
+Benchmarks of the financial compute pipeline on synthetic data.
+
+Not part of the standard test run. Execute with:
+
+    odoo-bin -d <db> -i project_statistic --test-tags /project_statistic:TestFinancialBenchmark --stop-after-init
+    odoo-bin -d <db> -i project_statistic --test-tags /project_statistic:TestBookkeepingOverhead --stop-after-init
+
+Environment variables:
+    PROJECT_STATISTIC_BENCHMARK_SCALES: comma separated project counts (default 10,50,200)
+    PROJECT_STATISTIC_BENCHMARK_OUTPUT: directory of the JSON result files (default: log only)
+    PROJECT_STATISTIC_OVERHEAD_BUDGET_PCT: allowed overhead of the write hooks on
+        bookkeeping unrelated to projects (default 10)
+    PROJECT_STATISTIC_PROJECT_OVERHEAD_BUDGET_PCT: allowed overhead on lines posted
+        to project accounts, which trigger a recompute (default 300)
+"""
+from contextlib import contextmanager
+import json
+import logging
+import os
+import time
+import tracemalloc
+
+from odoo import fields
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+from .benchmark_data import DEFAULT_SCALES, FinancialDataGenerator
+
+_logger = logging.getLogger(__name__)
+
+
+class BenchmarkCase(TransactionCase):
+    """Collects measurements and writes them as JSON when the class is done."""
+
+    benchmark_name = None
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        scales = os.environ.get('PROJECT_STATISTIC_BENCHMARK_SCALES')
+        cls.scales = [int(s) for s in scales.split(',') if s.strip()] if scales else list(DEFAULT_SCALES)
+        cls.results = []
+
+    @classmethod
+    def tearDownClass(cls):
+        report = json.dumps({'benchmark': cls.benchmark_name, 'results': cls.results}, indent=2)
+        output = os.environ.get('PROJECT_STATISTIC_BENCHMARK_OUTPUT')
+        if output:
+            os.makedirs(output, exist_ok=True)
+            with open(os.path.join(output, '%s.json' % cls.benchmark_name), 'w') as f:
+                f.write(report)
+        _logger.info("Benchmark results:\n%s", report)
+        super().tearDownClass()
+
+    @contextmanager
+    def measure(self, stage, scale, **extra):
+        """Record wall time, SQL query count and peak Python memory of a stage."""
+        self.env.flush_all()
+        self.env.invalidate_all()
+        cr = self.env.cr
+        queries_before = cr.sql_log_count
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        result = dict(extra, stage=stage, projects=scale)
+        yield result
+        self.env.flush_all()
+        wall_time = time.perf_counter() - start
+        _current, peak = tracemalloc.get_traced_memory()
+        if not was_tracing:
+            tracemalloc.stop()
+        result.update(
+            wall_time_s=round(wall_time, 4),
+            queries=cr.sql_log_count - queries_before,
+            peak_memory_kb=round(peak / 1024, 1),
+        )
+        self.results.append(result)
+
+    @contextmanager
+    def isolated(self, name):
+        """Roll the database back to its state before the block."""
+        self.env.cr.execute('SAVEPOINT "%s"' % name)
+        try:
+            yield
+        finally:
+            self.env.cr.execute('ROLLBACK TO SAVEPOINT "%s"' % name)
+            self.env.invalidate_all()
+
+
+@tagged('-standard', 'post_install', '-at_install', 'project_statistic_benchmark')
+class TestFinancialBenchmark(BenchmarkCase):
+
+    benchmark_name = 'financial_pipeline'
+
+    def _benchmark_scale(self, scale):
+        data = FinancialDataGenerator(self.env).generate(scale)
+        projects = data['projects']
+        analytic_ids = data['analytic_accounts'].ids
+        Snapshot = self.env['project.financial.snapshot']
+        Dashboard = self.env['project.analytics.dashboard']
+
+        with self.measure('compute_financial_data', scale, move_lines=len(data['moves'].line_ids)):
+            projects._compute_financial_data()
+
+        with self.measure('trigger_recompute_for_analytic_accounts', scale):
+            self.env['project.project'].trigger_recompute_for_analytic_accounts(set(analytic_ids))
+
+        with self.measure('dashboard_data', scale):
+            Dashboard.get_dashboard_data()
+
+        with self.measure('dashboard_trend_data', scale):
+            Dashboard.get_trend_data()
+
+        with self.measure('snapshot_cron_monthly', scale):
+            Snapshot.create_monthly_snapshots()
+
+        with self.measure('report_values_project', scale):
+            self.env['report.project_statistic.project_financial_report']._get_report_values(projects.ids)
+
+        with self.measure('report_values_summary', scale):
+            self.env['report.project_statistic.project_financial_report_summary']._get_report_values(projects.ids)
+
+    def test_financial_pipeline(self):
+        """Benchmark the compute pipeline at every configured scale"""
+        for scale in self.scales:
+            # Each scale starts from the same empty database state
+            with self.isolated('project_statistic_benchmark'):
+                self._benchmark_scale(scale)
+        self.assertTrue(self.results)
+
+
+@tagged('-standard', 'post_install', '-at_install', 'project_statistic_benchmark')
+class TestBookkeepingOverhead(BenchmarkCase):
+    """
+    Overhead of the account.move.line / account.analytic.line write hooks.
+
+    Every batch is run twice on the same data: once with the hooks bypassed
+    (context key project_statistic_skip_recompute, equivalent to the module not
+    being installed) and once with them active. The best of several rounds is
+    compared against the configured budget.
+    """
+
+    benchmark_name = 'bookkeeping_overhead'
+    batch_size = 200
+    rounds = 3
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.budget_pct = float(os.environ.get('PROJECT_STATISTIC_OVERHEAD_BUDGET_PCT', '10'))
+        cls.project_budget_pct = float(os.environ.get('PROJECT_STATISTIC_PROJECT_OVERHEAD_BUDGET_PCT', '300'))
+        data = FinancialDataGenerator(cls.env).generate(10)
+        cls.projects = data['projects']
+        cls.analytic_accounts = data['analytic_accounts']
+        cls.employees = data['employees']
+        cls.journal = cls.env['account.journal'].search([
+            ('type', '=', 'general'),
+            ('company_id', '=', cls.env.company.id),
+        ], limit=1)
+        cls.debit_account = cls.env['account.account'].search([
+            ('account_type', '=', 'expense'),
+            ('company_ids', 'in', cls.env.company.id),
+        ], limit=1)
+        cls.credit_account = cls.env['account.account'].search([
+            ('account_type', '=', 'asset_current'),
+            ('company_ids', 'in', cls.env.company.id),
+        ], limit=1)
+
+    def _move_vals(self, with_distribution):
+        vals_list = []
+        for index in range(self.batch_size):
+            distribution = {str(self.analytic_accounts[index % len(self.analytic_accounts)].id): 100.0}
+            vals_list.append({
+                'move_type': 'entry',
+                'journal_id': self.journal.id,
+                'date': fields.Date.today(),
+                'line_ids': [
+                    (0, 0, {
+                        'name': 'Overhead line %s' % index,
+                        'account_id': self.debit_account.id,
+                        'debit': 100.0 + index,
+                        'analytic_distribution': distribution if with_distribution else False,
+                    }),
+                    (0, 0, {
+                        'name': 'Overhead counterpart %s' % index,
+                        'account_id': self.credit_account.id,
+                        'credit': 100.0 + index,
+                    }),
+                ],
+            })
+        return vals_list
+
+    def _run_move_lines(self, env, with_distribution):
+        """create / write / unlink of a batch of journal entries, returns timings."""
+        timings = {}
+        start = time.perf_counter()
+        moves = env['account.move'].create(self._move_vals(with_distribution))
+        env.flush_all()
+        timings['create'] = time.perf_counter() - start
+
+        lines = moves.line_ids.filtered(lambda line: line.debit)
+        start = time.perf_counter()
+        if with_distribution:
+            lines.write({'analytic_distribution': {str(self.analytic_accounts[0].id): 100.0}})
+        else:
+            lines.write({'name': 'Overhead line (edited)'})
+        env.flush_all()
+        timings['write'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        moves.unlink()
+        env.flush_all()
+        timings['unlink'] = time.perf_counter() - start
+        return timings
+
+    def _run_timesheets(self, env, _with_distribution):
+        """create / write / unlink of a batch of timesheets, returns timings."""
+        timings = {}
+        start = time.perf_counter()
+        timesheets = env['account.analytic.line'].create([{
+            'name': 'Overhead timesheet %s' % index,
+            'project_id': self.projects[index % len(self.projects)].id,
+            'employee_id': self.employees[index % len(self.employees)].id,
+            'unit_amount': 1.0,
+            'date': fields.Date.today(),
+        } for index in range(self.batch_size)])
+        env.flush_all()
+        timings['create'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        timesheets.write({'unit_amount': 2.0})
+        env.flush_all()
+        timings['write'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        timesheets.unlink()
+        env.flush_all()
+        timings['unlink'] = time.perf_counter() - start
+        return timings
+
+    def _overhead(self, scenario, run, with_distribution, budget_pct):
+        baseline_env = self.env(context=dict(self.env.context, project_statistic_skip_recompute=True))
+        best = {'baseline': {}, 'hooked': {}}
+        for _round in range(self.rounds):
+            # Alternate both variants so caches and bloat affect them alike
+            for variant, env in (('baseline', baseline_env), ('hooked', self.env)):
+                with self.isolated('project_statistic_overhead'):
+                    for operation, duration in run(env, with_distribution).items():
+                        best[variant][operation] = min(duration, best[variant].get(operation, duration))
+
+        baseline = sum(best['baseline'].values())
+        hooked = sum(best['hooked'].values())
+        overhead_pct = (hooked - baseline) / baseline * 100 if baseline else 0.0
+        self.results.append({
+            'stage': scenario,
+            'batch_size': self.batch_size,
+            'baseline_s': {op: round(value, 4) for op, value in best['baseline'].items()},
+            'hooked_s': {op: round(value, 4) for op, value in best['hooked'].items()},
+            'overhead_pct': round(overhead_pct, 1),
+            'budget_pct': budget_pct,
+        })
+        self.assertLessEqual(
+            overhead_pct, budget_pct,
+            f"{scenario}: write hooks add {overhead_pct:.1f}% (budget {budget_pct}%)",
+        )
+
+    def test_move_lines_without_project(self):
+        """Overhead on journal entries unrelated to any project"""
+        self._overhead('move_lines_without_project', self._run_move_lines, False, self.budget_pct)
+
+    def test_move_lines_with_project(self):
+        """Overhead on journal entries distributed to project accounts"""
+        self._overhead('move_lines_with_project', self._run_move_lines, True, self.project_budget_pct)
+
+    def test_timesheets(self):
+        """Overhead on timesheet entry"""
+        self._overhead('timesheets', self._run_timesheets, True, self.project_budget_pct)
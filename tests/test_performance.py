@@ -0,0 +1,95 @@
+"""
+Query-count and time budgets of the public entry points.
+
+Each entry point has a declared budget at a fixed data scale, so N+1 patterns
+are caught as soon as they come back. Budgets are (fixed queries, queries per
+project, seconds). A per-project allowance marks an entry point that still
+loops over projects; it may only ever go down.
+"""
+from contextlib import contextmanager
+import time
+
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+from .benchmark_data import FinancialDataGenerator
+
+# Number of projects the budgets are checked at
+BUDGET_SCALE = 20
+
+QUERY_BUDGETS = {
+    'compute_financial_data': (40, 0, 10.0),
+    'action_view_account_moves': (4, 0, 1.0),
+    'get_dashboard_data': (6, 0, 2.0),
+    'get_trend_data': (6, 0, 2.0),
+    'create_monthly_snapshots': (20, 0, 10.0),
+    'report_values_project': (12, 0, 2.0),
+    'report_values_summary': (16, 0, 2.0),
+    'refresh_wizard': (45, 0, 10.0),
+}
+
+
+@tagged('post_install', '-at_install', 'project_statistic_performance')
+class TestPerformanceBudgets(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        data = FinancialDataGenerator(cls.env).generate(BUDGET_SCALE)
+        cls.projects = data['projects']
+
+    @contextmanager
+    def assertBudget(self, entry_point, project_count=BUDGET_SCALE):
+        """Fail if the block exceeds the query or time budget of entry_point."""
+        fixed, per_project, max_seconds = QUERY_BUDGETS[entry_point]
+        self.env.flush_all()
+        self.env.invalidate_all()
+        start = time.perf_counter()
+        with self.assertQueryCount(fixed + per_project * project_count):
+            yield
+        elapsed = time.perf_counter() - start
+        self.assertLessEqual(
+            elapsed, max_seconds,
+            f"{entry_point} took {elapsed:.2f}s for {project_count} projects (budget {max_seconds}s)",
+        )
+
+    def test_compute_financial_data(self):
+        """Budget of the financial compute"""
+        with self.assertBudget('compute_financial_data'):
+            self.projects._compute_financial_data()
+
+    def test_action_view_account_moves(self):
+        """Budget of the account moves smart button, including opening the list"""
+        with self.assertBudget('action_view_account_moves', 1):
+            action = self.projects[0].action_view_account_moves()
+            self.env['account.move'].search(action['domain'])
+
+    def test_dashboard(self):
+        """Budgets of the dashboard data methods"""
+        Dashboard = self.env['project.analytics.dashboard']
+        # The rollups scheduled by the generated data are written at commit, not by the dashboard
+        self.env['project.financial.rollup']._refresh_pending()
+        with self.assertBudget('get_dashboard_data'):
+            Dashboard.get_dashboard_data()
+        with self.assertBudget('get_trend_data'):
+            Dashboard.get_trend_data()
+
+    def test_create_monthly_snapshots(self):
+        """Budget of the monthly snapshot cron"""
+        with self.assertBudget('create_monthly_snapshots'):
+            self.env['project.financial.snapshot'].create_monthly_snapshots()
+
+    def test_report_values(self):
+        """Budgets of the report data preparation"""
+        with self.assertBudget('report_values_project'):
+            self.env['report.project_statistic.project_financial_report']._get_report_values(self.projects.ids)
+        with self.assertBudget('report_values_summary'):
+            self.env['report.project_statistic.project_financial_report_summary']._get_report_values(self.projects.ids)
+
+    def test_refresh_wizard(self):
+        """Budget of the refresh wizard"""
+        wizard = self.env['refresh.financial.data.wizard'].with_context(
+            active_model='project.project', active_ids=self.projects.ids,
+        ).create({})
+        with self.assertBudget('refresh_wizard'):
+            wizard.action_refresh_data()
@@ -0,0 +1,47 @@
+from odoo.tests import tagged
+from odoo.tests.common import HttpCase
+
+
+@tagged('post_install', '-at_install')
+class TestPortalFinancial(HttpCase):
+
+    def setUp(self):
+        super(TestPortalFinancial, self).setUp()
+        analytic_account = self.env['account.analytic.account'].create({
+            'name': 'Portal Project Analytic',
+            'plan_id': self.env.ref('analytic.analytic_plan_projects').id,
+        })
+        self.project = self.env['project.project'].create({
+            'name': 'Portal Project',
+            'account_id': analytic_account.id,
+            'portal_show_financial_data': True,
+            'portal_show_revenue': True,
+        })
+        self.authenticate('admin', 'admin')
+
+    def test_01_financial_json_revalidation(self):
+        """Test that the JSON endpoint returns an ETag and answers a matching If-None-Match with 304"""
+        url = f'/my/project/{self.project.id}/financial.json'
+        response = self.url_open(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+        self.assertEqual(etag, self.project._get_portal_financial_etag())
+        self.assertEqual(response.json()['etag'], etag)
+
+        response = self.url_open(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(response.content)
+
+        # A visible change invalidates the ETag
+        self.project.portal_show_costs = True
+        response = self.url_open(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_02_project_list_pager(self):
+        """Test that the portal project list is paged"""
+        response = self.url_open('/my/projects/financial')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Portal Project', response.text)
+        response = self.url_open('/my/projects/financial/page/2')
+        self.assertEqual(response.status_code, 200)
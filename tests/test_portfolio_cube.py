@@ -0,0 +1,159 @@
+from odoo.tests.common import TransactionCase, new_test_user
+from odoo import fields
+from odoo.exceptions import UserError
+from odoo.tools import SQL
+
+
+class TestPortfolioCube(TransactionCase):
+
+    def setUp(self):
+        super(TestPortfolioCube, self).setUp()
+
+        self.Cube = self.env['project.portfolio.cube']
+        # The cube lives per database and worker: start from an empty one and
+        # do not leave rows of this (rolled back) transaction behind
+        self.Cube.invalidate_cube()
+        self.addCleanup(self.Cube.invalidate_cube)
+
+        self.project_plan = self.env.ref('analytic.analytic_plan_projects')
+        self.client_a = self.env['res.partner'].create({'name': 'Cube Client A'})
+        self.client_b = self.env['res.partner'].create({'name': 'Cube Client B'})
+        self.client_filter = {'client_name': ['Cube Client A', 'Cube Client B']}
+
+        self.income_account = self.env['account.account'].search([
+            ('account_type', '=', 'income')
+        ], limit=1)
+
+        self.project_a1 = self._create_project('Cube Project A1', self.client_a)
+        self.project_a2 = self._create_project('Cube Project A2', self.client_a)
+        self.project_b = self._create_project('Cube Project B', self.client_b)
+        self._post_invoice(self.project_a1, 1000.0)
+        self._post_invoice(self.project_a2, 500.0)
+        self._post_invoice(self.project_b, 200.0)
+        (self.project_a1 | self.project_a2 | self.project_b)._compute_financial_data()
+
+    def _create_project(self, name, partner, company=None):
+        company = company if company is not None else self.env.company
+        analytic_account = self.env['account.analytic.account'].create({
+            'name': name,
+            'plan_id': self.project_plan.id,
+            'company_id': company.id,
+        })
+        return self.env['project.project'].create({
+            'name': name,
+            'partner_id': partner.id,
+            'account_id': analytic_account.id,
+            'company_id': company.id,
+        })
+
+    def _post_invoice(self, project, amount):
+        invoice = self.env['account.move'].create({
+            'move_type': 'out_invoice',
+            'partner_id': project.partner_id.id,
+            'invoice_date': fields.Date.today(),
+            'invoice_line_ids': [(0, 0, {
+                'name': 'Cube Product',
+                'quantity': 1,
+                'price_unit': amount,
+                'account_id': self.income_account.id,
+                'tax_ids': [(6, 0, [])],
+                'analytic_distribution': {str(project.account_id.id): 100},
+            })],
+        })
+        invoice.action_post()
+        return invoice
+
+    def _refresh(self):
+        self.Cube._refresh_cube(self.Cube._get_cube(), force=True)
+
+    def test_01_group_by_client(self):
+        """Test that the project facts are summed per client and ranked by a measure"""
+        result = self.Cube.query(
+            group_by=['client_name'], filters=self.client_filter,
+            measures=['customer_invoiced_amount_net'], order='customer_invoiced_amount_net desc',
+        )
+        self.assertEqual(result['fact_table'], 'project')
+        self.assertEqual([group['client_name'] for group in result['groups']], ['Cube Client A', 'Cube Client B'])
+        client_a = result['groups'][0]
+        self.assertEqual(client_a['__count'], 2)
+        self.assertAlmostEqual(client_a['customer_invoiced_amount_net'], 1500.0)
+        self.assertEqual(result['totals']['__count'], 3)
+        self.assertAlmostEqual(result['totals']['customer_invoiced_amount_net'], 1700.0)
+
+        top = self.Cube.query(
+            group_by=['client_name'], filters=self.client_filter,
+            measures=['customer_invoiced_amount_net'], order='customer_invoiced_amount_net asc', limit=1,
+        )
+        self.assertEqual([group['client_name'] for group in top['groups']], ['Cube Client B'])
+
+    def test_02_company_filtering(self):
+        """Test that projects of other companies are excluded and projects without company are kept"""
+        other_company = self.env['res.company'].create({'name': 'Cube Other Company'})
+        self._create_project('Cube Other Company Project', self.client_a, company=other_company)
+        no_company = self._create_project('Cube Shared Project', self.client_b, company=self.env['res.company'])
+        self.assertFalse(no_company.company_id)
+        self.assertTrue(no_company.has_analytic_account)
+
+        result = self.Cube.query(group_by=['company_id'], filters=self.client_filter, measures=['profit_loss_net'])
+        counts = {group['company_id']: group['__count'] for group in result['groups']}
+        self.assertEqual(counts, {self.env.company.id: 3, 0: 1})
+
+        both = self.Cube.with_context(allowed_company_ids=[self.env.company.id, other_company.id]).query(
+            group_by=['company_id'], filters=self.client_filter, measures=['profit_loss_net'],
+        )
+        counts = {group['company_id']: group['__count'] for group in both['groups']}
+        self.assertEqual(counts, {self.env.company.id: 3, other_company.id: 1, 0: 1})
+
+    def test_03_incremental_refresh_after_recompute(self):
+        """Test that a recomputed project is reloaded into the cube without a rebuild"""
+        query = dict(group_by=['client_name'], filters={'client_name': ['Cube Client B']},
+                     measures=['customer_invoiced_amount_net'])
+        self.assertAlmostEqual(self.Cube.query(**query)['groups'][0]['customer_invoiced_amount_net'], 200.0)
+        cube = self.Cube._get_cube()
+        row_count = len(cube.project_ids)
+
+        self._post_invoice(self.project_b, 300.0)
+        self.project_b._compute_financial_data()
+        self.env.flush_all()
+        # The recompute of a later transaction has a later write_date
+        self.env.cr.execute(SQL(
+            "UPDATE project_project SET write_date = write_date + interval '1 minute' WHERE id = %s",
+            self.project_b.id,
+        ))
+        self._refresh()
+
+        self.assertIs(self.Cube._get_cube(), cube)
+        self.assertEqual(len(cube.project_ids), row_count)
+        self.assertAlmostEqual(self.Cube.query(**query)['groups'][0]['customer_invoiced_amount_net'], 500.0)
+
+        # A project moved to another client is regrouped on the next refresh
+        self.project_b.partner_id = self.client_a
+        self.env.flush_all()
+        self.env.cr.execute(SQL(
+            "UPDATE project_project SET write_date = write_date + interval '2 minutes' WHERE id = %s",
+            self.project_b.id,
+        ))
+        self._refresh()
+        result = self.Cube.query(group_by=['client_name'], filters=self.client_filter,
+                                 measures=['customer_invoiced_amount_net'])
+        self.assertEqual([(group['client_name'], group['__count']) for group in result['groups']],
+                         [('Cube Client A', 3)])
+
+    def test_04_record_rules_and_filter_validation(self):
+        """Test that users who cannot read every project get their visible projects only"""
+        self.project_b.privacy_visibility = 'followers'
+        user = new_test_user(
+            self.env, login='cube_restricted_user',
+            groups='project.group_project_user,account.group_account_readonly',
+        )
+        Cube = self.Cube.with_user(user)
+        self.assertFalse(Cube._can_read_all_projects())
+
+        result = Cube.query(group_by=['client_name'], filters=self.client_filter,
+                            measures=['customer_invoiced_amount_net'])
+        self.assertEqual([(group['client_name'], group['__count']) for group in result['groups']],
+                         [('Cube Client A', 2)])
+        self.assertAlmostEqual(result['totals']['customer_invoiced_amount_net'], 1500.0)
+
+        with self.assertRaises(UserError):
+            self.Cube.query(group_by=['client_name'], filters={'company_id': ['not-a-company']})
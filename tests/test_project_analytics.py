@@ -1,5 +1,14 @@
-from odoo.tests.common import TransactionCase
+import os
+import shutil
+import tempfile
+from unittest.mock import MagicMock, patch
+
+import psycopg2
+
+from odoo.tests.common import TransactionCase, new_test_user
 from odoo import fields
+from odoo.exceptions import UserError, ValidationError
+from odoo.tools import SQL
 
 
 class TestProjectAnalytics(TransactionCase):
@@ -180,3 +189,752 @@ class TestProjectAnalytics(TransactionCase):
 
         expected_profit = self.project.customer_invoiced_amount_net - self.project.vendor_bills_total_net - self.project.total_costs_net
         self.assertAlmostEqual(self.project.profit_loss_net, expected_profit, places=2)
+
+    def test_07_rate_simulation_does_not_write(self):
+        """Test that the what-if simulation matches the stored P&L and writes nothing"""
+        invoice = self.Invoice.create({
+            'move_type': 'out_invoice',
+            'partner_id': self.partner.id,
+            'invoice_date': fields.Date.today(),
+            'invoice_line_ids': [(0, 0, {
+                'name': 'Revenue Item',
+                'quantity': 1,
+                'price_unit': 2000.0,
+                'account_id': self.income_account.id,
+                'analytic_distribution': {str(self.analytic_account.id): 100},
+            })],
+        })
+        invoice.action_post()
+
+        self.project._compute_financial_data()
+        stored_profit_loss = self.project.current_calculated_profit_loss
+
+        config = self.env['ir.config_parameter'].sudo()
+        current_rate = float(config.get_param('project_statistic.general_hourly_rate', default='66.0'))
+        current_factor = float(config.get_param('project_statistic.vendor_bill_surcharge_factor', default='1.30'))
+
+        params_before = (
+            config.get_param('project_statistic.general_hourly_rate'),
+            config.get_param('project_statistic.vendor_bill_surcharge_factor'),
+        )
+
+        simulation = self.project.simulate_rate_scenarios([current_rate, 100.0], [current_factor, 2.0])
+
+        self.assertEqual(simulation['project_count'], 1)
+        self.assertEqual(len(simulation['scenarios']), 4)
+        baseline = simulation['scenarios'][0]
+        self.assertAlmostEqual(baseline['profit_loss'], stored_profit_loss, places=2)
+        self.assertAlmostEqual(baseline['profit_loss_delta'], 0.0, places=2)
+
+        # Nothing was written
+        self.assertEqual(params_before, (
+            config.get_param('project_statistic.general_hourly_rate'),
+            config.get_param('project_statistic.vendor_bill_surcharge_factor'),
+        ))
+        self.assertAlmostEqual(self.project.current_calculated_profit_loss, stored_profit_loss, places=2)
+
+    def test_08_report_loads_last_six_snapshots(self):
+        """Test that the project report keeps the 6 most recent snapshots per project"""
+        self.project._compute_financial_data()
+        Snapshot = self.env['project.financial.snapshot']
+        for month in range(1, 9):
+            Snapshot.create({
+                'project_id': self.project.id,
+                'snapshot_date': fields.Date.to_date('2025-%02d-01' % month),
+                'snapshot_type': 'monthly',
+                'profit_loss_net': float(month),
+            })
+
+        report = self.env['report.project_statistic.project_financial_report']
+        values = report._get_report_values(self.project.ids)
+
+        snapshots = values['project_data'][0]['snapshots']
+        self.assertEqual(len(snapshots), 6)
+        self.assertEqual([s['profit_loss_net_raw'] for s in snapshots], [8.0, 7.0, 6.0, 5.0, 4.0, 3.0])
+
+    def test_09_background_report_job(self):
+        """Test that a queued report job is rendered by the cron and gets an attachment"""
+        self.project._compute_financial_data()
+        Job = self.env['project.report.job']
+        Job.enqueue('project_statistic.action_report_project_financial', self.project.ids)
+
+        job = Job.search([('project_ids', 'in', self.project.ids)], limit=1)
+        self.assertEqual(job.state, 'queued')
+
+        Bus = self.env.registry['bus.bus']
+        with patch.object(Bus, '_sendone', autospec=True) as sendone:
+            Job._process_queued_jobs(auto_commit=False)
+
+        self.assertEqual(job.state, 'done')
+        self.assertTrue(job.attachment_id)
+        self.assertEqual(job.attachment_id.res_model, 'project.report.job')
+        # The web client renders the notification message as text, not HTML
+        message = sendone.call_args.args[3]['message']
+        self.assertNotIn('<', message)
+
+    def test_10_account_moves_action_domain(self):
+        """Test that the account moves action finds posted moves via the analytic distribution"""
+        other_account = self.AnalyticAccount.create({
+            'name': 'Other Analytic',
+            'plan_id': self.env.ref('analytic.analytic_plan_projects').id,
+        })
+        moves = self.Invoice
+        for analytic in (self.analytic_account, other_account):
+            moves |= self.Invoice.create({
+                'move_type': 'out_invoice',
+                'partner_id': self.partner.id,
+                'invoice_date': fields.Date.today(),
+                'invoice_line_ids': [(0, 0, {
+                    'name': 'Test Product',
+                    'quantity': 1,
+                    'price_unit': 100.0,
+                    'account_id': self.income_account.id,
+                    'analytic_distribution': {str(analytic.id): 100},
+                })],
+            })
+        # A multi-plan key ("project,department") is not counted in the
+        # financial totals, so the action does not list it either
+        department = self.AnalyticAccount.create({
+            'name': 'Department',
+            'plan_id': self.env['account.analytic.plan'].create({'name': 'Departments'}).id,
+        })
+        multi_plan_move = self.Invoice.create({
+            'move_type': 'out_invoice',
+            'partner_id': self.partner.id,
+            'invoice_date': fields.Date.today(),
+            'invoice_line_ids': [(0, 0, {
+                'name': 'Test Product',
+                'quantity': 1,
+                'price_unit': 100.0,
+                'account_id': self.income_account.id,
+                'analytic_distribution': {'%s,%s' % (self.analytic_account.id, department.id): 100},
+            })],
+        })
+        (moves | multi_plan_move).action_post()
+
+        action = self.project.action_view_account_moves()
+        self.assertEqual(self.Invoice.search(action['domain']), moves[0])
+        self.project._compute_financial_data()
+        self.assertAlmostEqual(self.project.customer_invoices_net, 100.0)
+
+    def test_11_snapshot_count_batched(self):
+        """Test that snapshot counts of a project list are computed with a single query"""
+        projects = self.project | self.Project.create({'name': 'Second Project'})
+        Snapshot = self.env['project.financial.snapshot']
+        for month in range(1, 4):
+            Snapshot.create({
+                'project_id': self.project.id,
+                'snapshot_date': fields.Date.to_date('2025-%02d-01' % month),
+                'snapshot_type': 'monthly',
+            })
+        projects.invalidate_recordset(['snapshot_count'])
+        self.env.flush_all()
+
+        with self.assertQueryCount(1):
+            counts = [project.snapshot_count for project in projects]
+        self.assertEqual(counts, [3, 0])
+
+    def test_12_compute_profile_attachment(self):
+        """Test that profiling mode stores the stage table and cProfile output"""
+        Attachment = self.env['ir.attachment']
+        domain = [('res_model', '=', 'project.statistic.telemetry'), ('name', '=like', 'financial_compute_%')]
+        before = Attachment.search_count(domain)
+
+        self.project.with_context(project_statistic_profile=True)._compute_financial_data()
+
+        profiles = Attachment.search(domain, order='id desc', limit=2)
+        self.assertEqual(Attachment.search_count(domain), before + 2)
+        table = next(a for a in profiles if a.name.endswith('.txt'))
+        self.assertIn('customer_invoices', table.raw.decode())
+        self.assertIn('timesheets', table.raw.decode())
+
+        # The profile is reachable from its telemetry run
+        run = self.env['project.statistic.telemetry'].browse(profiles[0].res_id)
+        self.assertEqual(run.operation, 'compute')
+        self.assertEqual(run.profile_attachment_ids, profiles)
+        self.assertIn('/web/content/%s' % table.id, run.action_download_profile()['url'])
+
+        # The daily telemetry cleanup removes profiles past their retention
+        self.env['ir.config_parameter'].sudo().set_param('project_statistic.profile_retention_days', '7')
+        self.env.cr.execute(SQL(
+            "UPDATE ir_attachment SET create_date = now() - interval '8 days' WHERE id IN %s",
+            tuple(profiles.ids),
+        ))
+        self.env['project.statistic.telemetry']._gc_telemetry()
+        self.assertFalse(profiles.exists())
+
+    def test_13_telemetry_percentiles(self):
+        """Test that tracked operations appear in the percentile view"""
+        Telemetry = self.env['project.statistic.telemetry']
+        Telemetry.search([]).unlink()
+        for duration in (1.0, 2.0, 3.0, 4.0):
+            Telemetry.record('dashboard', duration, query_count=5, record_count=10)
+        with Telemetry.track('report_render') as run:
+            run['record_count'] = 3
+
+        stats = self.env['project.statistic.telemetry.stats'].search([
+            ('operation', '=', 'dashboard'),
+            ('day', '=', fields.Date.today()),
+        ])
+        self.assertEqual(stats.run_count, 4)
+        self.assertAlmostEqual(stats.duration_p50, 2.5)
+        self.assertEqual(Telemetry.search_count([('operation', '=', 'report_render'), ('record_count', '=', 3)]), 1)
+
+    def test_14_trace_only_selected_accounts(self):
+        """Test that matched invoice lines are traced only for configured analytic accounts"""
+        invoice = self.Invoice.create({
+            'move_type': 'out_invoice',
+            'partner_id': self.partner.id,
+            'invoice_date': fields.Date.today(),
+            'invoice_line_ids': [(0, 0, {
+                'name': 'Traced Product',
+                'quantity': 1,
+                'price_unit': 100.0,
+                'account_id': self.income_account.id,
+                'analytic_distribution': {str(self.analytic_account.id): 100},
+            })],
+        })
+        invoice.action_post()
+        config = self.env['ir.config_parameter'].sudo()
+
+        with self.assertNoLogs('odoo.addons.project_statistic.trace', level='INFO'):
+            self.project._compute_financial_data()
+
+        config.set_param('project_statistic.trace_analytic_account_ids', str(self.analytic_account.id))
+        with self.assertLogs('odoo.addons.project_statistic.trace', level='INFO') as logs:
+            self.project._compute_financial_data()
+        self.assertTrue(any(invoice.name in message for message in logs.output))
+
+    def test_15_account_classification_per_company(self):
+        """Test that configured classification rules replace the default Skonto prefixes"""
+        skr04_skonto_account = self.env['account.account'].create({
+            'name': 'Gewährte Skonti (SKR04)',
+            'code': '873099',
+            'account_type': 'expense',
+        })
+        entry = self.Invoice.create({
+            'move_type': 'entry',
+            'date': fields.Date.today(),
+            'line_ids': [
+                (0, 0, {
+                    'name': 'Skonto SKR04',
+                    'account_id': skr04_skonto_account.id,
+                    'debit': 30.0,
+                    'analytic_distribution': {str(self.analytic_account.id): 100},
+                }),
+                (0, 0, {
+                    'name': 'Counterpart',
+                    'account_id': self.income_account.id,
+                    'credit': 30.0,
+                }),
+            ],
+        })
+        entry.action_post()
+
+        self.project._compute_financial_data()
+        self.assertEqual(self.project.customer_skonto_taken, 0.0)
+
+        rule = self.env['project.account.classification'].create({
+            'company_id': self.env.company.id,
+            'category': 'customer_skonto',
+            'code_prefix': '8730',
+        })
+        self.assertIn(skr04_skonto_account, rule._get_matching_accounts())
+
+        self.project._compute_financial_data()
+        self.assertAlmostEqual(self.project.customer_skonto_taken, 30.0, places=2)
+
+        rule.unlink()
+        self.project._compute_financial_data()
+        self.assertEqual(self.project.customer_skonto_taken, 0.0)
+
+    def test_16_foreign_currency_invoice_in_company_currency(self):
+        """Test that foreign-currency invoice lines are summed in company currency"""
+        company = self.env.company
+        foreign_currency = self.env.ref('base.CHF')
+        if foreign_currency == company.currency_id:
+            foreign_currency = self.env.ref('base.USD')
+        foreign_currency.active = True
+        self.env['res.currency.rate'].create({
+            'name': fields.Date.today(),
+            'rate': 2.0,  # 1 company currency = 2 foreign currency
+            'currency_id': foreign_currency.id,
+            'company_id': company.id,
+        })
+
+        invoice = self.Invoice.create({
+            'move_type': 'out_invoice',
+            'partner_id': self.partner.id,
+            'invoice_date': fields.Date.today(),
+            'currency_id': foreign_currency.id,
+            'invoice_line_ids': [(0, 0, {
+                'name': 'Foreign Product',
+                'quantity': 1,
+                'price_unit': 200.0,
+                'account_id': self.income_account.id,
+                'tax_ids': [(6, 0, [])],
+                'analytic_distribution': {str(self.analytic_account.id): 100},
+            })],
+        })
+        invoice.action_post()
+
+        self.project._compute_financial_data()
+
+        self.assertAlmostEqual(self.project.customer_invoiced_amount_net, 100.0, places=2)
+        self.assertAlmostEqual(self.project.customer_invoiced_amount_gross, 100.0, places=2)
+
+    def test_17_portal_payload_etag(self):
+        """Test that the portal ETag follows the visible block and hidden sections are omitted"""
+        self.project.write({
+            'portal_show_financial_data': True,
+            'portal_show_revenue': True,
+            'portal_show_costs': False,
+        })
+        etag = self.project._get_portal_financial_etag()
+        self.assertEqual(etag, self.project._get_portal_financial_etag())
+
+        payload = self.project._get_portal_financial_payload(etag)
+        self.assertEqual(payload['etag'], etag)
+        self.assertIn('revenue', payload)
+        self.assertNotIn('costs', payload)
+        self.assertNotIn('profit_loss', payload)
+
+        self.project.portal_show_costs = True
+        self.assertNotEqual(self.project._get_portal_financial_etag(), etag)
+        self.assertIn('costs', self.project._get_portal_financial_payload())
+
+        self.project.portal_show_financial_data = False
+        payload = self.project._get_portal_financial_payload()
+        self.assertFalse(payload['show_financial_data'])
+        self.assertNotIn('revenue', payload)
+
+    def test_18_bulk_read_columns_keyset(self):
+        """Test that the bulk read returns columns and pages with keyset and changed-since cursors"""
+        Bulk = self.env['project.statistic.bulk']
+        projects = self.project | self.Project.create([
+            {'name': f'Bulk Project {index}', 'account_id': self.analytic_account.id}
+            for index in range(3)
+        ])
+        domain = [('id', 'in', projects.ids)]
+
+        page = Bulk.read_columns('project.project', ['name', 'profit_loss_net'], domain=domain, limit=2)
+        self.assertEqual(page['fields'], ['id', 'name', 'profit_loss_net'])
+        self.assertEqual(page['count'], 2)
+        self.assertTrue(page['has_more'])
+        self.assertEqual(page['columns']['id'], sorted(projects.ids)[:2])
+
+        page = Bulk.read_columns('project.project', ['name'], domain=domain, cursor=page['next_cursor'], limit=2)
+        self.assertEqual(page['columns']['id'], sorted(projects.ids)[2:])
+        self.assertFalse(page['has_more'])
+
+        changes = Bulk.read_columns('project.project', ['name'], domain=domain, changed_since='2000-01-01 00:00:00')
+        self.assertEqual(set(changes['columns']['id']), set(projects.ids))
+        changes = Bulk.read_columns('project.project', ['name'], domain=domain, cursor=changes['next_cursor'])
+        self.assertEqual(changes['count'], 0)
+
+        with self.assertRaises(UserError):
+            Bulk.read_columns('project.project', ['snapshot_count'])
+
+    def test_19_parquet_export_partitions(self):
+        """Test the partitioning of the data export and, with pyarrow, the written files"""
+        self.env['project.financial.snapshot'].create({
+            'project_id': self.project.id,
+            'snapshot_date': '2024-06-30',
+            'snapshot_type': 'monthly',
+            'profit_loss_net': 42.0,
+        })
+        base_directory = tempfile.mkdtemp()
+        self.env['ir.config_parameter'].sudo().set_param('project_statistic.export_directory', base_directory)
+        export = self.env['project.statistic.export'].create({
+            'name': 'Test Export',
+            'directory': 'lake',
+            'batch_size': 1,
+        })
+        self.assertTrue(export._get_directory().startswith(os.path.join(os.path.realpath(base_directory), 'lake')))
+        with self.assertRaises(ValidationError):
+            export.directory = '../outside'
+        partitions = dict(export._get_partitions('snapshots'))
+        partition = os.path.join(f'company_id={self.project.company_id.id}', 'year=2024')
+        self.assertIn(partition, partitions)
+
+        try:
+            import pyarrow.parquet
+        except ImportError:
+            shutil.rmtree(base_directory, ignore_errors=True)
+            self.skipTest('pyarrow is not installed')
+        try:
+            export.action_run_export()
+            table = pyarrow.parquet.read_table(
+                os.path.join(export._get_directory(), 'snapshots', partition, 'snapshots.parquet')
+            )
+            self.assertIn(42.0, table.column('profit_loss_net').to_pylist())
+            self.assertGreaterEqual(export.last_file_count, 2)
+        finally:
+            shutil.rmtree(base_directory, ignore_errors=True)
+
+    def test_20_stream_query_applies_domain(self):
+        """Test that the streamed export query selects the requested fields of the matching rows"""
+        snapshot = self.env['project.financial.snapshot'].create({
+            'project_id': self.project.id,
+            'snapshot_type': 'monthly',
+            'profit_loss_net': 7.0,
+        })
+        field_names, query = self.env['project.statistic.bulk']._prepare_stream_query(
+            'project.financial.snapshot', ['project_id', 'profit_loss_net'],
+            [('project_id', '=', self.project.id), ('snapshot_type', '=', 'monthly')],
+        )
+        self.assertEqual(field_names, ['id', 'project_id', 'profit_loss_net'])
+        self.env.cr.execute(query)
+        self.assertEqual(self.env.cr.fetchall(), [(snapshot.id, self.project.id, 7.0)])
+
+    def test_21_read_replica_falls_back_to_primary(self):
+        """Test that the replica routing keeps the primary environment when no replica can be used"""
+        from odoo.addons.project_statistic.models.read_replica import replica_env
+
+        self.env['ir.config_parameter'].sudo().set_param('project_statistic.read_replica_enabled', 'True')
+        with replica_env(self.env) as env:
+            self.assertIs(env, self.env)
+
+        data = self.env['project.analytics.dashboard'].get_dashboard_data()
+        self.assertIn('kpis', data)
+        groups = self.env['project.financial.snapshot'].read_group([], ['profit_loss_net:sum'], ['snapshot_type'])
+        self.assertIsInstance(groups, list)
+
+    def test_22_batched_compute_matches_single_and_init_columns(self):
+        """Test that the grouped compute of several projects equals their single computes"""
+        from odoo.addons.project_statistic.models.project_analytics import FINANCIAL_DATA_COLUMNS
+
+        other_account = self.AnalyticAccount.create({
+            'name': 'Second Project Analytic',
+            'plan_id': self.env.ref('analytic.analytic_plan_projects').id,
+        })
+        other_project = self.Project.create({'name': 'Second Project', 'account_id': other_account.id})
+        invoice = self.Invoice.create({
+            'move_type': 'out_invoice',
+            'partner_id': self.partner.id,
+            'invoice_date': fields.Date.today(),
+            'invoice_line_ids': [(0, 0, {
+                'name': 'Shared Product',
+                'quantity': 1,
+                'price_unit': 1000.0,
+                'account_id': self.income_account.id,
+                'analytic_distribution': {str(self.analytic_account.id): 60, str(other_account.id): 40},
+            })],
+        })
+        invoice.action_post()
+
+        projects = self.project | other_project
+        projects._compute_financial_data()
+        batched = projects.read(list(FINANCIAL_DATA_COLUMNS))
+        for project in projects:
+            project._compute_financial_data()
+        self.assertEqual(projects.read(list(FINANCIAL_DATA_COLUMNS)), batched)
+        self.assertAlmostEqual(self.project.customer_invoiced_amount_net, 600.0)
+        self.assertAlmostEqual(other_project.customer_invoiced_amount_net, 400.0)
+
+        # The columns created by the pre_init_hook are those of the computed fields
+        computed = {
+            name for name, field in self.Project._fields.items()
+            if field.store and field.compute == '_compute_financial_data'
+        }
+        self.assertEqual(set(FINANCIAL_DATA_COLUMNS), computed)
+        self.assertGreaterEqual(self.Project._init_financial_data(batch_size=1), 2)
+        self.assertAlmostEqual(self.project.customer_invoiced_amount_net, 600.0)
+
+    def test_23_task_financials_add_up_to_project(self):
+        """Test that the per-task rows come from the compute and add up to the project costs"""
+        task = self.env['project.task'].create({'name': 'Phase 1', 'project_id': self.project.id})
+        employee = self.env['hr.employee'].create({'name': 'Task Employee', 'faktor_hfc': 0.5})
+        self.AnalyticLine.create([{
+            'name': 'Task work',
+            'project_id': self.project.id,
+            'task_id': task.id,
+            'employee_id': employee.id,
+            'unit_amount': 4.0,
+        }, {
+            'name': 'Project work',
+            'project_id': self.project.id,
+            'employee_id': employee.id,
+            'unit_amount': 2.0,
+        }])
+        self.AnalyticLine.create({
+            'name': 'Task material',
+            'account_id': self.analytic_account.id,
+            'task_id': task.id,
+            'amount': -150.0,
+        })
+
+        self.project._compute_financial_data()
+
+        rows = self.env['project.task.financial'].search([('project_id', '=', self.project.id)])
+        task_row = rows.filtered(lambda row: row.task_id == task)
+        self.assertEqual(len(task_row), 1)
+        self.assertAlmostEqual(task_row.hours_booked, 4.0)
+        self.assertAlmostEqual(task_row.hours_booked_adjusted, 2.0)
+        self.assertAlmostEqual(task_row.other_costs_net, 150.0)
+        self.assertAlmostEqual(sum(rows.mapped('hours_booked')), self.project.total_hours_booked)
+        self.assertAlmostEqual(sum(rows.mapped('labor_costs')), self.project.labor_costs)
+        self.assertAlmostEqual(sum(rows.mapped('other_costs_net')), self.project.other_costs_net)
+
+        # A recompute replaces the rows instead of adding new ones
+        self.project._compute_financial_data()
+        self.assertEqual(self.env['project.task.financial'].search_count([('project_id', '=', self.project.id)]),
+                         len(rows))
+
+    def test_24_financial_rollups_follow_projects(self):
+        """Test that the rollups sum their projects and follow computes and project changes"""
+        Rollup = self.env['project.financial.rollup']
+        invoice = self.Invoice.create({
+            'move_type': 'out_invoice',
+            'partner_id': self.partner.id,
+            'invoice_date': fields.Date.today(),
+            'invoice_line_ids': [(0, 0, {
+                'name': 'Rollup Product',
+                'quantity': 1,
+                'price_unit': 1000.0,
+                'account_id': self.income_account.id,
+                'analytic_distribution': {str(self.analytic_account.id): 100},
+            })],
+        })
+        invoice.action_post()
+        self.project.partner_id = self.partner
+        self.project._compute_financial_data()
+        Rollup._refresh_pending()
+
+        client_domain = [('level', '=', 'client'), ('client_name', '=', 'Test Customer'),
+                         ('company_id', '=', self.project.company_id.id)]
+        rollup = Rollup.search(client_domain)
+        self.assertEqual(len(rollup), 1)
+        self.assertEqual(rollup.project_count, 1)
+        self.assertAlmostEqual(rollup.customer_invoiced_amount_net, self.project.customer_invoiced_amount_net)
+        self.assertAlmostEqual(rollup.profit_loss_net, self.project.profit_loss_net)
+        self.assertEqual(self.Project.search(rollup.action_view_projects()['domain']), self.project)
+
+        # The company rollups equal the sums of the projects of the dashboard
+        Rollup._refresh()
+        projects = self.Project.search([('has_analytic_account', '=', True)])
+        company_rollups = Rollup.search([('level', '=', 'company')])
+        self.assertEqual(sum(company_rollups.mapped('project_count')), len(projects))
+        self.assertAlmostEqual(sum(company_rollups.mapped('customer_invoiced_amount_net')),
+                               sum(projects.mapped('customer_invoiced_amount_net')))
+
+        # Moving the project to another client updates both client rollups
+        self.project.partner_id = self.env['res.partner'].create({'name': 'Other Rollup Customer'})
+        Rollup._refresh_pending()
+        self.assertFalse(Rollup.search(client_domain))
+        moved = Rollup.search([('level', '=', 'client'), ('client_name', '=', 'Other Rollup Customer')])
+        self.assertAlmostEqual(moved.customer_invoiced_amount_net, self.project.customer_invoiced_amount_net)
+
+    def test_25_dashboard_kpis_follow_project_visibility(self):
+        """Test that project users get KPIs of the projects they can read, not of the rollups"""
+        user = new_test_user(self.env, login='dashboard_project_user', groups='project.group_project_user')
+        self.project.privacy_visibility = 'followers'
+        self.Project.create({'name': 'Visible Project', 'account_id': self.analytic_account.id})
+
+        Dashboard = self.env['project.analytics.dashboard'].with_user(user)
+        self.assertFalse(self.env['project.financial.rollup'].with_user(user).has_access('read'))
+        data = Dashboard.get_dashboard_data()
+        visible = self.Project.with_user(user).search([('has_analytic_account', '=', True)])
+        self.assertNotIn(self.project, visible)
+        self.assertEqual(data['kpis']['total_projects'], len(visible))
+        ranked = {p['id'] for p in data['top_profitable']}
+        self.assertNotIn(self.project.id, ranked)
+
+    def test_26_report_cache_hit_and_miss(self):
+        """Test that the cached report PDF is served until the stage of the project changes"""
+        self.project._compute_financial_data()
+        Report = self.env['ir.actions.report']
+        report = Report._get_report('project_statistic.action_report_project_financial')
+        name = f'Project_Financial_Report_{self.project.id}_{self.project._get_financial_report_fingerprint()}.pdf'
+        cached = self.env['ir.attachment'].create({
+            'name': name,
+            'raw': b'%PDF-1.4 cached',
+            'res_model': 'project.project',
+            'res_id': self.project.id,
+        })
+        self.assertEqual(report._retrieve_attachment(self.project), cached)
+
+        # Each project of a print gets its own data-oe-id, so Odoo can split and cache them
+        html, _report_type = Report._render_qweb_html(report, self.project.ids)
+        self.assertIn(f'data-oe-id="{self.project.id}"', html.decode())
+
+        stage = self.env['project.project.stage'].create({'name': 'Cache Test Stage'})
+        self.project.stage_id = stage
+        self.assertFalse(report._retrieve_attachment(self.project))
+
+    def test_27_read_replica_lag_and_unreachable_fallback(self):
+        """Test that a lagging or unreachable replica falls back to the primary and closes its cursor"""
+        from odoo.addons.project_statistic.models import read_replica
+
+        config = self.env['ir.config_parameter'].sudo()
+        config.set_param('project_statistic.read_replica_enabled', 'True')
+        config.set_param('project_statistic.read_replica_max_lag_seconds', '30')
+        Registry = type(self.env.registry)
+        for lag_patch in ({'return_value': 120.0}, {'side_effect': psycopg2.OperationalError('unreachable')}):
+            replica_cr = MagicMock()
+            with patch.object(read_replica, 'is_replica_configured', return_value=True), \
+                    patch.object(Registry, 'in_test_mode', return_value=False), \
+                    patch.object(Registry, 'cursor', return_value=replica_cr), \
+                    patch.object(read_replica, '_get_replica_lag', **lag_patch) as get_lag:
+                with read_replica.replica_env(self.env) as env:
+                    self.assertIs(env, self.env)
+            get_lag.assert_called_once_with(replica_cr)
+            replica_cr.close.assert_called_once()
+
+    def test_28_summary_report_segments(self):
+        """Test the chunks of a segmented portfolio summary and the report data of each segment"""
+        projects = self.project | self.Project.create([
+            {'name': f'Segment Project {index}', 'account_id': self.analytic_account.id}
+            for index in range(4)
+        ])
+        projects._compute_financial_data()
+
+        segments = self.env['ir.actions.report']._prepare_summary_segments(projects.ids, 2, {'origin': 'test'})
+
+        self.assertEqual([chunk for chunk, _data in segments],
+                         [projects.ids[0:2], projects.ids[2:4], projects.ids[4:5]])
+        self.assertEqual([data['segment'] for _chunk, data in segments],
+                         [{'index': index, 'count': 3} for index in range(3)])
+        # The whole selection is aggregated once and shared by every segment
+        summary = segments[0][1]['summary']
+        self.assertEqual(summary['total_projects'], 5)
+        self.assertTrue(all(data['summary'] is summary and data['origin'] == 'test' for _chunk, data in segments))
+
+        report = self.env['report.project_statistic.project_financial_report_summary']
+        values = [report._get_report_values(chunk, data) for chunk, data in segments]
+        self.assertEqual([v['show_overview'] for v in values], [True, False, False])
+        self.assertEqual([v['show_totals'] for v in values], [False, False, True])
+        self.assertEqual([len(v['all_projects']) for v in values], [2, 2, 1])
+        self.assertTrue(all(v['total_projects'] == 5 for v in values))
+
+    def test_29_report_follows_project_company(self):
+        """Test that the project report prints the project's company whatever company is active"""
+        project_company = self.project.company_id
+        other_currency = self.env.ref('base.CHF')
+        if other_currency == project_company.currency_id:
+            other_currency = self.env.ref('base.USD')
+        other_currency.active = True
+        other_company = self.env['res.company'].create({
+            'name': 'Other Report Company',
+            'currency_id': other_currency.id,
+        })
+        report = self.env['report.project_statistic.project_financial_report']
+
+        printed = []
+        for company in (project_company, other_company):
+            project = self.project.with_company(company)
+            values = report.with_company(company)._get_report_values(project.ids)
+            project_data = values['project_data'][0]
+            printed.append((project_data['company'], project_data['currency_symbol'],
+                            project._get_financial_report_fingerprint()))
+
+        self.assertEqual(printed[0], printed[1])
+        self.assertEqual(printed[0][0], project_company)
+        self.assertEqual(printed[0][1], project_company.currency_id.symbol)
+
+        html, _report_type = self.env['ir.actions.report'].with_company(other_company)._render_qweb_html(
+            'project_statistic.action_report_project_financial', self.project.ids,
+        )
+        self.assertIn(project_company.name, html.decode())
+        self.assertNotIn('Other Report Company', html.decode())
+
+    def test_30_task_financials_follow_moved_timesheet(self):
+        """Test that moving a timesheet to another task of the project updates both task rows"""
+        Task = self.env['project.task']
+        task_1 = Task.create({'name': 'Move From', 'project_id': self.project.id})
+        task_2 = Task.create({'name': 'Move To', 'project_id': self.project.id})
+        employee = self.env['hr.employee'].create({'name': 'Moving Employee'})
+        timesheet = self.AnalyticLine.create({
+            'name': 'Moved work',
+            'project_id': self.project.id,
+            'task_id': task_1.id,
+            'employee_id': employee.id,
+            'unit_amount': 3.0,
+        })
+        TaskFinancial = self.env['project.task.financial']
+
+        def task_hours(task):
+            return sum(TaskFinancial.search([('task_id', '=', task.id)]).mapped('hours_booked'))
+
+        self.assertAlmostEqual(task_hours(task_1), 3.0)
+        self.assertAlmostEqual(task_hours(task_2), 0.0)
+
+        timesheet.task_id = task_2
+
+        self.assertAlmostEqual(task_hours(task_1), 0.0)
+        self.assertAlmostEqual(task_hours(task_2), 3.0)
+
+    def test_31_monthly_snapshots_batched_deltas(self):
+        """Test that the monthly snapshot cron computes the deltas against each project's previous snapshot"""
+        other_project = self.Project.create({
+            'name': 'Second Snapshot Project',
+            'account_id': self.AnalyticAccount.create({
+                'name': 'Second Snapshot Analytic',
+                'plan_id': self.env.ref('analytic.analytic_plan_projects').id,
+            }).id,
+        })
+        projects = self.project | other_project
+        projects._compute_financial_data()
+        Snapshot = self.env['project.financial.snapshot']
+        Snapshot.create({
+            'project_id': self.project.id,
+            'snapshot_date': fields.Date.subtract(fields.Date.today(), months=1),
+            'snapshot_type': 'monthly',
+            'profit_loss_net': 10.0,
+        })
+
+        Snapshot.create_monthly_snapshots()
+
+        snapshots = Snapshot.search([
+            ('project_id', 'in', projects.ids),
+            ('snapshot_date', '=', fields.Date.today()),
+        ])
+        self.assertEqual(snapshots.project_id, projects)
+        for snapshot in snapshots:
+            previous_profit = 10.0 if snapshot.project_id == self.project else 0.0
+            self.assertAlmostEqual(snapshot.profit_delta, snapshot.profit_loss_net - previous_profit)
+
+    def test_32_other_costs_exclude_classified_accounts(self):
+        """Test that move lines on classified accounts are excluded from the other costs by the query"""
+        classified_account = self.env['account.account'].create({
+            'name': 'Classified Expense',
+            'code': '874099',
+            'account_type': 'expense',
+        })
+        receipt = self.Invoice.create({
+            'move_type': 'in_receipt',
+            'partner_id': self.partner.id,
+            'invoice_date': fields.Date.today(),
+            'invoice_line_ids': [(0, 0, {
+                'name': 'Receipt on classified account',
+                'quantity': 1,
+                'price_unit': 40.0,
+                'account_id': classified_account.id,
+                'tax_ids': [(6, 0, [])],
+                'analytic_distribution': {str(self.analytic_account.id): 100},
+            })],
+        })
+        receipt.action_post()
+        # Manual analytic lines have no move line and are always other costs
+        self.AnalyticLine.create({
+            'name': 'Manual cost on classified account',
+            'account_id': self.analytic_account.id,
+            'general_account_id': classified_account.id,
+            'amount': -25.0,
+        })
+
+        self.project._compute_financial_data()
+        self.assertAlmostEqual(self.project.other_costs_net, 65.0)
+
+        self.env['project.account.classification'].create({
+            'company_id': self.env.company.id,
+            'category': 'customer_skonto',
+            'code_prefix': '8740',
+        })
+        query = self.Project._get_other_costs_sql(
+            self.analytic_account, self.Project._get_classified_account_ids(self.analytic_account),
+        )
+        self.assertIn('general_account_id', query.code)
+
+        self.project._compute_financial_data()
+        self.assertAlmostEqual(self.project.other_costs_net, 25.0)
@@ -8,11 +8,37 @@ Usage:
 
 Then run:
     exec(open('/home/user/projekt-statistik-v3/tools/diagnose_odoo18_analytics.py').read())
+
+Performance health check (table sizes, distribution statistics, indexes,
+EXPLAIN plans of the recompute queries, estimated full-refresh cost):
+
+    DIAG_MODE = 'performance'
+    DIAG_FORMAT = 'json'                                     # optional, default 'text'
+    DIAG_OUTPUT = '/tmp/project_statistic_diagnostics.json'  # optional
+    DIAG_EXPLAIN_ANALYZE = False                             # optional, executes the queries
+    DIAG_SAMPLE_SIZE = 10                                    # optional, projects of the sample batch
+    exec(open('/home/user/projekt-statistik-v3/tools/diagnose_odoo18_analytics.py').read())
+
+The same settings can be given as environment variables PROJECT_STATISTIC_DIAG_MODE,
+PROJECT_STATISTIC_DIAG_FORMAT, PROJECT_STATISTIC_DIAG_OUTPUT, PROJECT_STATISTIC_DIAG_SAMPLE_SIZE
+and PROJECT_STATISTIC_DIAG_EXPLAIN_ANALYZE. The JSON report can be attached to support tickets.
 """
 
+import json
 import logging
+import os
+import time
 _logger = logging.getLogger(__name__)
 
+DIAG_MODE = globals().get('DIAG_MODE') or os.environ.get('PROJECT_STATISTIC_DIAG_MODE', 'config')
+DIAG_FORMAT = globals().get('DIAG_FORMAT') or os.environ.get('PROJECT_STATISTIC_DIAG_FORMAT', 'text')
+DIAG_OUTPUT = globals().get('DIAG_OUTPUT') or os.environ.get('PROJECT_STATISTIC_DIAG_OUTPUT')
+DIAG_SAMPLE_SIZE = int(globals().get('DIAG_SAMPLE_SIZE') or os.environ.get('PROJECT_STATISTIC_DIAG_SAMPLE_SIZE', 10))
+DIAG_EXPLAIN_ANALYZE = bool(
+    globals().get('DIAG_EXPLAIN_ANALYZE')
+    or os.environ.get('PROJECT_STATISTIC_DIAG_EXPLAIN_ANALYZE', '').lower() in ('1', 'true', 'yes')
+)
+
 print("=" * 80)
 print("ODOO 18 ANALYTIC CONFIGURATION DIAGNOSTIC")
 print("=" * 80)
@@ -131,7 +157,218 @@ except Exception as e:
     print(f"   ERROR: {e}")
     print()
 
-# 6. Recommendations
+# 6. Performance health check
+performance = {}
+missing_indexes = []
+if DIAG_MODE == 'performance':
+    from odoo.tools import SQL
+
+    print("6. Performance health check...")
+    print("-" * 80)
+    cr = env.cr
+
+    # 6a. Table sizes and row counts
+    try:
+        tables = {}
+        for table in ('account_move_line', 'account_analytic_line', 'project_project', 'project_financial_snapshot'):
+            cr.execute(SQL(
+                """
+                SELECT pg_total_relation_size(%s::regclass), pg_relation_size(%s::regclass),
+                       pg_indexes_size(%s::regclass), (SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass)
+                """,
+                table, table, table, table,
+            ))
+            total_size, table_size, index_size, estimated_rows = cr.fetchone()
+            tables[table] = {
+                'total_size_mb': round(total_size / 1024 / 1024, 1),
+                'table_size_mb': round(table_size / 1024 / 1024, 1),
+                'index_size_mb': round(index_size / 1024 / 1024, 1),
+                'estimated_rows': estimated_rows,
+            }
+            print(f"   {table:<30} {estimated_rows:>12} rows (est.)  {tables[table]['total_size_mb']:>10} MB "
+                  f"(indexes {tables[table]['index_size_mb']} MB)")
+        performance['tables'] = tables
+    except Exception as e:
+        print(f"   ERROR reading table sizes: {e}")
+        cr.rollback()
+
+    # 6b. Share of lines with analytic distribution
+    try:
+        cr.execute(SQL("""
+            SELECT COUNT(*),
+                   COUNT(*) FILTER (WHERE analytic_distribution IS NOT NULL),
+                   COUNT(*) FILTER (WHERE analytic_distribution IS NOT NULL AND parent_state = 'posted')
+              FROM account_move_line
+        """))
+        line_count, with_distribution, posted_with_distribution = cr.fetchone()
+        cr.execute(SQL("""
+            SELECT COUNT(*), COUNT(*) FILTER (WHERE project_id IS NOT NULL) FROM account_analytic_line
+        """))
+        analytic_count, timesheet_count = cr.fetchone()
+        performance['distribution'] = {
+            'move_lines': line_count,
+            'move_lines_with_distribution': with_distribution,
+            'move_lines_posted_with_distribution': posted_with_distribution,
+            'distribution_share_pct': round(with_distribution / line_count * 100, 1) if line_count else 0.0,
+            'analytic_lines': analytic_count,
+            'timesheet_lines': timesheet_count,
+        }
+        print(f"   Move lines with distribution: {with_distribution} of {line_count} "
+              f"({performance['distribution']['distribution_share_pct']}%), posted: {posted_with_distribution}")
+        print(f"   Analytic lines: {analytic_count} (timesheets: {timesheet_count})")
+    except Exception as e:
+        print(f"   ERROR reading distribution statistics: {e}")
+        cr.rollback()
+
+    # 6c. Key cardinality per analytic account (top 20)
+    try:
+        cr.execute(SQL("""
+            SELECT COUNT(DISTINCT key) FROM account_move_line, jsonb_object_keys(analytic_distribution) AS key
+             WHERE analytic_distribution IS NOT NULL
+        """))
+        distinct_keys = cr.fetchone()[0]
+        cr.execute(SQL("""
+            SELECT key, COUNT(*) AS line_count
+              FROM account_move_line, jsonb_object_keys(analytic_distribution) AS key
+             WHERE analytic_distribution IS NOT NULL
+             GROUP BY key
+             ORDER BY line_count DESC
+             LIMIT 20
+        """))
+        top_keys = [{'key': key, 'lines': count} for key, count in cr.fetchall()]
+        performance['key_cardinality'] = {'distinct_keys': distinct_keys, 'top_keys': top_keys}
+        print(f"   Distinct distribution keys: {distinct_keys}; busiest: "
+              + ", ".join(f"{k['key']}={k['lines']}" for k in top_keys[:5]))
+    except Exception as e:
+        print(f"   ERROR reading key cardinality: {e}")
+        cr.rollback()
+
+    # 6d. Indexes the recompute relies on: (table, description, column fragments in indexdef)
+    required_indexes = [
+        ('account_move_line', 'GIN index on analytic_distribution keys', ('gin', 'analytic_distribution')),
+        ('account_move_line', 'index on move_id', ('(move_id',)),
+        ('account_analytic_line', 'index on account_id', ('(account_id',)),
+        ('account_analytic_line', 'index on project_id', ('project_id',)),
+        ('project_project', 'index on account_id', ('account_id',)),
+        ('project_financial_snapshot', 'index on project_id', ('project_id',)),
+        ('sale_order', 'index on project_id', ('project_id',)),
+    ]
+    try:
+        indexes = []
+        for table, description, fragments in required_indexes:
+            cr.execute(SQL("SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s", table))
+            found = [name for name, definition in cr.fetchall()
+                     if all(fragment.lower() in definition.lower() for fragment in fragments)]
+            indexes.append({'table': table, 'index': description, 'present': bool(found), 'names': found})
+            if not found:
+                missing_indexes.append(f"{table}: {description}")
+            print(f"   {'✓' if found else '✗'} {table}: {description}" + (f" ({', '.join(found)})" if found else ''))
+        performance['indexes'] = indexes
+    except Exception as e:
+        print(f"   ERROR checking indexes: {e}")
+        cr.rollback()
+
+    # 6e. EXPLAIN plans of the grouped recompute queries for a sample batch of projects
+    try:
+        Project = env['project.project']
+        sample = Project.search([('account_id', '!=', False)], limit=DIAG_SAMPLE_SIZE)
+        plans = {}
+        if sample:
+            analytic_accounts = sample.account_id
+            # The SQL the compute executes, built by the same methods
+            queries = {
+                'customer_invoice_totals': sample._get_distributed_move_line_totals_sql(
+                    analytic_accounts, 'out_invoice', 'out_refund')[1],
+                'vendor_bill_totals': sample._get_distributed_move_line_totals_sql(
+                    analytic_accounts, 'in_invoice', 'in_refund')[1],
+                'timesheets': sample._get_timesheet_costs_sql(analytic_accounts),
+                'other_costs': sample._get_other_costs_sql(
+                    analytic_accounts, sample._get_classified_account_ids(analytic_accounts)),
+            }
+            Classification = env['project.account.classification']
+            skonto_account_ids = set()
+            for company in analytic_accounts.company_id | env.company:
+                categories = Classification._get_category_account_ids(company.id)
+                skonto_account_ids |= categories['customer_skonto'] | categories['vendor_skonto']
+            if skonto_account_ids:
+                queries['skonto'] = sample._get_skonto_sql(analytic_accounts, skonto_account_ids)
+            queries['account_moves_action'] = env['account.move']._search([
+                ('line_ids.distribution_analytic_account_ids', 'in', [sample[0].account_id.id]),
+                ('state', '=', 'posted'),
+            ]).select()
+            queries['snapshots'] = env['project.financial.snapshot']._search(
+                [('project_id', 'in', sample.ids)]
+            ).select()
+            explain = SQL("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) ") if DIAG_EXPLAIN_ANALYZE else SQL("EXPLAIN (FORMAT JSON) ")
+            for name, query_sql in queries.items():
+                cr.execute(SQL("%s%s", explain, query_sql))
+                plan = cr.fetchone()[0][0]
+                plans[name] = plan
+                top = plan['Plan']
+                print(f"   {name:<26} {top['Node Type']:<22} cost={top['Total Cost']:<12} rows={top['Plan Rows']}"
+                      + (f" time={plan.get('Execution Time', 0):.1f}ms" if DIAG_EXPLAIN_ANALYZE else ''))
+            performance['explain'] = {
+                'project_ids': sample.ids,
+                'analytic_account_ids': analytic_accounts.ids,
+                'plans': plans,
+            }
+        else:
+            print("   No project with analytic account, skipping EXPLAIN")
+    except Exception as e:
+        print(f"   ERROR running EXPLAIN: {e}")
+        cr.rollback()
+
+    # 6f. Estimated full-refresh cost: compute a sample batch and roll it back.
+    # The compute runs a constant number of grouped queries per batch of
+    # projects (see _init_financial_data), so only the time grows with the data.
+    try:
+        from odoo.addons.project_statistic.models.project_analytics import INIT_BATCH_SIZE
+
+        Project = env['project.project']
+        project_count = Project.search_count([('account_id', '!=', False)])
+        sample = Project.search([('account_id', '!=', False)], limit=DIAG_SAMPLE_SIZE)
+        if sample:
+            cr.execute(SQL("SAVEPOINT project_statistic_diagnostics"))
+            env.flush_all()
+            env.invalidate_all()
+            queries_before = cr.sql_log_count
+            start = time.perf_counter()
+            sample._compute_financial_data()
+            env.flush_all()
+            elapsed = time.perf_counter() - start
+            queries = cr.sql_log_count - queries_before
+            cr.execute(SQL("ROLLBACK TO SAVEPOINT project_statistic_diagnostics"))
+            env.invalidate_all()
+            batch_count = -(-project_count // INIT_BATCH_SIZE)
+            estimated_seconds = elapsed / len(sample) * project_count
+            performance['full_refresh_estimate'] = {
+                'sample_projects': len(sample),
+                'sample_seconds': round(elapsed, 3),
+                'sample_queries': queries,
+                'projects_with_analytic_account': project_count,
+                'batch_size': INIT_BATCH_SIZE,
+                'batches': batch_count,
+                'estimated_seconds': round(estimated_seconds, 1),
+                'estimated_queries': queries * batch_count,
+            }
+            print(f"   Full refresh of {project_count} project(s) in {batch_count} batch(es): "
+                  f"~{estimated_seconds:.1f}s, ~{queries * batch_count} queries "
+                  f"(sample batch of {len(sample)}: {elapsed:.2f}s, {queries} queries)")
+    except Exception as e:
+        print(f"   ERROR estimating refresh cost: {e}")
+        cr.rollback()
+
+    if DIAG_FORMAT == 'json' or DIAG_OUTPUT:
+        report = json.dumps({'project_statistic_diagnostics': performance}, indent=2, default=str)
+        output = DIAG_OUTPUT or '/tmp/project_statistic_diagnostics.json'
+        with open(output, 'w') as f:
+            f.write(report)
+        print(f"   JSON report written to {output}")
+        if DIAG_FORMAT == 'json':
+            print(report)
+    print()
+
+# 7. Recommendations
 print("=" * 80)
 print("RECOMMENDATIONS:")
 print("=" * 80)
@@ -146,6 +383,11 @@ if not hasattr(Project, 'analytic_account_id'):
     print("  → Use 'project.account_id' instead")
     print()
 
+for missing in missing_indexes:
+    print(f"⚠ Missing index: {missing}")
+    print("  → Recompute queries on this table fall back to sequential scans")
+    print()
+
 print("✓ Consider using @api.depends() with proper field dependencies instead of empty depends")
 print("✓ Consider using store=False for most fields and compute them on-demand")
 print()
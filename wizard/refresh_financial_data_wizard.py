@@ -1,10 +1,24 @@
 from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+
+# Upper bound for the number of values per simulation axis (keeps the grid readable)
+MAX_SIMULATION_VALUES = 20
 
 
 class RefreshFinancialDataWizard(models.TransientModel):
     _name = 'refresh.financial.data.wizard'
     _description = 'Refresh Financial Data with General Hourly Rate'
 
+    mode = fields.Selection([
+        ('apply', 'Apply & Recalculate'),
+        ('simulate', 'Simulate (no changes)'),
+    ], string='Mode',
+        required=True,
+        default='apply',
+        help="Apply: save the parameters and recalculate the selected projects. "
+             "Simulate: compare several hourly rates and surcharge factors in memory without changing any data."
+    )
+
     general_hourly_rate = fields.Float(
         string='General Hourly Rate (EUR)',
         required=True,
@@ -30,6 +44,99 @@ class RefreshFinancialDataWizard(models.TransientModel):
              "Default: 1.30 (30% surcharge)"
     )
 
+    # Simulation mode
+    simulation_hourly_rates = fields.Char(
+        string='Hourly Rates to Compare',
+        default=lambda self: self._default_simulation_values('project_statistic.general_hourly_rate', '66.0', 5.0),
+        help="Comma-separated list of general hourly rates to simulate, e.g. '60, 66, 72'."
+    )
+    simulation_surcharge_factors = fields.Char(
+        string='Surcharge Factors to Compare',
+        default=lambda self: self._default_simulation_values('project_statistic.vendor_bill_surcharge_factor', '1.30', 0.1),
+        help="Comma-separated list of vendor bill surcharge factors to simulate, e.g. '1.2, 1.3, 1.4'."
+    )
+    simulation_result_html = fields.Html(
+        string='Simulation Result',
+        readonly=True,
+        sanitize=False,
+    )
+
+    @api.model
+    def _default_simulation_values(self, param_key, default, step):
+        """Current parameter value with one step below and above, as a comma-separated string."""
+        current = float(self.env['ir.config_parameter'].sudo().get_param(param_key, default=default))
+        return ', '.join('%g' % round(current + offset, 2) for offset in (-step, 0.0, step))
+
+    def _get_target_projects(self):
+        """Selected projects from context, or all projects if nothing is selected."""
+        active_ids = self.env.context.get('active_ids', [])
+        if active_ids:
+            return self.env['project.project'].browse(active_ids)
+        return self.env['project.project'].search([])
+
+    @api.model
+    def _parse_simulation_values(self, value, label):
+        """Parse a comma-separated list of positive numbers (duplicates removed, order kept)."""
+        values = []
+        for token in (value or '').replace(';', ',').split(','):
+            token = token.strip()
+            if not token:
+                continue
+            try:
+                number = float(token)
+            except ValueError:
+                raise UserError(_('Invalid value "%(value)s" in %(label)s.', value=token, label=label))
+            if number < 0:
+                raise UserError(_('%(label)s must not contain negative values.', label=label))
+            if number not in values:
+                values.append(number)
+        if not values:
+            raise UserError(_('Please enter at least one value for %s.') % label)
+        if len(values) > MAX_SIMULATION_VALUES:
+            raise UserError(_('Please enter at most %(count)s values for %(label)s.',
+                              count=MAX_SIMULATION_VALUES, label=label))
+        return values
+
+    def action_simulate(self):
+        """
+        Compare hourly rate / surcharge factor combinations for the selected projects.
+
+        Nothing is written to the projects or system parameters - the comparison
+        grid is evaluated in memory and shown in the wizard.
+        """
+        self.ensure_one()
+
+        hourly_rates = self._parse_simulation_values(self.simulation_hourly_rates, _('Hourly Rates'))
+        surcharge_factors = self._parse_simulation_values(self.simulation_surcharge_factors, _('Surcharge Factors'))
+
+        projects = self._get_target_projects()
+        simulation = projects.simulate_rate_scenarios(hourly_rates, surcharge_factors)
+
+        self.simulation_result_html = self.env['ir.qweb']._render(
+            'project_statistic.refresh_financial_data_simulation_result', {
+                'simulation': simulation,
+                'hourly_rates': hourly_rates,
+                'surcharge_factors': surcharge_factors,
+                'scenario_map': {
+                    (s['general_hourly_rate'], s['vendor_bill_surcharge_factor']): s
+                    for s in simulation['scenarios']
+                },
+                'currency_symbol': self.env.company.currency_id.symbol,
+                'format_amount': lambda value: '{:,.2f}'.format(value or 0.0),
+            }
+        )
+
+        # Re-open the wizard to show the comparison grid
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Refresh Financial Data'),
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+            'context': self.env.context,
+        }
+
     def action_refresh_data(self):
         """
         Update the system parameter with the new hourly rate and refresh financial data.
@@ -49,13 +156,8 @@ class RefreshFinancialDataWizard(models.TransientModel):
             str(self.vendor_bill_surcharge_factor)
         )
 
-        # Get the active project IDs from context
-        active_ids = self.env.context.get('active_ids', [])
-        if active_ids:
-            projects = self.env['project.project'].browse(active_ids)
-        else:
-            # If no specific projects selected, refresh all
-            projects = self.env['project.project'].search([])
+        # Get the active project IDs from context (all projects if none selected)
+        projects = self._get_target_projects()
 
         # CRITICAL: Invalidate cache to ensure fresh data
         # This forces Odoo to read from DB instead of using cached values
@@ -64,7 +166,8 @@ class RefreshFinancialDataWizard(models.TransientModel):
         # Trigger recomputation
         # This happens within the current transaction and will be committed
         # when the wizard completes successfully
-        projects._compute_financial_data()
+        with self.env['project.statistic.telemetry'].track('wizard_refresh', len(projects)):
+            projects._compute_financial_data()
 
         # Show success notification
         return {